@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import time
+import argparse
+from common import synthesize_corpus, SRC_DIR
+
+sys.path.insert(0, SRC_DIR)
+from bulk_score import bulk_score, CHUNK_SIZE  # pylint: disable=wrong-import-position
+
+OUT_PATH = "output/bench_bulk_score.json"
+WORKERS = [1, 2, 4, 8]
+
+
+def bench(n_rows: int, worker_counts: list[int], model: str, vectorizer: str,
+          chunksize: int) -> list[dict]:
+    """Score a synthetic corpus at each worker count; speedups are relative to the first."""
+    data = synthesize_corpus(n_rows)
+    output = os.path.join(os.path.dirname(data), "bulk_predictions.csv")
+    results = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        scored = bulk_score(data, output, model, vectorizer, workers, chunksize)
+        seconds = time.perf_counter() - start
+        row = {
+            "workers": workers,
+            "rows": scored,
+            "seconds": round(seconds, 2),
+            "rows_per_second": round(scored / seconds, 1),
+            "speedup": round(results[0]["seconds"] / seconds, 2) if results else 1.0,
+        }
+        print(f"{workers:>3} workers  {row['seconds']:>8.2f}s  "
+              f"{row['rows_per_second']:>10.0f} rows/s  x{row['speedup']:.2f}")
+        results.append(row)
+    return results
+
+
+def main():
+    """Measure how bulk scoring scales with the number of worker processes."""
+    p = argparse.ArgumentParser(description="Benchmark bulk_score.py across worker counts.")
+    p.add_argument("--rows", type=int, default=200_000, help="Synthetic corpus size.")
+    p.add_argument("--workers", type=int, nargs="+", default=WORKERS,
+                   help="Worker counts to compare.")
+    p.add_argument("--model", default="artifacts/model.pkl", help="Path to model .pkl.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Path to vectorizer .pkl.")
+    p.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="Reviews per task.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    results = bench(args.rows, args.workers, args.model, args.vectorizer, args.chunksize)
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import time
+import argparse
+from common import synthesize_corpus, SRC_DIR
+
+sys.path.insert(0, SRC_DIR)
+from data_prep import read_table, write_table  # pylint: disable=wrong-import-position
+
+OUT_PATH = "output/bench_columnar.json"
+FORMATS = [".csv", ".parquet", ".feather"]
+
+
+def timed(func, repeats: int = 3) -> float:
+    """Best wall time of ``repeats`` calls."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(n_rows: int, repeats: int) -> list[dict]:
+    """Write a synthetic corpus in each format and time full and column-selective reads."""
+    source = synthesize_corpus(n_rows)
+    df = read_table(source)
+    results = []
+    for ext in FORMATS:
+        path = os.path.splitext(source)[0] + ext
+        start = time.perf_counter()
+        write_table(df, path)
+        write_seconds = time.perf_counter() - start
+        row = {
+            "format": ext.lstrip("."),
+            "rows": n_rows,
+            "size_mb": round(os.path.getsize(path) / 2 ** 20, 1),
+            "write_seconds": round(write_seconds, 3),
+            "read_seconds": round(timed(lambda p=path: read_table(p), repeats), 3),
+            "read_review_seconds": round(
+                timed(lambda p=path: read_table(p, ["Review"]), repeats), 3),
+            "read_labels_seconds": round(
+                timed(lambda p=path: read_table(p, ["Liked"]), repeats), 3),
+        }
+        print(f"{row['format']:>8}  {row['size_mb']:>7.1f} MB  write {row['write_seconds']:.2f}s"
+              f"  read {row['read_seconds']:.2f}s  Review only {row['read_review_seconds']:.2f}s"
+              f"  Liked only {row['read_labels_seconds']:.3f}s")
+        results.append(row)
+    return results
+
+
+def main():
+    """Compare CSV with Parquet/Feather splits on a synthetic corpus."""
+    p = argparse.ArgumentParser(description="Benchmark CSV vs columnar split formats.")
+    p.add_argument("--rows", type=int, default=1_000_000, help="Synthetic corpus size.")
+    p.add_argument("--repeats", type=int, default=3, help="Reads per measurement (best kept).")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    results = bench(args.rows, args.repeats)
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+from common import synthesize_corpus, SRC_DIR
+
+sys.path.insert(0, SRC_DIR)
+# pylint: disable=wrong-import-position
+from lib_ml.preprocessing import clean_review, tokenize_review
+from preprocess import tokenize_corpus
+from train import cross_validate, load_params
+
+OUT_PATH = "output/bench_cv.json"
+
+
+def naive_cv(reviews: list[str], labels: np.ndarray, params: dict, folds: int) -> float:
+    """Fit a fresh TfidfVectorizer + model per fold on raw text, as k training runs would."""
+    start = time.perf_counter()
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    for train_idx, eval_idx in splitter.split(np.zeros(len(labels)), labels):
+        vec = TfidfVectorizer(tokenizer=tokenize_review, preprocessor=clean_review,
+                              ngram_range=params["ngram_range"],
+                              max_features=params["max_features"])
+        x_train = vec.fit_transform([reviews[i] for i in train_idx])
+        clf = LogisticRegression(C=params["C"], solver=params["solver"], random_state=0)
+        clf.fit(x_train, labels[train_idx])
+        clf.predict_proba(vec.transform([reviews[i] for i in eval_idx]))
+    return time.perf_counter() - start
+
+
+def main():
+    """Compare shared-corpus cross-validation with one independent training per fold."""
+    p = argparse.ArgumentParser(description="Benchmark train.py --cv against naive k-fold.")
+    p.add_argument("--rows", type=int, default=100_000, help="Synthetic corpus size.")
+    p.add_argument("--folds", type=int, default=5, help="Number of folds.")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Fold processes.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    df = pd.read_csv(synthesize_corpus(args.rows))
+    reviews, labels = df["Review"].astype(str).tolist(), df["Liked"].values
+    params = load_params(None)
+
+    naive = naive_cv(reviews, labels, params, args.folds)
+    start = time.perf_counter()
+    cross_validate(tokenize_corpus(reviews, None, args.workers), labels, params, args.folds,
+                   args.workers)
+    shared = time.perf_counter() - start
+    result = {"rows": args.rows, "folds": args.folds, "workers": args.workers,
+              "naive_seconds": round(naive, 2), "shared_seconds": round(shared, 2),
+              "speedup": round(naive / shared, 2)}
+    print(f"naive {naive:.2f}s  shared corpus {shared:.2f}s  x{naive / shared:.2f}")
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import json
+import argparse
+import pandas as pd
+from common import synthesize_corpus, run_measured, SRC_DIR, BENCH_DIR
+
+OUT_PATH = "output/bench_dedup.json"
+
+
+def main():
+    """Time dedup.py on a synthetic corpus and report seconds per million rows."""
+    p = argparse.ArgumentParser(description="Benchmark the deduplication stage.")
+    p.add_argument("--rows", type=int, default=1_000_000, help="Synthetic corpus size.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    raw = os.path.join(BENCH_DIR, f"raw_{args.rows}.tsv")
+    pd.read_csv(synthesize_corpus(args.rows)).to_csv(raw, sep="\t", index=False)
+    report_path = os.path.join(BENCH_DIR, f"dedup_{args.rows}.json")
+    cmd = [sys.executable, os.path.join(SRC_DIR, "dedup.py"), "--raw", raw,
+           "--out", os.path.join(BENCH_DIR, f"dedup_{args.rows}.tsv"), "--report", report_path]
+    seconds, peak_rss_mb = run_measured(cmd)
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    result = {**report, "wall_seconds": round(seconds, 2), "peak_rss_mb": round(peak_rss_mb, 1)}
+    print(f"{args.rows} rows  {seconds:.2f}s  {report['seconds_per_million_rows']:.1f}s/M rows  "
+          f"peak RSS {peak_rss_mb:.0f} MB")
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
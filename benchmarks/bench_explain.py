@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from common import synthesize_corpus, SRC_DIR
+
+sys.path.insert(0, SRC_DIR)
+from explain import Explainer  # pylint: disable=wrong-import-position
+
+OUT_PATH = "output/bench_explain.json"
+
+
+def per_review(explainer: Explainer, texts: list[str], k: int) -> list[dict]:
+    """Explain one review at a time, sorting each row's contributions in Python."""
+    records = []
+    for text in texts:
+        row, margin = explainer.contributions([text])
+        order = np.argsort(row.data)
+        records.append({
+            "probability": float(1.0 / (1.0 + np.exp(-margin[0]))),
+            "positive": [(explainer.terms[row.indices[j]], row.data[j])
+                         for j in order[::-1][:k] if row.data[j] > 0],
+            "negative": [(explainer.terms[row.indices[j]], row.data[j])
+                         for j in order[:k] if row.data[j] < 0],
+        })
+    return records
+
+
+def main():
+    """Compare batched top-k explanations with a per-review loop."""
+    p = argparse.ArgumentParser(description="Benchmark explain.py throughput.")
+    p.add_argument("--rows", type=int, default=50_000, help="Synthetic reviews to explain.")
+    p.add_argument("--loop-rows", type=int, default=5_000,
+                   help="Reviews for the (slow) per-review baseline.")
+    p.add_argument("--top-k", type=int, default=5, help="N-grams per direction.")
+    p.add_argument("--scorer", default="artifacts/scorer", help="Exported scorer.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    texts = pd.read_csv(synthesize_corpus(args.rows))["Review"].astype(str).tolist()
+    explainer = Explainer.from_scorer(args.scorer)
+    explainer.explain(texts[:1000], args.top_k)  # warm the stem/vocabulary memos
+
+    start = time.perf_counter()
+    explainer.explain(texts, args.top_k)
+    batched = len(texts) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    per_review(explainer, texts[:args.loop_rows], args.top_k)
+    looped = args.loop_rows / (time.perf_counter() - start)
+
+    result = {"rows": args.rows, "top_k": args.top_k,
+              "batched_reviews_per_s": round(batched, 1),
+              "per_review_reviews_per_s": round(looped, 1),
+              "speedup": round(batched / looped, 2)}
+    print(f"batched {batched:.0f} reviews/s  per-review {looped:.0f} reviews/s  "
+          f"x{batched / looped:.1f}")
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
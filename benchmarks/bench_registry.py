@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from common import synthesize_corpus, BENCH_DIR, SRC_DIR
+
+sys.path.insert(0, SRC_DIR)
+# pylint: disable=wrong-import-position
+from registry import Registry
+from train import train_and_save, load_params
+
+OUT_PATH = "output/bench_registry.json"
+MAX_FEATURES = [250, 500, 1000, 2500]
+
+
+def build_registry(root: str, n_rows: int) -> list[str]:
+    """Register one model per ``MAX_FEATURES`` setting, trained on a synthetic corpus."""
+    data = synthesize_corpus(n_rows)
+    registry = Registry(root)
+    versions = []
+    for max_features in MAX_FEATURES:
+        params = {**load_params(None), "max_features": max_features}
+        vec_out = os.path.join(BENCH_DIR, "registry_vectorizer.pkl")
+        model_out = os.path.join(BENCH_DIR, "registry_model.pkl")
+        metrics_out = os.path.join(BENCH_DIR, "registry_train_metrics.json")
+        train_and_save(data, vec_out, model_out, metrics_out=metrics_out, params=params)
+        with open(metrics_out, encoding="utf-8") as f:
+            versions.append(registry.register(vec_out, model_out, params, json.load(f)))
+    return versions
+
+
+def measure(root: str, versions: list[str]) -> list[dict]:
+    """Load every version into one registry; time first and repeated access, track memory."""
+    registry = Registry(root)
+    texts = ["The food was great", "Terrible service"]
+    tracemalloc.start()
+    results = []
+    for version in versions:
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        registry.get(version).predict_proba(texts)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for ref in versions[:len(results) + 1]:
+            registry.get(ref).predict_proba(texts)
+        switch = (time.perf_counter() - start) / (len(results) + 1)
+        held = tracemalloc.get_traced_memory()[0]
+        results.append({
+            "version": version,
+            "features": len(registry.get(version).vectorizer.vocabulary_),
+            "first_load_seconds": round(first, 4),
+            "cached_access_seconds": round(switch, 5),
+            "memory_mb": round((held - before) / 2 ** 20, 2),
+            "versions_held": len(results) + 1,
+            "total_memory_mb": round(held / 2 ** 20, 2),
+        })
+        row = results[-1]
+        print(f"{version}  {row['features']:>6} features  first load "
+              f"{row['first_load_seconds'] * 1000:>7.1f}ms  cached "
+              f"{row['cached_access_seconds'] * 1000:>6.2f}ms  +{row['memory_mb']:.1f} MB  "
+              f"({row['versions_held']} held, {row['total_memory_mb']:.1f} MB)")
+    tracemalloc.stop()
+    return results
+
+
+def main():
+    """Measure load time and memory of holding several registered versions at once."""
+    p = argparse.ArgumentParser(description="Benchmark lazy loading from the model registry.")
+    p.add_argument("--rows", type=int, default=100_000, help="Synthetic corpus size.")
+    p.add_argument("--registry", default=os.path.join(BENCH_DIR, "registry"),
+                   help="Scratch registry directory.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    versions = build_registry(args.registry, args.rows)
+    results = measure(args.registry, versions)
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from collections import Counter
+import pandas as pd
+from common import run_measured, SRC_DIR, BENCH_DIR
+
+OUT_PATH = "output/bench_startup.json"
+SAMPLE_PATH = os.path.join(BENCH_DIR, "startup_reviews.csv")
+SAMPLE_ROWS = 20
+# Packages whose presence in the scoring path means a training dependency leaked in
+HEAVY = ("nltk", "sklearn", "pandas", "joblib", "scipy.stats")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def commands(scorer: str, sample: str, output: str) -> dict[str, list[str]]:
+    """Cold-start command line of every tracked entry point."""
+    train, evaluate, predict = (os.path.join(SRC_DIR, name)
+                                for name in ("train.py", "evaluate.py", "predict.py"))
+    return {
+        "train_help": [train, "--help"],
+        "evaluate_help": [evaluate, "--help"],
+        "score_help": [predict, "score", "--help"],
+        "score": [predict, "score", "--scorer", scorer, "--input", sample, "--output", output],
+    }
+
+
+def import_profile(module: str) -> dict:
+    """Parse ``python -X importtime -c 'import <module>'``: total, per package, heavy ones."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    self_us, loaded = Counter(), set()
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            name = match.group(4)
+            self_us[name.split(".")[0]] += int(match.group(1))
+            loaded.add(name)
+    return {
+        "import_seconds": round(sum(self_us.values()) / 1e6, 3),
+        "top_packages": {name: round(us / 1e6, 3) for name, us in self_us.most_common(5)},
+        "heavy_loaded": [name for name in HEAVY if name in loaded],
+    }
+
+
+def main():
+    """Measure cold start of the training, evaluation and scoring entry points."""
+    p = argparse.ArgumentParser(description="Benchmark interpreter cold start per entry point.")
+    p.add_argument("--repeats", type=int, default=5, help="Runs per command; the best counts.")
+    p.add_argument("--scorer", default="artifacts/scorer", help="Exported scorer to score with.")
+    p.add_argument("--data", default="data/processed/test.csv",
+                   help=f"Reviews to take the {SAMPLE_ROWS}-row scoring sample from.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    pd.read_csv(args.data).head(SAMPLE_ROWS).to_csv(SAMPLE_PATH, index=False)
+    output = os.path.join(BENCH_DIR, "startup_predictions.csv")
+
+    result = {"cold_start_seconds": {}, "imports": {}}
+    for name, cmd in commands(args.scorer, SAMPLE_PATH, output).items():
+        seconds = min(run_measured([sys.executable, *cmd])[0] for _ in range(args.repeats))
+        result["cold_start_seconds"][name] = round(seconds, 3)
+        print(f"{name:14s} {seconds:.3f}s")
+    for module in ("train", "evaluate", "predict"):
+        result["imports"][module] = import_profile(module)
+        profile = result["imports"][module]
+        print(f"import {module:9s} {profile['import_seconds']:.3f}s  "
+              f"heavy: {', '.join(profile['heavy_loaded']) or '-'}")
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
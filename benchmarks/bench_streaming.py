@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import argparse
+from common import synthesize_corpus, run_measured, SRC_DIR
+
+OUT_PATH = "output/bench_streaming.json"
+
+
+def bench(sizes: list[int], chunksize: int) -> list[dict]:
+    """Train in-memory and streaming models on synthetic corpora; report RSS and throughput."""
+    train_py = os.path.join(SRC_DIR, "train.py")
+    results = []
+    for n_rows in sizes:
+        data = synthesize_corpus(n_rows)
+        modes = {
+            "in_memory": [],
+            "streaming": ["--streaming", "--chunksize", str(chunksize)],
+        }
+        for mode, extra in modes.items():
+            cmd = [sys.executable, train_py, "--data", data,
+                   "--vectorizer", f"data/bench/{mode}_vectorizer.pkl",
+                   "--model", f"data/bench/{mode}_model.pkl",
+                   "--metrics-out", f"data/bench/{mode}_train_metrics.json", *extra]
+            seconds, peak_rss_mb = run_measured(cmd)
+            row = {
+                "rows": n_rows,
+                "mode": mode,
+                "seconds": round(seconds, 2),
+                "rows_per_second": round(n_rows / seconds, 1),
+                "peak_rss_mb": round(peak_rss_mb, 1),
+            }
+            print(f"{n_rows:>9} rows  {mode:<10} {row['seconds']:>8.2f}s "
+                  f"{row['rows_per_second']:>10.0f} rows/s  {row['peak_rss_mb']:>8.1f} MB peak")
+            results.append(row)
+    return results
+
+
+def main():
+    """Compare chunked and in-memory training on synthetic corpora."""
+    p = argparse.ArgumentParser(description="Benchmark streaming vs in-memory training.")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                   help="Synthetic corpus sizes (rows).")
+    p.add_argument("--chunksize", type=int, default=10_000, help="Rows per streamed chunk.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    results = bench(args.sizes, args.chunksize)
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import time
+import argparse
+import joblib
+import pandas as pd
+from common import synthesize_corpus, run_measured, SRC_DIR, BENCH_DIR
+
+sys.path.insert(0, SRC_DIR)
+from evaluate import evaluate  # pylint: disable=wrong-import-position
+from hashing import parallel_transform  # pylint: disable=wrong-import-position
+
+OUT_PATH = "output/bench_vectorizers.json"
+VECTORIZER_TYPES = ("tfidf", "hashing")
+THROUGHPUT_ROWS = 50_000
+
+
+def bench(sizes: list[int], test_path: str, workers: int) -> list[dict]:
+    """Train both vectorizer types per corpus size; compare cost, size and test metrics."""
+    train_py = os.path.join(SRC_DIR, "train.py")
+    reviews = pd.read_csv(test_path)["Review"].astype(str).tolist()
+    batch = (reviews * (THROUGHPUT_ROWS // len(reviews) + 1))[:THROUGHPUT_ROWS]
+    results = []
+    for n_rows in sizes:
+        data = synthesize_corpus(n_rows)
+        for kind in VECTORIZER_TYPES:
+            vec_out = os.path.join(BENCH_DIR, f"{kind}_{n_rows}_vectorizer.pkl")
+            model_out = os.path.join(BENCH_DIR, f"{kind}_{n_rows}_model.pkl")
+            cmd = [sys.executable, train_py, "--data", data, "--vectorizer", vec_out,
+                   "--model", model_out, "--vectorizer-type", kind,
+                   "--metrics-out", os.path.join(BENCH_DIR, f"{kind}_{n_rows}_metrics.json")]
+            fit_seconds, peak_rss_mb = run_measured(cmd)
+
+            vec = joblib.load(vec_out)
+            start = time.perf_counter()
+            vec.transform(batch)
+            serial = time.perf_counter() - start
+            start = time.perf_counter()
+            parallel_transform(vec, batch, workers)
+            parallel = time.perf_counter() - start
+
+            metrics = evaluate(model_out, vec_out, test_path, n_boot=0, metrics_out=os.devnull)
+            row = {
+                "rows": n_rows,
+                "vectorizer": kind,
+                "fit_seconds": round(fit_seconds, 2),
+                "peak_rss_mb": round(peak_rss_mb, 1),
+                "vectorizer_bytes": os.path.getsize(vec_out),
+                "model_bytes": os.path.getsize(model_out),
+                "transform_rows_per_s": round(len(batch) / serial, 1),
+                f"transform_rows_per_s_{workers}_workers": round(len(batch) / parallel, 1),
+                "accuracy": metrics["accuracy"],
+                "f1": metrics["f1"],
+            }
+            print(f"{n_rows:>9} rows  {kind:<8} fit {row['fit_seconds']:>7.2f}s  "
+                  f"vectorizer {row['vectorizer_bytes'] / 1024:>9.1f} KB  "
+                  f"{row['transform_rows_per_s']:>9.0f} rows/s  acc {row['accuracy']:.4f}")
+            results.append(row)
+    return results
+
+
+def main():
+    """Compare the vocabulary TF-IDF vectorizer with the hashing one."""
+    p = argparse.ArgumentParser(description="Benchmark TF-IDF vs hashing vectorizers.")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                   help="Synthetic corpus sizes (rows).")
+    p.add_argument("--test-data", default="data/processed/test.csv",
+                   help="Reviews used for throughput and metrics.")
+    p.add_argument("--workers", type=int, default=4,
+                   help="Processes for the chunked parallel transform.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    results = bench(args.sizes, args.test_data, args.workers)
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
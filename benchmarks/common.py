@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import subprocess
+import numpy as np
+import pandas as pd
+
+SOURCE_PATH = "data/processed/train.csv"
+BENCH_DIR = "data/bench"
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def synthesize_corpus(
+    n_rows: int,
+    source_path: str = SOURCE_PATH,
+    out_dir: str = BENCH_DIR,
+    seed: int = 0,
+    chunksize: int = 100_000
+) -> str:
+    """Write a CSV of ``n_rows`` reviews resampled from ``source_path`` and return its path.
+
+    Rows are drawn with replacement and half of them are spliced with a second review,
+    so the corpus grows in vocabulary as well as in length. Files are reused across runs.
+    """
+    out_path = os.path.join(out_dir, f"reviews_{n_rows}.csv")
+    if os.path.exists(out_path):
+        return out_path
+    os.makedirs(out_dir, exist_ok=True)
+
+    source = pd.read_csv(source_path)
+    reviews = source["Review"].astype(str).to_numpy()
+    labels = source["Liked"].to_numpy()
+    rng = np.random.default_rng(seed)
+
+    tmp_path = out_path + ".tmp"
+    for start in range(0, n_rows, chunksize):
+        size = min(chunksize, n_rows - start)
+        first = rng.integers(0, len(reviews), size)
+        second = rng.integers(0, len(reviews), size)
+        splice = rng.random(size) < 0.5
+        text = np.where(splice, np.char.add(np.char.add(reviews[first], " "), reviews[second]),
+                        reviews[first])
+        chunk = pd.DataFrame({"Review": text, "Liked": labels[first]})
+        chunk.to_csv(tmp_path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def run_measured(cmd: list[str]) -> tuple[float, float]:
+    """Run ``cmd`` as a child process and return (wall seconds, peak RSS in MB)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark command failed ({proc.returncode}): {' '.join(cmd)}")
+    # ru_maxrss is reported in KB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return elapsed, usage.ru_maxrss / scale
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+import pandas as pd
+
+OUT_PATH = "output/load_test.json"
+TIMEOUT = 30.0
+
+
+async def _client(host: str, port: int, reviews: list[str], deadline: float,
+                  latencies: list[float], errors: list[str]) -> None:
+    """Send requests one after another over a single keep-alive connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = np.random.default_rng(len(latencies) + id(writer))
+    try:
+        while time.perf_counter() < deadline:
+            body = json.dumps({"review": reviews[rng.integers(len(reviews))]}).encode("utf-8")
+            request = (f"POST /predict HTTP/1.1\r\nHost: {host}\r\n"
+                       "Content-Type: application/json\r\n"
+                       f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), TIMEOUT)
+            length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length"))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n")[0].decode("latin-1"))
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, reviews: list[str], concurrency: int,
+                   duration: float) -> dict:
+    """Drive the server with ``concurrency`` closed-loop clients for ``duration`` seconds."""
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(host, port, reviews, deadline, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p90, p99 = (np.percentile(latencies, [50, 90, 99]) * 1000 if latencies
+                     else [float("nan")] * 3)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "qps": round(len(latencies) / elapsed, 1),
+        "latency_p50_ms": round(float(p50), 3),
+        "latency_p90_ms": round(float(p90), 3),
+        "latency_p99_ms": round(float(p99), 3),
+    }
+
+
+def main():
+    """Load-test a running serve.py instance and report QPS and latency percentiles."""
+    p = argparse.ArgumentParser(description="Closed-loop load generator for src/serve.py.")
+    p.add_argument("--host", default="127.0.0.1", help="Server host.")
+    p.add_argument("--port", type=int, default=8080, help="Server port.")
+    p.add_argument("--data", default="data/processed/test.csv", help="Reviews to send.")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128],
+                   help="Concurrent connections; one run per value.")
+    p.add_argument("--duration", type=float, default=10.0, help="Seconds per run.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    reviews = pd.read_csv(args.data)["Review"].astype(str).tolist()
+    results = []
+    for concurrency in args.concurrency:
+        row = asyncio.run(run_load(args.host, args.port, reviews, concurrency, args.duration))
+        print(f"{concurrency:>5} clients  {row['qps']:>9.1f} req/s"
+              f"  p50 {row['latency_p50_ms']:.2f}ms  p90 {row['latency_p90_ms']:.2f}ms  p99 {row['latency_p99_ms']:.2f}ms"
+              f"  errors {row['errors']}")
+        results.append(row)
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import time
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from common import synthesize_corpus, run_measured, SRC_DIR, BENCH_DIR
+
+OUT_PATH = "output/benchmarks.json"
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+SIZES = [10_000, 100_000, 1_000_000]
+TOLERANCE = 0.25
+LATENCY_SAMPLES = 1000
+THROUGHPUT_ROWS = 20_000
+LOAD_REPEATS = 5
+# Metrics where a larger value is better; everything else is a cost
+HIGHER_IS_BETTER = {"throughput_rows_per_s"}
+
+
+def bench_size(n_rows: int, test_path: str) -> dict:
+    """Train on a synthetic corpus of ``n_rows`` and measure loading and inference."""
+    data = synthesize_corpus(n_rows)
+    vec_out = os.path.join(BENCH_DIR, f"suite_{n_rows}_vectorizer.pkl")
+    model_out = os.path.join(BENCH_DIR, f"suite_{n_rows}_model.pkl")
+    cmd = [sys.executable, os.path.join(SRC_DIR, "train.py"), "--data", data,
+           "--vectorizer", vec_out, "--model", model_out,
+           "--metrics-out", os.path.join(BENCH_DIR, f"suite_{n_rows}_train_metrics.json")]
+    train_seconds, train_rss = run_measured(cmd)
+
+    load_times = []
+    for _ in range(LOAD_REPEATS):
+        start = time.perf_counter()
+        vec, clf = joblib.load(vec_out), joblib.load(model_out)
+        load_times.append(time.perf_counter() - start)
+
+    reviews = pd.read_csv(test_path)["Review"].astype(str).tolist()
+    rng = np.random.default_rng(0)
+    sample = [reviews[i] for i in rng.integers(0, len(reviews), LATENCY_SAMPLES)]
+    latencies = []
+    for text in sample:
+        start = time.perf_counter()
+        clf.predict_proba(vec.transform([text]))
+        latencies.append(time.perf_counter() - start)
+
+    batch = [reviews[i] for i in rng.integers(0, len(reviews), THROUGHPUT_ROWS)]
+    start = time.perf_counter()
+    clf.predict_proba(vec.transform(batch))
+    batch_seconds = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return {
+        "train_seconds": round(train_seconds, 3),
+        "train_peak_rss_mb": round(train_rss, 1),
+        "load_seconds": round(min(load_times), 4),
+        "latency_p50_ms": round(float(p50), 3),
+        "latency_p99_ms": round(float(p99), 3),
+        "throughput_rows_per_s": round(THROUGHPUT_ROWS / batch_seconds, 1),
+    }
+
+
+def compare(results: dict, baselines: dict, tolerance: float = TOLERANCE) -> list[str]:
+    """Return a description of every metric that regressed beyond ``tolerance``."""
+    regressions = []
+    for size, metrics in results.items():
+        for name, value in metrics.items():
+            baseline = baselines.get(size, {}).get(name)
+            if not baseline:
+                continue
+            change = (value - baseline) / baseline
+            if name in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(f"{size} rows: {name} {value} vs baseline {baseline} "
+                                   f"({change:+.0%} worse, tolerance {tolerance:.0%})")
+    return regressions
+
+
+def main():
+    """Run the suite, compare it against the stored baselines and exit non-zero on regression."""
+    p = argparse.ArgumentParser(description="Training, loading and inference benchmarks.")
+    p.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                   help="Synthetic corpus sizes (rows).")
+    p.add_argument("--test-data", default="data/processed/test.csv",
+                   help="Reviews used for latency and throughput.")
+    p.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against.")
+    p.add_argument("--tolerance", type=float, default=TOLERANCE,
+                   help="Allowed relative regression per metric (0.25 = 25%%).")
+    p.add_argument("--update-baseline", action="store_true",
+                   help="Store this run's results as the new baselines.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write the JSON report.")
+    args = p.parse_args()
+
+    results = {}
+    for n_rows in args.sizes:
+        results[str(n_rows)] = metrics = bench_size(n_rows, args.test_data)
+        print(f"{n_rows:>9} rows  " + "  ".join(f"{k}={v}" for k, v in metrics.items()))
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)
+    if args.update_baseline:
+        baselines.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Updated baselines in {args.baseline}")
+        return
+
+    regressions = compare(results, baselines, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
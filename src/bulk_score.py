@@ -0,0 +1,155 @@
+import os
+import csv
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from data_prep import iter_table
+from predict import read_reviews
+from profiler import span, profile_stage, add_profile_args
+
+CHUNK_SIZE = 5000
+OUTPUT_PATH = "output/bulk_predictions.csv"
+
+# Artifacts of the current worker process, loaded once by _load_artifacts
+_ARTIFACTS = None
+
+
+def _load_artifacts(model_path: str, vectorizer_path: str,
+                    calibrator_path: str | None = None) -> None:
+    """Load the vectorizer and model into this process; used as the pool initializer."""
+    # pylint: disable=global-statement
+    global _ARTIFACTS
+    calibrator = None
+    if calibrator_path is not None:
+        from calibrate import Calibrator  # pylint: disable=import-outside-toplevel
+        calibrator = Calibrator.load(calibrator_path)
+    _ARTIFACTS = (joblib.load(vectorizer_path), joblib.load(model_path), calibrator)
+
+
+def _transform_chunk(texts: list[str]) -> sp.csr_matrix:
+    vec, _, _ = _ARTIFACTS
+    return vec.transform(texts)
+
+
+def _score_chunk(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    vec, clf, calibrator = _ARTIFACTS
+    probs = clf.predict_proba(vec.transform(texts))[:, 1]
+    if calibrator is not None:
+        probs = calibrator.transform(probs)
+        return clf.classes_[(probs >= calibrator.threshold).astype(int)], probs
+    return clf.classes_[(probs > 0.5).astype(int)], probs
+
+
+def iter_reviews(path: str, text_column: str = "Review", chunksize: int = CHUNK_SIZE):
+    """Yield chunks of review texts from a CSV, Parquet, Feather or JSONL file."""
+    if path.endswith(".jsonl"):
+        yield from read_reviews(path, text_column, chunksize)
+        return
+    for chunk in iter_table(path, chunksize, [text_column]):
+        # An empty file still yields one empty frame, which the vectorizer rejects
+        if len(chunk):
+            yield chunk[text_column].astype(str).tolist()
+
+
+def _ordered_map(pool, fn, chunks, max_pending: int):
+    """Like ``pool.map`` over ``chunks`` but with at most ``max_pending`` chunks in flight.
+
+    Results come back in input order while the input is consumed lazily, so memory
+    stays bounded by ``max_pending`` chunks however large the input is.
+    """
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(fn, chunk))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _pool(model_path: str, vectorizer_path: str, workers: int,
+          calibrator_path: str | None = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_load_artifacts,
+                               initargs=(model_path, vectorizer_path, calibrator_path))
+
+
+def bulk_transform(
+    texts: list[str],
+    model_path: str = "artifacts/model.pkl",
+    vectorizer_path: str = "artifacts/vectorizer.pkl",
+    workers: int = 1,
+    chunksize: int = CHUNK_SIZE
+) -> sp.csr_matrix:
+    """Transform ``texts`` in chunks on ``workers`` processes and stack the rows in order."""
+    if not texts:
+        # sp.vstack needs at least one block; hashing vectorizers have no vocabulary_
+        vec = joblib.load(vectorizer_path)
+        n_features = getattr(vec, "n_features", None) or len(vec.vocabulary_)
+        return sp.csr_matrix((0, n_features))
+    chunks = (texts[i:i + chunksize] for i in range(0, len(texts), chunksize))
+    with _pool(model_path, vectorizer_path, workers) as pool:
+        parts = list(_ordered_map(pool, _transform_chunk, chunks, 2 * workers))
+    return sp.vstack(parts, format="csr")
+
+
+def bulk_score(
+    input_path: str,
+    output_path: str = OUTPUT_PATH,
+    model_path: str = "artifacts/model.pkl",
+    vectorizer_path: str = "artifacts/vectorizer.pkl",
+    workers: int = 1,
+    chunksize: int = CHUNK_SIZE,
+    text_column: str = "Review",
+    calibrator_path: str | None = None
+) -> int:
+    """Score every review in ``input_path`` on a process pool; return the number of rows.
+
+    Each worker loads the artifacts once when it starts. Chunks are transformed and
+    scored in the workers, and predictions are appended to ``output_path`` in input
+    order as soon as each chunk (and all chunks before it) is done. With
+    ``calibrator_path`` the probabilities are calibrated and thresholded by calibrate.py's
+    calibrator.
+    """
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    n_rows = 0
+    chunks = iter_reviews(input_path, text_column, chunksize)
+    with _pool(model_path, vectorizer_path, workers, calibrator_path) as pool, \
+            open(output_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["prediction", "probability"])
+        for labels, probs in _ordered_map(pool, _score_chunk, chunks, 2 * workers):
+            writer.writerows(zip(labels.tolist(), np.round(probs, 6).tolist()))
+            n_rows += len(probs)
+    return n_rows
+
+
+def main():
+    """Parse arguments and score a review file on several processes."""
+    p = argparse.ArgumentParser(description="Score a large review file on a process pool.")
+    p.add_argument("--model", default="artifacts/model.pkl", help="Path to model .pkl.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Path to vectorizer .pkl.")
+    p.add_argument("--input", required=True,
+                   help="Reviews to score (CSV, Parquet, Feather or JSONL).")
+    p.add_argument("--output", default=OUTPUT_PATH, help="CSV file to write predictions to.")
+    p.add_argument("--text-column", default="Review", help="Field holding the review text.")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Scoring processes.")
+    p.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="Reviews per task.")
+    p.add_argument("--calibrator", default=None,
+                   help="Calibrator from calibrate.py (e.g. artifacts/calibrator.pkl) to apply.")
+    add_profile_args(p, "bulk_score")
+    args = p.parse_args()
+
+    with profile_stage("bulk_score", args.profile, args.profile_mode):
+        with span("score"):
+            n_rows = bulk_score(args.input, args.output, args.model, args.vectorizer,
+                                args.workers, args.chunksize, args.text_column,
+                                args.calibrator)
+    print(f"Wrote {n_rows} predictions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
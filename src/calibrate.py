@@ -0,0 +1,323 @@
+import os
+import argparse
+import joblib
+import numpy as np
+from profiler import span, profile_stage, add_profile_args, write_json
+
+CALIBRATOR_PATH = "artifacts/calibrator.pkl"
+REPORT_PATH = "output/calibration.json"
+METHODS = ("isotonic", "platt")
+N_BINS = 10
+FOLDS = 5
+# Decision rules compared on held-out folds, simplest first (see select_threshold)
+THRESHOLD_RULES = ("model", "default", "tuned")
+EPS = 1e-6
+
+
+def _logit(p: np.ndarray) -> np.ndarray:
+    p = np.clip(p, EPS, 1 - EPS)
+    return np.log(p / (1 - p))
+
+
+class Calibrator:
+    """Map raw positive-class scores to calibrated probabilities and a decision threshold.
+
+    Only a few floats are stored: the isotonic step function as knots evaluated with
+    ``np.interp``, or the two Platt coefficients, so applying it costs one vectorized
+    pass over the scores. ``save`` writes them as a plain dict, so loading needs
+    neither sklearn nor this module's class to be importable under the same name.
+    """
+
+    def __init__(self, method: str = "isotonic"):
+        if method not in METHODS:
+            raise ValueError(f"Unknown calibration method {method!r}; expected one of {METHODS}")
+        self.method = method
+        self.threshold = 0.5
+        # Isotonic knots or Platt coefficients, set by fit()
+        self.x_ = self.y_ = None
+        self.a_ = self.b_ = None
+
+    def fit(self, scores: np.ndarray, y: np.ndarray) -> "Calibrator":
+        """Fit the score -> probability mapping on held-out scores and 0/1 labels."""
+        # Fitting needs sklearn; applying a saved calibrator (the scoring path) does not
+        # pylint: disable=import-outside-toplevel
+        from sklearn.isotonic import IsotonicRegression
+        from sklearn.linear_model import LogisticRegression
+        if self.method == "isotonic":
+            iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip").fit(scores, y)
+            self.x_, self.y_ = iso.X_thresholds_, iso.y_thresholds_
+        else:
+            lr = LogisticRegression(C=1e6).fit(_logit(scores)[:, None], y)
+            self.a_, self.b_ = float(lr.coef_[0, 0]), float(lr.intercept_[0])
+        return self
+
+    def transform(self, scores: np.ndarray) -> np.ndarray:
+        """Calibrated positive-class probabilities of raw ``scores``."""
+        scores = np.asarray(scores, dtype=np.float64)
+        if self.method == "isotonic":
+            return np.interp(scores, self.x_, self.y_)
+        return 1.0 / (1.0 + np.exp(-(self.a_ * _logit(scores) + self.b_)))
+
+    def predict(self, scores: np.ndarray) -> np.ndarray:
+        """Positive-class decision (0/1) for raw ``scores``."""
+        return (self.transform(scores) >= self.threshold).astype(int)
+
+    def save(self, path: str) -> None:
+        """Write the fitted parameters to ``path``."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(dict(vars(self)), path)
+
+    @classmethod
+    def load(cls, path: str = CALIBRATOR_PATH) -> "Calibrator":
+        """Load a calibrator written by ``save``."""
+        params = joblib.load(path)
+        calibrator = cls(params["method"])
+        vars(calibrator).update(params)
+        return calibrator
+
+
+def threshold_costs(
+    y: np.ndarray,
+    scores: np.ndarray,
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Total misclassification cost of predicting ``scores >= t`` for every cutpoint ``t``.
+
+    Scores are sorted once; cumulative sums of positives and negatives above each
+    distinct score give the true and false positives at that cutpoint, so all
+    thresholds are evaluated in O(n log n) without re-predicting. The candidate
+    cutpoints lie halfway between consecutive distinct scores, plus +inf (nothing
+    positive) and -inf (everything positive).
+    """
+    order = np.argsort(-scores, kind="stable")
+    sorted_scores, sorted_y = scores[order], y[order]
+    # Last index of each run of equal scores: everything up to it is predicted positive
+    last = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(scores) - 1]
+    tp = np.cumsum(sorted_y)[last]
+    fp = (last + 1) - tp
+    fn = sorted_y.sum() - tp
+    distinct = sorted_scores[last]
+    cutpoints = np.r_[np.inf, (distinct[:-1] + distinct[1:]) / 2, -np.inf]
+    costs = np.r_[cost_fn * sorted_y.sum(), cost_fp * fp + cost_fn * fn]
+    return cutpoints, costs
+
+
+def best_threshold(y: np.ndarray, scores: np.ndarray, cost_fp: float = 1.0,
+                   cost_fn: float = 1.0) -> tuple[float, float]:
+    """The cost-minimizing cutpoint and its total cost."""
+    cutpoints, costs = threshold_costs(y, scores, cost_fp, cost_fn)
+    best = int(np.argmin(costs))
+    return float(cutpoints[best]), float(costs[best])
+
+
+def calibration_metrics(y: np.ndarray, probs: np.ndarray, n_bins: int = N_BINS) -> dict:
+    """Brier score, log loss and expected calibration error over equal-width bins."""
+    bins = np.minimum((probs * n_bins).astype(int), n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    gap = np.abs(np.bincount(bins, weights=probs, minlength=n_bins)
+                 - np.bincount(bins, weights=y, minlength=n_bins))
+    clipped = np.clip(probs, EPS, 1 - EPS)
+    log_loss = -np.mean(y * np.log(clipped) + (1 - y) * np.log(1 - clipped))
+    return {
+        "brier": round(float(np.mean((probs - y) ** 2)), 4),
+        "log_loss": round(float(log_loss), 4),
+        "ece": round(float(gap.sum() / max(count.sum(), 1)), 4),
+    }
+
+
+def cross_fit(
+    scores: np.ndarray,
+    y: np.ndarray,
+    method: str = "isotonic",
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0,
+    folds: int = FOLDS
+) -> tuple[np.ndarray, dict[str, float]]:
+    """Out-of-fold calibrated probabilities and the held-out cost of each threshold rule.
+
+    Each fold is calibrated from the other folds and then decided by every rule in
+    ``THRESHOLD_RULES``: the model's own cutoff (raw score 0.5, mapped through the
+    fold's calibrator), 0.5 on the calibrated probability, and the cost-optimal
+    threshold picked on the other folds.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sklearn.model_selection import StratifiedKFold
+    out_of_fold = np.empty(len(scores))
+    thresholds = {rule: np.empty(len(scores)) for rule in THRESHOLD_RULES}
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    for fit_idx, eval_idx in splitter.split(scores[:, None], y):
+        fold = Calibrator(method).fit(scores[fit_idx], y[fit_idx])
+        out_of_fold[eval_idx] = fold.transform(scores[eval_idx])
+        thresholds["model"][eval_idx] = fold.transform(0.5)
+        thresholds["default"][eval_idx] = 0.5
+        thresholds["tuned"][eval_idx], _ = best_threshold(
+            y[fit_idx], fold.transform(scores[fit_idx]), cost_fp, cost_fn)
+
+    costs = {}
+    for rule, threshold in thresholds.items():
+        predicted = out_of_fold >= threshold
+        costs[rule] = float(cost_fp * np.sum(predicted & (y == 0))
+                            + cost_fn * np.sum(~predicted & (y == 1)))
+    return out_of_fold, costs
+
+
+def select_threshold(
+    calibrator: Calibrator,
+    scores: np.ndarray,
+    y: np.ndarray,
+    costs: dict[str, float],
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0
+) -> str:
+    """Set ``calibrator.threshold`` by the rule with the lowest held-out cost; return it.
+
+    Ties go to the simpler rule, so an in-sample optimum that did not pay off on the
+    held-out folds is never saved for inference.
+    """
+    rule = min(THRESHOLD_RULES, key=costs.__getitem__)
+    if rule == "model":
+        calibrator.threshold = float(calibrator.transform(0.5))
+    elif rule == "default":
+        calibrator.threshold = 0.5
+    else:
+        calibrator.threshold, _ = best_threshold(y, calibrator.transform(scores),
+                                                 cost_fp, cost_fn)
+    return rule
+
+
+def cross_fitted_scores(
+    vectorizer,
+    model,
+    reviews: list[str],
+    labels: np.ndarray,
+    folds: int = FOLDS,
+    token_cache: str | None = None,
+    clean_texts: list[str] | None = None
+) -> np.ndarray:
+    """Positive-class score of every review from a model fitted without it.
+
+    Each fold is scored by unfitted clones of ``vectorizer`` and ``model`` (same
+    hyperparameters) fitted on the other folds, as in sklearn's
+    ``CalibratedClassifierCV``. The reviews are tokenized once for all folds.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sklearn.base import clone
+    from sklearn.model_selection import StratifiedKFold
+    from preprocess import tokenize_corpus, pretokenized
+    docs = np.array(tokenize_corpus(reviews, token_cache, clean_texts=clean_texts), dtype=object)
+    positive = list(model.classes_).index(1) if 1 in model.classes_ else 1
+    scores = np.empty(len(docs))
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    for fit_idx, eval_idx in splitter.split(docs, labels):
+        vec = pretokenized(clone(vectorizer))
+        clf = clone(model).fit(vec.fit_transform(docs[fit_idx].tolist()), labels[fit_idx])
+        scores[eval_idx] = clf.predict_proba(vec.transform(docs[eval_idx].tolist()))[:, positive]
+    return scores
+
+
+def calibrate(
+    model_path: str = "artifacts/model.pkl",
+    vectorizer_path: str = "artifacts/vectorizer.pkl",
+    data_path: str | None = None,
+    calibrator_out: str = CALIBRATOR_PATH,
+    method: str = "isotonic",
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0,
+    report_out: str = REPORT_PATH,
+    cache_dir: str | None = None,
+    token_cache: str | None = None
+) -> dict:
+    """Fit a calibrator and decision threshold on held-out scores; return the report.
+
+    By default the scores are ``cross_fitted_scores`` of the training split, so
+    neither the test split that evaluate.py reports on nor rows a model was fitted
+    on are used. With ``data_path`` (a validation split the model has not seen)
+    that file is scored by the trained model, once through the feature cache
+    (``cache_dir``, default the shared one), so re-runs reuse the score vector.
+    The before/after metrics are cross-fitted: each fold is calibrated by a
+    calibrator fitted on the other folds, so they are not measured on the data
+    the calibrator saw. The same folds choose the decision threshold (see
+    ``select_threshold``).
+    """
+    # pylint: disable=import-outside-toplevel
+    from data_prep import read_split, column_or_none, split_path
+    from feature_cache import FeatureCache, CACHE_DIR
+    with span("score"):
+        cache = FeatureCache(cache_dir or CACHE_DIR, vectorizer_path, model_path)
+        if data_path is None:
+            source = split_path("train")
+            df = read_split(source, ["Review", "Liked"])
+            y = (df["Liked"].to_numpy() == 1).astype(int)
+            scores = cross_fitted_scores(cache.vectorizer, cache.model,
+                                         df["Review"].astype(str).tolist(),
+                                         df["Liked"].to_numpy(), token_cache=token_cache,
+                                         clean_texts=column_or_none(df, "clean_text"))
+        else:
+            source = data_path
+            features = cache.features(data_path)
+            positive = list(cache.model.classes_).index(1) if 1 in cache.model.classes_ else 1
+            scores, y = features.proba[:, positive], (features.y == 1).astype(int)
+
+    with span("cross_fit"):
+        out_of_fold, costs = cross_fit(scores, y, method, cost_fp, cost_fn)
+
+    with span("fit"):
+        calibrator = Calibrator(method).fit(scores, y)
+        rule = select_threshold(calibrator, scores, y, costs, cost_fp, cost_fn)
+
+    before = scores > 0.5
+    report = {
+        "method": method,
+        "data": source,
+        "cross_fitted_scores": data_path is None,
+        "n": len(y),
+        "threshold": round(calibrator.threshold, 6),
+        "threshold_rule": rule,
+        "cost_fp": cost_fp,
+        "cost_fn": cost_fn,
+        "before": {**calibration_metrics(y, scores),
+                   "cost": float(cost_fp * np.sum(before & (y == 0))
+                                 + cost_fn * np.sum(~before & (y == 1)))},
+        "after": {**calibration_metrics(y, out_of_fold), "cost": costs[rule]},
+        "threshold_costs": costs,
+    }
+    with span("write"):
+        calibrator.save(calibrator_out)
+        write_json(report, report_out)
+    print(f"{method} calibration: "
+          f"ECE {report['before']['ece']:.4f} -> {report['after']['ece']:.4f}, "
+          f"cost {report['before']['cost']:.0f} -> {report['after']['cost']:.0f} "
+          f"(threshold {calibrator.threshold:.4f})")
+    return report
+
+
+def main():
+    """Parse arguments and fit the calibrator."""
+    p = argparse.ArgumentParser(
+        description="Calibrate probabilities and pick a decision threshold.")
+    p.add_argument("--model", default="artifacts/model.pkl", help="Path to model .pkl.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Path to vectorizer .pkl.")
+    p.add_argument("--data", default=None,
+                   help="Validation split scored by the trained model (default: cross-fitted "
+                        "scores of the training split; never the test split).")
+    p.add_argument("--out", default=CALIBRATOR_PATH, help="Where to write the calibrator.")
+    p.add_argument("--method", choices=METHODS, default="isotonic", help="Calibration method.")
+    p.add_argument("--cost-fp", type=float, default=1.0, help="Cost of a false positive.")
+    p.add_argument("--cost-fn", type=float, default=1.0, help="Cost of a false negative.")
+    p.add_argument("--report", default=REPORT_PATH, help="Where to write the JSON report.")
+    p.add_argument("--cache-dir", default=None,
+                   help="Feature/score cache directory (default: data/cache/features).")
+    p.add_argument("--token-cache", default=None,
+                   help="Token cache written by preprocess.py, for the cross-fitted scores.")
+    add_profile_args(p, "calibrate")
+    args = p.parse_args()
+    with profile_stage("calibrate", args.profile, args.profile_mode):
+        calibrate(args.model, args.vectorizer, args.data, args.out, args.method,
+                  args.cost_fp, args.cost_fn, args.report, args.cache_dir, args.token_cache)
+
+
+if __name__ == "__main__":
+    main()
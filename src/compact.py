@@ -0,0 +1,183 @@
+import os
+import copy
+import time
+import argparse
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from data_prep import read_table
+from evaluate import evaluate
+from profiler import span, profile_stage, add_profile_args, write_json
+
+REPORT_PATH = "output/compaction.json"
+THRESHOLD = 0.1
+METHODS = ("threshold", "l1")
+LOAD_REPEATS = 5
+THROUGHPUT_REPEATS = 5
+
+
+def threshold_mask(clf, threshold: float = THRESHOLD) -> np.ndarray:
+    """Features whose absolute coefficient is at least ``threshold``."""
+    return np.abs(clf.coef_).max(axis=0) >= threshold
+
+
+def l1_mask(x, labels, c: float = 1.0) -> np.ndarray:
+    """Features kept (non-zero) by an L1-regularized logistic regression on ``x``."""
+    l1 = LogisticRegression(penalty="l1", C=c, solver="liblinear", random_state=0)
+    return np.abs(l1.fit(x, labels).coef_).max(axis=0) > 0
+
+
+def prune(vec, clf, keep: np.ndarray) -> tuple:
+    """Return copies of ``vec`` and ``clf`` restricted to the features in ``keep``.
+
+    Kept features keep their relative column order and IDF weights. The vectorizer's
+    ``stop_words_`` (terms cut by ``max_features``, only needed for introspection) is
+    dropped as well, since it is pickled with the vectorizer.
+    """
+    columns = np.flatnonzero(keep)
+    remap = np.full(len(keep), -1)
+    remap[columns] = np.arange(len(columns))
+    small_vec = copy.deepcopy(vec)
+    small_vec.vocabulary_ = {term: int(remap[col]) for term, col in vec.vocabulary_.items()
+                             if keep[col]}
+    small_vec.idf_ = vec.idf_[columns]
+    small_vec._tfidf.n_features_in_ = len(columns)  # pylint: disable=protected-access
+    small_vec.stop_words_ = set()
+    small_clf = copy.deepcopy(clf)
+    small_clf.coef_ = clf.coef_[:, columns]
+    small_clf.n_features_in_ = len(columns)
+    return small_vec, small_clf
+
+
+def artifact_stats(vec_path: str, model_path: str, reviews: list[str]) -> dict:
+    """On-disk size, load time and transform + predict throughput of a saved model."""
+    load_times = []
+    for _ in range(LOAD_REPEATS):
+        start = time.perf_counter()
+        vec, clf = joblib.load(vec_path), joblib.load(model_path)
+        load_times.append(time.perf_counter() - start)
+    transform_times = []
+    for _ in range(THROUGHPUT_REPEATS):
+        start = time.perf_counter()
+        clf.predict_proba(vec.transform(reviews))
+        transform_times.append(time.perf_counter() - start)
+    return {
+        "features": len(vec.vocabulary_),
+        "size_bytes": os.path.getsize(vec_path) + os.path.getsize(model_path),
+        "load_seconds": round(min(load_times), 5),
+        "rows_per_second": round(len(reviews) / min(transform_times), 1),
+    }
+
+
+def compact(
+    model_path: str,
+    vectorizer_path: str,
+    train_path: str,
+    test_path: str,
+    model_out: str,
+    vectorizer_out: str,
+    method: str = "threshold",
+    threshold: float = THRESHOLD,
+    c: float = 1.0,
+    refit: bool = True,
+    report_out: str = REPORT_PATH
+) -> dict:
+    """Prune low-weight features from a trained model and report what it costs and saves.
+
+    ``method="threshold"`` keeps features with ``|coef| >= threshold``; ``"l1"`` keeps
+    the features an L1-regularized refit (inverse strength ``c``) leaves non-zero. Dropping
+    columns changes each document's L2 norm, so with ``refit`` the classifier is
+    refit on the training data over the reduced vocabulary.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}")
+    with span("load_artifacts"):
+        vec, clf = joblib.load(vectorizer_path), joblib.load(model_path)
+    if not hasattr(vec, "vocabulary_"):
+        raise ValueError("Compaction needs a vocabulary-based vectorizer, "
+                         f"got {type(vec).__name__}")
+
+    train = None
+    if method == "l1" or refit:
+        with span("read_table"):
+            train = read_table(train_path, ["Review", "Liked"])
+    if method == "l1":
+        with span("select_features"):
+            keep = l1_mask(vec.transform(train["Review"].tolist()), train["Liked"].values, c)
+    else:
+        keep = threshold_mask(clf, threshold)
+    if not keep.any():
+        raise ValueError("Compaction would drop every feature; lower the threshold")
+
+    small_vec, small_clf = prune(vec, clf, keep)
+    if refit:
+        with span("classifier_fit"):
+            small_clf.fit(small_vec.transform(train["Review"].tolist()), train["Liked"].values)
+    for path in (model_out, vectorizer_out):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(small_vec, vectorizer_out)
+    joblib.dump(small_clf, model_out)
+
+    with span("read_table"):
+        reviews = read_table(test_path, ["Review"])["Review"].tolist()
+    report = {"method": method, "threshold": threshold if method == "threshold" else None,
+              "C": c if method == "l1" else None, "refit": refit}
+    for name, (m_path, v_path) in {"before": (model_path, vectorizer_path),
+                                   "after": (model_out, vectorizer_out)}.items():
+        with span(f"evaluate_{name}"):
+            metrics = evaluate(m_path, v_path, test_path, n_boot=0, metrics_out=os.devnull)
+        with span(f"measure_{name}"):
+            report[name] = {"accuracy": metrics["accuracy"], "f1": metrics["f1"],
+                            **artifact_stats(v_path, m_path, reviews)}
+    before, after = report["before"], report["after"]
+    report["delta"] = {
+        "accuracy": after["accuracy"] - before["accuracy"],
+        "f1": after["f1"] - before["f1"],
+        "features": after["features"] - before["features"],
+        "size_ratio": after["size_bytes"] / before["size_bytes"],
+        "speedup": after["rows_per_second"] / before["rows_per_second"],
+    }
+
+    print(f"Features: {before['features']} -> {after['features']}, "
+          f"size: {before['size_bytes']} -> {after['size_bytes']} bytes, "
+          f"throughput x{report['delta']['speedup']:.2f}")
+    print(f"Accuracy delta: {report['delta']['accuracy']:+.4f}, "
+          f"F1 delta: {report['delta']['f1']:+.4f}")
+    write_json(report, report_out)
+    return report
+
+
+def main():
+    """Parse arguments and compact the trained model."""
+    p = argparse.ArgumentParser(description="Drop low-weight features from a trained model.")
+    p.add_argument("--model", default="artifacts/model.pkl", help="Trained model .pkl.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Trained vectorizer .pkl.")
+    p.add_argument("--train-data", default="data/processed/train.csv",
+                   help="Training split, used by --method l1 and the refit.")
+    p.add_argument("--test-data", default="data/processed/test.csv",
+                   help="Test split the before/after metrics are measured on.")
+    p.add_argument("--model-out", default="artifacts/compact_model.pkl",
+                   help="Where to save the compacted model.")
+    p.add_argument("--vectorizer-out", default="artifacts/compact_vectorizer.pkl",
+                   help="Where to save the compacted vectorizer.")
+    p.add_argument("--method", choices=METHODS, default="threshold",
+                   help="Drop features by coefficient magnitude or by an L1 refit.")
+    p.add_argument("--threshold", type=float, default=THRESHOLD,
+                   help="Smallest |coefficient| kept by --method threshold.")
+    p.add_argument("--C", type=float, default=1.0,
+                   help="Inverse L1 strength for --method l1 (smaller keeps fewer features).")
+    p.add_argument("--no-refit", dest="refit", action="store_false",
+                   help="Keep the original coefficients instead of refitting on the kept features.")
+    p.add_argument("--output", default=REPORT_PATH, help="Where to write the JSON report.")
+    add_profile_args(p, "compact")
+    args = p.parse_args()
+    with profile_stage("compact", args.profile, args.profile_mode):
+        compact(args.model, args.vectorizer, args.train_data, args.test_data, args.model_out,
+                args.vectorizer_out, args.method, args.threshold, args.C, args.refit,
+                args.output)
+
+
+if __name__ == "__main__":
+    main()
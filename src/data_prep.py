@@ -1,40 +1,328 @@
 import os
+import json
+import hashlib
+import argparse
+from collections import Counter
 import pandas as pd
 from sklearn.model_selection import train_test_split
+from profiler import span, profile_stage, add_profile_args
 
 RAW_PATH = "data/raw/reviews.tsv"
 TRAIN_PATH = "data/processed/train.csv"
 TEST_PATH = "data/processed/test.csv"
+MANIFEST_PATH = "data/processed/manifest.json"
+PROCESSED_DIR = "data/processed"
+# File extension -> table format; columnar formats are read zero-parse and column-selectively
+TABLE_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+FORMAT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# Precomputed per-row columns of columnar splits; readers use them when present
+DERIVED_COLUMNS = ["clean_text", "length"]
 
-def split_data(
-    raw_path: str,
-    train_out: str,
-    test_out: str,
-    test_size: float = 0.2,
-    random_state: int = 0
-) -> None:
-    """Split raw data into train and test sets and save as CSV."""
+def table_format(path: str) -> str:
+    """Return the table format of ``path`` from its extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in TABLE_FORMATS:
+        raise ValueError(f"Unsupported table format {ext!r} for {path}; "
+                         f"expected one of {sorted(TABLE_FORMATS)}")
+    return TABLE_FORMATS[ext]
+
+def split_path(name: str, directory: str = PROCESSED_DIR, fmt: str | None = None) -> str:
+    """Return the processed ``name`` split ("train"/"test") in format ``fmt``.
+
+    The format is never guessed from which files exist: DVC tracks the CSV splits,
+    so a leftover columnar copy must not silently replace them. ``fmt`` defaults to
+    ``$SPLIT_FORMAT`` or "csv".
+    """
+    fmt = fmt or os.environ.get("SPLIT_FORMAT", "csv")
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown split format {fmt!r}; expected one of "
+                         f"{sorted(FORMAT_EXTENSIONS)}")
+    return os.path.join(directory, name + FORMAT_EXTENSIONS[fmt])
+
+def read_table(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Read a CSV, Parquet or Feather table, loading only ``columns`` if given."""
+    fmt = table_format(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+def table_columns(path: str) -> list[str]:
+    """Return the column names of a table without reading its rows."""
+    fmt = table_format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+        return pq.read_schema(path).names
+    if fmt == "feather":
+        from pyarrow import feather  # pylint: disable=import-outside-toplevel
+        return feather.read_table(path, memory_map=True).column_names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+def read_split(path: str, columns: list[str]) -> pd.DataFrame:
+    """Read ``columns`` of a split plus whichever ``DERIVED_COLUMNS`` it has."""
+    present = set(table_columns(path))
+    return read_table(path, columns + [c for c in DERIVED_COLUMNS if c in present])
+
+def column_or_none(df: pd.DataFrame, name: str) -> list | None:
+    """Return ``df[name]`` as a list, or None if the split has no such column."""
+    return df[name].tolist() if name in df else None
+
+def iter_table(path: str, chunksize: int, columns: list[str] | None = None):
+    """Yield a table in DataFrame chunks of at most ``chunksize`` rows."""
+    fmt = table_format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "feather":
+        from pyarrow import feather  # pylint: disable=import-outside-toplevel
+        # Memory-mapped, so only the sliced chunk is materialized
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        for start in range(0, table.num_rows, chunksize):
+            yield table.slice(start, chunksize).to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+def with_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add ``clean_text`` (``clean_review`` output) and ``length`` (words) columns.
+
+    Uses vectorized string operations equivalent to ``lib_ml``'s ``clean_review``.
+    """
+    text = df["Review"].astype(str)
+    return df.assign(
+        clean_text=text.str.lower().str.replace(r"[^a-z0-9\s]", "", regex=True),
+        length=text.str.split().str.len().astype("int32"),
+    )
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    """Atomically write a split; columnar formats also get the derived columns."""
+    fmt = table_format(path)
+    tmp_path = path + ".tmp"
+    if fmt == "csv":
+        df.to_csv(tmp_path, index=False, encoding="utf-8")
+    else:
+        columnar = with_derived_columns(df[["Review", "Liked"]]).reset_index(drop=True)
+        if fmt == "parquet":
+            columnar.to_parquet(tmp_path, index=False)
+        else:
+            columnar.to_feather(tmp_path)
+    os.replace(tmp_path, path)
+
+def append_table(df: pd.DataFrame, path: str) -> None:
+    """Append rows to a split; columnar files are rewritten since they cannot be appended to."""
+    if table_format(path) == "csv":
+        df.to_csv(path, mode="a", header=False, index=False, encoding="utf-8")
+    else:
+        existing = read_table(path, columns=["Review", "Liked"])
+        write_table(pd.concat([existing, df[["Review", "Liked"]]], ignore_index=True), path)
+
+def read_raw(raw_path: str) -> pd.DataFrame:
+    """Read the raw review TSV and validate its schema."""
     try:
-        df = pd.read_csv(raw_path, sep="\t", quoting=3)
+        with span("read_table"):
+            df = pd.read_csv(raw_path, sep="\t", quoting=3)
     except Exception as e:
         raise RuntimeError(f"Failed to read TSV at {raw_path}: {e}") from e
 
     expected = {"Review", "Liked"}
     if not expected.issubset(df.columns):
         raise ValueError(f"Expected columns {expected}, got {set(df.columns)}")
+    return df
 
-    train, test = train_test_split(
-        df, test_size=test_size, random_state=random_state, stratify=df["Liked"]
-    )
+def row_hashes(df: pd.DataFrame) -> list[str]:
+    """Return a stable 64-bit content hash per (Review, Liked) row."""
+    return [
+        hashlib.sha256(f"{review}\t{liked}".encode("utf-8")).hexdigest()[:16]
+        for review, liked in zip(df["Review"].astype(str), df["Liked"])
+    ]
+
+def in_test_split(row_hash: str, test_size: float) -> bool:
+    """Deterministically assign a row to the test split from its hash alone."""
+    return int(row_hash[:8], 16) / 0x100000000 < test_size
+
+def group_test_mask(df: pd.DataFrame, test_size: float) -> list[bool]:
+    """Test-split membership per row from its ``dup_group`` (see dedup.py).
+
+    Every row of a near-duplicate group gets the same assignment, so no group
+    straddles the train/test boundary.
+    """
+    return [in_test_split(group, test_size) for group in df["dup_group"].astype(str)]
+
+def _split_groups(
+    df: pd.DataFrame,
+    hashes: list[str],
+    train_out: str,
+    test_out: str,
+    test_size: float
+) -> int:
+    """Bring the splits in line with a deduplicated input (one with ``dup_group``).
+
+    A row's split is a function of its group, so the expected splits are fully
+    determined by the input. When the persisted splits are contained in them, only
+    the missing rows are appended. Otherwise (rows dropped by dedup, groups that
+    straddle the boundary, splits made before dedup) both splits are rewritten
+    once from the input. Returns the number of rows written.
+    """
+    to_test = group_test_mask(df, test_size)
+    rows = df[["Review", "Liked"]]
+    outputs = {False: train_out, True: test_out}
+    expected = {False: [], True: []}
+    for i, test in enumerate(to_test):
+        expected[test].append(i)
+    existing = {test: Counter(row_hashes(read_table(path, ["Review", "Liked"])))
+                for test, path in outputs.items() if os.path.exists(path)}
+
+    if len(existing) == 2 and all(existing[test] <= Counter(hashes[i] for i in expected[test])
+                                  for test in outputs):
+        new_rows = {}
+        for test, indices in expected.items():
+            seen, new_rows[test] = Counter(), []
+            for i in indices:
+                seen[hashes[i]] += 1
+                if seen[hashes[i]] > existing[test][hashes[i]]:
+                    new_rows[test].append(i)
+        with span("write_table"):
+            for test, path in outputs.items():
+                append_table(rows.iloc[new_rows[test]], path)
+        n_new = len(new_rows[False]) + len(new_rows[True])
+        print(f"Appended {len(new_rows[False])} train / {len(new_rows[True])} test samples; "
+              f"{len(df) - n_new} rows unchanged")
+        return n_new
+
+    with span("write_table"):
+        for test, path in outputs.items():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            write_table(rows.iloc[expected[test]], path)
+    print(f"Re-split {len(expected[False])} train / {len(expected[True])} test samples by "
+          f"dup_group: the existing splits had rows missing from the input or on the wrong "
+          f"side of their group")
+    return len(df)
+
+def _write_manifest(manifest: Counter, manifest_path: str) -> None:
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+def split_data(
+    raw_path: str,
+    train_out: str,
+    test_out: str,
+    test_size: float = 0.2,
+    random_state: int = 0,
+    manifest_path: str | None = None
+) -> None:
+    """Split raw data into train and test sets and save them as CSV, Parquet or Feather.
+
+    The output format follows the file extension of ``train_out``/``test_out``. If
+    the input has a ``dup_group`` column (dedup.py output), whole groups are
+    assigned to one split by their group hash instead of a stratified shuffle.
+    """
+    df = read_raw(raw_path)
+
+    with span("split"):
+        if "dup_group" in df.columns:
+            to_test = group_test_mask(df, test_size)
+            rows = df[["Review", "Liked"]]
+            train, test = rows[[not t for t in to_test]], rows[to_test]
+        else:
+            train, test = train_test_split(
+                df, test_size=test_size, random_state=random_state, stratify=df["Liked"]
+            )
 
     os.makedirs(os.path.dirname(train_out), exist_ok=True)
     os.makedirs(os.path.dirname(test_out), exist_ok=True)
-    train.to_csv(train_out, index=False, encoding="utf-8")
-    test.to_csv(test_out, index=False, encoding="utf-8")
+    with span("write_table"):
+        write_table(train, train_out)
+        write_table(test, test_out)
+    if manifest_path is not None:
+        with span("hash_rows"):
+            hashes = row_hashes(df)
+        _write_manifest(Counter(hashes), manifest_path)
     print(f"Wrote {len(train)} train / {len(test)} test samples")
 
+def split_incremental(
+    raw_path: str,
+    train_out: str,
+    test_out: str,
+    manifest_path: str = MANIFEST_PATH,
+    test_size: float = 0.2,
+    random_state: int = 0
+) -> int:
+    """Append only rows not yet in the manifest to the train/test splits; return their count.
+
+    Rows already split never move. New rows are assigned by ``in_test_split`` on
+    their content hash, so the assignment does not depend on what else was appended.
+    Without a manifest, existing splits are adopted as-is (or created with
+    ``split_data`` if missing). A deduplicated input (with ``dup_group``) is instead
+    reconciled against the splits by ``_split_groups``, which drops rows that are no
+    longer in the input and keeps every group on one side.
+    """
+    if not os.path.exists(manifest_path):
+        if not (os.path.exists(train_out) and os.path.exists(test_out)):
+            split_data(raw_path, train_out, test_out, test_size, random_state, manifest_path)
+            return len(read_raw(raw_path))
+        known = pd.concat([read_table(train_out, ["Review", "Liked"]),
+                           read_table(test_out, ["Review", "Liked"])])
+        _write_manifest(Counter(row_hashes(known)), manifest_path)
+
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = Counter(json.load(f))
+
+    df = read_raw(raw_path)
+    with span("hash_rows"):
+        hashes = row_hashes(df)
+    if "dup_group" in df.columns:
+        n_written = _split_groups(df, hashes, train_out, test_out, test_size)
+        _write_manifest(Counter(hashes), manifest_path)
+        return n_written
+    # Count occurrences so that a repeated review appended later is still picked up
+    seen, new_rows, new_hashes = Counter(), [], []
+    for i, row_hash in enumerate(hashes):
+        seen[row_hash] += 1
+        if seen[row_hash] > manifest[row_hash]:
+            new_rows.append(i)
+            new_hashes.append(row_hash)
+
+    new = df.iloc[new_rows][["Review", "Liked"]]
+    to_test = [in_test_split(row_hash, test_size) for row_hash in new_hashes]
+    train, test = new[[not t for t in to_test]], new[to_test]
+    with span("write_table"):
+        append_table(train, train_out)
+        append_table(test, test_out)
+
+    manifest.update(new_hashes)
+    _write_manifest(manifest, manifest_path)
+    print(f"Appended {len(train)} train / {len(test)} test samples; "
+          f"{len(df) - len(new)} rows unchanged")
+    return len(new)
+
 def main():
-    split_data(RAW_PATH, TRAIN_PATH, TEST_PATH)
+    """Parse arguments and split the raw data."""
+    p = argparse.ArgumentParser(description="Split raw reviews into train and test sets.")
+    p.add_argument("--raw", default=RAW_PATH, help="Path to raw reviews TSV.")
+    p.add_argument("--train-out", default=TRAIN_PATH, help="Path to write the train split.")
+    p.add_argument("--test-out", default=TEST_PATH, help="Path to write the test split.")
+    p.add_argument("--format", choices=list(FORMAT_EXTENSIONS), default=None,
+                   help="Output format; replaces the extension of --train-out/--test-out "
+                        "(default: follow their extensions).")
+    p.add_argument("--incremental", action="store_true",
+                   help="Only split rows appended since the last run (see --manifest).")
+    p.add_argument("--manifest", default=MANIFEST_PATH, help="Row-hash manifest of split rows.")
+    add_profile_args(p, "data_prep")
+    args = p.parse_args()
+    if args.format is not None:
+        ext = FORMAT_EXTENSIONS[args.format]
+        args.train_out = os.path.splitext(args.train_out)[0] + ext
+        args.test_out = os.path.splitext(args.test_out)[0] + ext
+
+    with profile_stage("data_prep", args.profile, args.profile_mode):
+        if args.incremental:
+            split_incremental(args.raw, args.train_out, args.test_out, args.manifest)
+        else:
+            split_data(args.raw, args.train_out, args.test_out, manifest_path=args.manifest)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,197 @@
+import os
+import csv
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from profiler import span, profile_stage, add_profile_args, write_json
+
+RAW_PATH = "data/raw/reviews.tsv"
+OUT_PATH = "data/interim/reviews.tsv"
+REPORT_PATH = "output/dedup_report.json"
+CHUNK_SIZE = 100_000
+SHINGLE = 5
+NUM_PERM = 64
+BANDS = 8
+THRESHOLD = 0.8
+SEED = 0
+
+
+def normalize_text(reviews: pd.Series) -> pd.Series:
+    """Lowercase, keep only ``[a-z0-9]`` words and collapse whitespace (as ``clean_review``)."""
+    return (reviews.astype(str).str.lower()
+            .str.replace(r"[^a-z0-9\s]", "", regex=True)
+            .str.split().str.join(" "))
+
+
+def text_hashes(normalized: pd.Series) -> np.ndarray:
+    """Stable 64-bit hash of each normalized text."""
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _permutations(num_perm: int = NUM_PERM, seed: int = SEED) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash(normalized: list[str], num_perm: int = NUM_PERM, k: int = SHINGLE,
+            seed: int = SEED) -> np.ndarray:
+    """MinHash signatures (``len(normalized)`` x ``num_perm`` uint32) of character k-grams.
+
+    The texts of a chunk are concatenated into one byte buffer; every k-byte window
+    that lies inside one text is hashed at once with NumPy, then each of the
+    ``num_perm`` multiply-shift hash functions is min-reduced per text.
+    """
+    if not normalized:
+        return np.empty((0, num_perm), dtype=np.uint32)
+    texts = [text.ljust(k) for text in normalized]
+    buffer = np.frombuffer("".join(texts).encode("ascii", "ignore"), dtype=np.uint8)
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    n_windows = len(buffer) - k + 1
+    shingles = np.zeros(n_windows, dtype=np.uint64)
+    for j in range(k):
+        shingles = shingles * np.uint64(257) + buffer[j:j + n_windows]
+    # Keep windows that start and end inside the same text
+    starts = np.arange(len(shingles))
+    doc = np.searchsorted(offsets, starts, side="right") - 1
+    valid = starts + k <= offsets[doc + 1]
+    shingles, doc = shingles[valid], doc[valid]
+    first = np.searchsorted(doc, np.arange(len(texts)))
+
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for i in range(num_perm):
+        hashed = (a[i] * shingles + b[i]) >> np.uint64(32)
+        signatures[:, i] = np.minimum.reduceat(hashed, first)
+    return signatures
+
+
+def near_duplicate_groups(signatures: np.ndarray, bands: int = BANDS,
+                          threshold: float = THRESHOLD) -> np.ndarray:
+    """Connected-component label per row, joining rows whose MinHash similarity >= threshold.
+
+    Rows are bucketed per LSH band; each bucket member is compared with the first
+    member of its bucket, and accepted pairs are merged transitively.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    left, right = [], []
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        _, bucket = np.unique(keys, return_inverse=True)
+        order = np.argsort(bucket, kind="stable")
+        sorted_bucket = bucket[order]
+        run_start = np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]]
+        heads = order[run_start][np.cumsum(run_start) - 1]
+        pairs = heads != order
+        head, member = heads[pairs], order[pairs]
+        similar = (signatures[head] == signatures[member]).mean(axis=1) >= threshold
+        left.append(head[similar])
+        right.append(member[similar])
+    left, right = np.concatenate(left), np.concatenate(right)
+    graph = sp.coo_matrix((np.ones(len(left), dtype=np.int8), (left, right)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+def dedup(
+    raw_path: str = RAW_PATH,
+    out_path: str = OUT_PATH,
+    report_out: str = REPORT_PATH,
+    chunksize: int = CHUNK_SIZE,
+    threshold: float = THRESHOLD
+) -> dict:
+    """Drop exact duplicates and tag near-duplicate groups; return the report.
+
+    Two passes over ``raw_path`` in chunks of ``chunksize`` rows. The first hashes
+    the normalized text of every row, keeps the first row per hash and computes
+    MinHash signatures for those rows only; LSH then groups near duplicates. The
+    second pass streams the kept rows to ``out_path`` with a ``dup_group`` column
+    (the normalized-text hash of the group's first row), which data_prep.py uses
+    to put a whole group on the same side of the split. Memory grows with the
+    number of distinct rows (8 bytes of hash and ``NUM_PERM`` * 4 bytes of
+    signature each), not with the review text.
+    """
+    start = time.perf_counter()
+    seen = np.empty(0, dtype=np.uint64)
+    keep, kept_hashes, signatures = [], [], []
+    with span("minhash"):
+        for chunk in pd.read_csv(raw_path, sep="\t", quoting=3, chunksize=chunksize):
+            normalized = normalize_text(chunk["Review"])
+            hashes = text_hashes(normalized)
+            _, first = np.unique(hashes, return_index=True)
+            is_first = np.zeros(len(hashes), dtype=bool)
+            is_first[first] = True
+            is_new = is_first & ~np.isin(hashes, seen)
+            seen = np.union1d(seen, hashes[is_new])
+            keep.append(is_new)
+            kept_hashes.append(hashes[is_new])
+            signatures.append(minhash(normalized[is_new].tolist()))
+    keep = np.concatenate(keep)
+    kept_hashes = np.concatenate(kept_hashes)
+    with span("lsh"):
+        labels = near_duplicate_groups(np.concatenate(signatures), threshold=threshold)
+    # Name every group after the hash of its first row, so ids are content-based
+    representative = np.full(labels.max() + 1 if len(labels) else 0, len(labels))
+    np.minimum.at(representative, labels, np.arange(len(labels)))
+    groups = np.char.mod("%016x", kept_hashes[representative[labels]])
+
+    with span("write_table"):
+        if os.path.dirname(out_path):
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        tmp_path, row, written = out_path + ".tmp", 0, 0
+        chunks = pd.read_csv(raw_path, sep="\t", quoting=3, chunksize=chunksize)
+        for i, chunk in enumerate(chunks):
+            mask = keep[row:row + len(chunk)]
+            row += len(chunk)
+            kept = chunk[mask].assign(dup_group=groups[written:written + mask.sum()])
+            written += int(mask.sum())
+            kept.to_csv(tmp_path, sep="\t", index=False, quoting=csv.QUOTE_NONE,
+                        mode="a" if i else "w", header=not i)
+        os.replace(tmp_path, out_path)
+
+    seconds = time.perf_counter() - start
+    sizes = np.bincount(labels) if len(labels) else np.empty(0, dtype=np.int64)
+    report = {
+        "rows_in": len(keep),
+        "rows_out": written,
+        "exact_duplicates_removed": len(keep) - written,
+        "near_duplicate_groups": int((sizes > 1).sum()),
+        "rows_in_near_duplicate_groups": int(sizes[sizes > 1].sum()),
+        "threshold": threshold,
+        "seconds": round(seconds, 3),
+        "seconds_per_million_rows": round(seconds / max(len(keep), 1) * 1e6, 2),
+    }
+    print(f"Removed {report['exact_duplicates_removed']} exact duplicates of {len(keep)} rows; "
+          f"{report['rows_in_near_duplicate_groups']} rows in "
+          f"{report['near_duplicate_groups']} near-duplicate groups "
+          f"({report['seconds_per_million_rows']:.1f}s per million rows)")
+    write_json(report, report_out)
+    return report
+
+
+def main():
+    """Parse arguments and deduplicate the raw reviews."""
+    p = argparse.ArgumentParser(description="Remove duplicate and group near-duplicate reviews.")
+    p.add_argument("--raw", default=RAW_PATH, help="Raw reviews TSV.")
+    p.add_argument("--out", default=OUT_PATH, help="Deduplicated TSV with a dup_group column.")
+    p.add_argument("--report", default=REPORT_PATH, help="Where to write the JSON report.")
+    p.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="Rows read per pass step.")
+    p.add_argument("--threshold", type=float, default=THRESHOLD,
+                   help="Estimated Jaccard similarity of 5-gram sets that marks near duplicates.")
+    add_profile_args(p, "dedup")
+    args = p.parse_args()
+    with profile_stage("dedup", args.profile, args.profile_mode):
+        dedup(args.raw, args.out, args.report, args.chunksize, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,217 @@
 import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from profiler import span, profile_stage, add_profile_args
 
 RAW_URL = "https://raw.githubusercontent.com/proksch/restaurant-sentiment/main/a1_RestaurantReviews_HistoricDump.tsv"
 OUT_PATH = "data/raw/reviews.tsv"
+MANIFEST_PATH = "download_manifest.json"
+CHUNK_SIZE = 1 << 16
+RETRIES = 5
+BACKOFF = 1.0
+TIMEOUT = 30
+# Transient server responses retried with the same backoff as dropped connections
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
-resp = requests.get(RAW_URL, timeout=30)
-resp.raise_for_status()
-with open(OUT_PATH, "wb") as f:
-    f.write(resp.content)
-print(f"Downloaded raw data to {OUT_PATH}")
+# requests.Session is not thread-safe, so each download thread gets its own
+_local = threading.local()
+
+
+def sha256_file(path: str) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> list[dict]:
+    """Return the pinned download entries: dicts with ``url``, ``path`` and ``sha256``."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["files"]
+
+
+def _session():
+    """The calling thread's ``requests.Session``, created on first use."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _retrying(call, url: str, retries: int = RETRIES, backoff: float = BACKOFF):
+    """Return ``call()``, retrying network errors and ``RETRY_STATUSES`` with backoff."""
+    attempt = 0
+    while True:
+        try:
+            return call()
+        except (requests.ConnectionError, requests.Timeout,
+                requests.exceptions.ChunkedEncodingError, requests.HTTPError) as e:
+            if isinstance(e, requests.HTTPError) and e.response.status_code not in RETRY_STATUSES:
+                raise
+            if attempt == retries:
+                raise RuntimeError(f"Request to {url} failed after {retries + 1} attempts: {e}") \
+                    from e
+            print(f"Request to {url} failed ({e}); retrying in {backoff * 2 ** attempt:.1f}s")
+            time.sleep(backoff * 2 ** attempt)
+            attempt += 1
+
+
+def _state_path(out_path: str) -> str:
+    # ETag and hash of the last completed download, next to the file itself
+    return out_path + ".download.json"
+
+
+def _read_state(out_path: str) -> dict:
+    try:
+        with open(_state_path(out_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_state(out_path: str, state: dict) -> None:
+    with open(_state_path(out_path), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def _is_current(out_path: str, sha256: str | None, session, url: str,
+                retries: int = RETRIES, backoff: float = BACKOFF) -> bool:
+    """Whether ``out_path`` already holds the wanted content, so no download is needed."""
+    if not os.path.exists(out_path):
+        return False
+    if sha256 is not None:
+        return sha256_file(out_path) == sha256
+    # Unpinned: ask the server whether our copy (by ETag) is still current
+    state = _read_state(out_path)
+    if not state.get("etag") or state.get("sha256") != sha256_file(out_path):
+        return False
+
+    def head():
+        resp = session.head(url, headers={"If-None-Match": state["etag"]}, timeout=TIMEOUT,
+                            allow_redirects=True)
+        if resp.status_code in RETRY_STATUSES:
+            resp.raise_for_status()
+        return resp
+
+    resp = _retrying(head, url, retries, backoff)
+    return resp.status_code == 304 or resp.headers.get("ETag") == state["etag"]
+
+
+def _fetch(session, url: str, out_path: str, state: dict, pinned: bool) -> str | None:
+    """Stream ``url`` into the ``.part`` file, resuming from its current size; return the ETag."""
+    part_path = out_path + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if offset and not pinned and not state.get("partial_etag"):
+        # Nothing (no checksum, no ETag) would tell a changed remote file apart: start over
+        offset = 0
+    headers = {}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if state.get("partial_etag"):
+            # Resume only if the remote file is unchanged; otherwise the server sends it all
+            headers["If-Range"] = state["partial_etag"]
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as resp:
+        if resp.status_code == 416 and offset:
+            return resp.headers.get("ETag") or state.get("partial_etag")
+        resp.raise_for_status()
+        mode = "ab" if offset and resp.status_code == 206 else "wb"
+        etag = resp.headers.get("ETag") or state.get("partial_etag")
+        if etag != state.get("partial_etag"):
+            state["partial_etag"] = etag
+            _write_state(out_path, state)
+        with open(part_path, mode) as f:
+            for block in resp.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(block)
+    return etag
+
+
+def download_file(
+    url: str,
+    out_path: str,
+    sha256: str | None = None,
+    session=None,
+    retries: int = RETRIES,
+    backoff: float = BACKOFF
+) -> bool:
+    """Download ``url`` to ``out_path``; return False if the local copy was already current.
+
+    The body is streamed in chunks to ``out_path + ".part"``. After a network error
+    or a transient status (``RETRY_STATUSES``) the download resumes from the partial
+    file with an HTTP Range request, up to ``retries`` times with exponential backoff.
+    The result must match ``sha256`` if given; the file is only moved into place once
+    complete and verified.
+    """
+    session = session or _session()
+    if _is_current(out_path, sha256, session, url, retries, backoff):
+        print(f"{out_path} is up to date; skipping download")
+        return False
+
+    if os.path.dirname(out_path):
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    part_path = out_path + ".part"
+    state = _read_state(out_path)
+    # Each retry resumes from whatever the previous attempt left in the .part file
+    etag = _retrying(lambda: _fetch(session, url, out_path, state, sha256 is not None),
+                     url, retries, backoff)
+
+    digest = sha256_file(part_path)
+    if sha256 is not None and digest != sha256:
+        os.remove(part_path)
+        raise RuntimeError(f"Checksum mismatch for {url}: expected {sha256}, got {digest}")
+    os.replace(part_path, out_path)
+    _write_state(out_path, {"url": url, "etag": etag, "sha256": digest})
+    print(f"Downloaded {url} to {out_path} (sha256 {digest})")
+    return True
+
+
+def download_all(entries: list[dict], workers: int = 4, allow_unpinned: bool = False) -> int:
+    """Download every manifest entry (e.g. dataset shards) concurrently; return how many ran.
+
+    Entries without a ``sha256`` cannot be verified, so they are refused unless
+    ``allow_unpinned`` is set, and then only downloaded with a warning.
+    """
+    unpinned = [entry["path"] for entry in entries if not entry.get("sha256")]
+    if unpinned and not allow_unpinned:
+        raise ValueError(f"No pinned sha256 for {', '.join(unpinned)}; add it to the manifest "
+                         "or pass --allow-unpinned to download without verification")
+    for path in unpinned:
+        print(f"WARNING: {path} has no pinned sha256; its content is not verified")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(download_file, entry["url"], entry["path"], entry.get("sha256"))
+                   for entry in entries]
+        return sum(future.result() for future in futures)
+
+
+def main():
+    """Parse arguments and download the raw data listed in the manifest."""
+    p = argparse.ArgumentParser(description="Download the raw restaurant reviews.")
+    p.add_argument("--manifest", default=MANIFEST_PATH,
+                   help="JSON manifest of files to fetch with their pinned SHA-256.")
+    p.add_argument("--url", default=None, help="Fetch this URL instead of the manifest entries.")
+    p.add_argument("--out", default=OUT_PATH, help="Where to write --url.")
+    p.add_argument("--sha256", default=None, help="Expected SHA-256 of --url.")
+    p.add_argument("--workers", type=int, default=4, help="Concurrent downloads.")
+    p.add_argument("--allow-unpinned", action="store_true",
+                   help="Download entries without a pinned SHA-256 (with a warning).")
+    add_profile_args(p, "download")
+    args = p.parse_args()
+
+    if args.url is not None:
+        entries = [{"url": args.url, "path": args.out, "sha256": args.sha256}]
+    elif os.path.exists(args.manifest):
+        entries = load_manifest(args.manifest)
+    else:
+        entries = [{"url": RAW_URL, "path": OUT_PATH, "sha256": None}]
+    with profile_stage("download", args.profile, args.profile_mode):
+        with span("download"):
+            download_all(entries, args.workers, args.allow_unpinned)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,197 @@
+import re
 import json
 import argparse
-import pandas as pd
+import numpy as np
 import joblib
-from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, precision_score, recall_score
+import scipy.sparse as sp
+from profiler import span, profile_stage, add_profile_args
 
-def evaluate(model_path: str, vectorizer_path: str, test_data_path: str) -> None:
+METRICS_PATH = "output/metrics.json"
+N_BOOTSTRAP = 1000
+# Upper bound on replicates x samples held in memory at once during bootstrapping
+BOOTSTRAP_CELLS = 2 ** 22
+NEGATION = re.compile(r"\b(?:not|no|never|nothing|none|nor)\b|n't", re.IGNORECASE)
+LENGTH_BUCKETS = {"short": (0, 5), "medium": (6, 15), "long": (16, None)}
+
+def point_metrics(y_true: np.ndarray, y_pred: np.ndarray, scores: np.ndarray) -> dict:
+    """Return the headline metrics from labels, predictions and positive-class scores."""
+    # pylint: disable=import-outside-toplevel
+    from sklearn.metrics import (accuracy_score, f1_score, roc_auc_score, precision_score,
+                                 recall_score)
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "f1": f1_score(y_true, y_pred, zero_division=0),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "roc_auc": roc_auc_score(y_true, scores) if len(np.unique(y_true)) == 2 else None,
+    }
+
+def _weighted_metrics(weights: np.ndarray, y_true, y_pred, score_bins) -> dict:
+    """Metrics of each bootstrap replicate, given per-sample resampling counts (B x n).
+
+    ``score_bins`` is the (n x unique scores) indicator matrix of the sorted scores.
+    """
+    pos, pred = y_true.astype(np.float64), y_pred.astype(np.float64)
+    tp = weights @ (pos * pred)
+    fp = weights @ ((1 - pos) * pred)
+    fn = weights @ (pos * (1 - pred))
+    n_pos, n_neg = weights @ pos, weights @ (1 - pos)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = {
+            "accuracy": (n_pos + n_neg - fp - fn) / weights.sum(axis=1),
+            "f1": np.nan_to_num(2 * tp / (2 * tp + fp + fn)),
+            "precision": np.nan_to_num(tp / (tp + fp)),
+            "recall": np.nan_to_num(tp / (tp + fn)),
+        }
+
+        # Mann-Whitney AUC: weighted cumulative sums over the sorted distinct scores
+        pos_w = np.asarray((weights * pos) @ score_bins)
+        neg_w = np.asarray((weights * (1 - pos)) @ score_bins)
+        below = np.cumsum(neg_w, axis=1) - neg_w
+        metrics["roc_auc"] = (pos_w * (below + 0.5 * neg_w)).sum(axis=1) / (n_pos * n_neg)
+    return metrics
+
+def bootstrap_metrics(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    scores: np.ndarray,
+    n_boot: int = N_BOOTSTRAP,
+    seed: int = 0,
+    alpha: float = 0.05
+) -> dict:
+    """Percentile bootstrap confidence intervals for every headline metric.
+
+    Each replicate is a row of resampling counts built from an index matrix, and
+    all replicates of a batch (bounded by ``BOOTSTRAP_CELLS``) are evaluated with
+    matrix products. Scores are sorted once for every replicate.
+    """
+    n = len(y_true)
+    rng = np.random.default_rng(seed)
+    _, rank = np.unique(scores, return_inverse=True)
+    score_bins = sp.csr_matrix((np.ones(n), (np.arange(n), rank)))
+    batch = max(1, BOOTSTRAP_CELLS // max(n, 1))
+    replicates = {}
+    for start in range(0, n_boot, batch):
+        size = min(batch, n_boot - start)
+        index = rng.integers(0, n, (size, n)) + n * np.arange(size)[:, None]
+        weights = np.bincount(index.ravel(), minlength=size * n).reshape(size, n)
+        weights = weights.astype(np.float64)
+        for name, values in _weighted_metrics(weights, y_true, y_pred, score_bins).items():
+            replicates.setdefault(name, []).append(values)
+
+    intervals = {}
+    for name, values in replicates.items():
+        values = np.concatenate(values)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            continue
+        low, high = np.percentile(values, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+        intervals[name] = {"ci_low": float(low), "ci_high": float(high),
+                           "std": float(values.std())}
+    return intervals
+
+def slice_masks(reviews: list[str], lengths: list[int] | None = None) -> dict[str, np.ndarray]:
+    """Boolean masks for review-length buckets (in words) and presence of negation.
+
+    ``lengths`` is a split's precomputed ``length`` column; without it the words
+    are counted here.
+    """
+    if lengths is None:
+        lengths = [len(str(r).split()) for r in reviews]
+    lengths = np.asarray(lengths)
+    masks = {}
+    for name, (low, high) in LENGTH_BUCKETS.items():
+        mask = lengths >= low
+        if high is not None:
+            mask &= lengths <= high
+        masks[f"length_{name}"] = mask
+    negated = np.array([bool(NEGATION.search(str(r))) for r in reviews])
+    masks["negation"] = negated
+    masks["no_negation"] = ~negated
+    return masks
+
+def evaluate(
+    model_path: str,
+    vectorizer_path: str,
+    test_data_path: str,
+    token_cache: str | None = None,
+    n_boot: int = N_BOOTSTRAP,
+    seed: int = 0,
+    metrics_out: str = METRICS_PATH
+) -> dict:
     """Evaluate a trained model and save metrics to output/metrics.json."""
+    # pylint: disable=import-outside-toplevel
+    from preprocess import transform_cached
+    from data_prep import read_split, column_or_none
     # Load artifacts
-    vec = joblib.load(vectorizer_path)
-    clf = joblib.load(model_path)
+    with span("load_artifacts"):
+        vec = joblib.load(vectorizer_path)
+        clf = joblib.load(model_path)
 
     # Load test set
-    df = pd.read_csv(test_data_path)
+    with span("read_table"):
+        df = read_split(test_data_path, ["Review", "Liked"])
     reviews = df["Review"].tolist()
     y_true = df["Liked"].values
+    clean_texts = column_or_none(df, "clean_text")
 
     # Feature extraction
-    x_test = vec.transform(reviews)
-
-    # Predictions & metrics
-    y_pred = clf.predict(x_test)
-    acc = accuracy_score(y_true, y_pred)
-    f1 = f1_score(y_true, y_pred)
-    precision = precision_score(y_true, y_pred)
-    recall = recall_score(y_true, y_pred)
-    roc_auc = roc_auc_score(y_true, clf.predict_proba(x_test)[:, 1])
-
-    print(f"Accuracy: {acc:.4f}")
-    print(f"F1 score: {f1:.4f}")
-
-    with open("output/metrics.json", "w", encoding="utf-8") as f:
-        json.dump({
-            "accuracy": acc,
-            "f1": f1,
-            "precision": precision,
-            "recall": recall,
-            "roc_auc": roc_auc
-        }, f)
+    if token_cache is not None or clean_texts is not None:
+        x_test = transform_cached(vec, reviews, token_cache, clean_texts=clean_texts)
+    else:
+        with span("vectorizer_transform"):
+            x_test = vec.transform(reviews)
+
+    # Score once; predictions are the 0.5 cut of the positive-class probability
+    with span("predict"):
+        scores = clf.predict_proba(x_test)[:, 1]
+    y_pred = clf.classes_[(scores > 0.5).astype(int)]
+    metrics = point_metrics(y_true, y_pred, scores)
+
+    print(f"Accuracy: {metrics['accuracy']:.4f}")
+    print(f"F1 score: {metrics['f1']:.4f}")
+
+    if n_boot > 0:
+        with span("bootstrap"):
+            metrics["bootstrap"] = bootstrap_metrics(y_true, y_pred, scores, n_boot, seed)
+            metrics["slices"] = {}
+            for name, mask in slice_masks(reviews, column_or_none(df, "length")).items():
+                if not mask.any():
+                    continue
+                sliced = point_metrics(y_true[mask], y_pred[mask], scores[mask])
+                sliced["n"] = int(mask.sum())
+                sliced["bootstrap"] = bootstrap_metrics(
+                    y_true[mask], y_pred[mask], scores[mask], n_boot, seed)
+                metrics["slices"][name] = sliced
+        acc_ci = metrics["bootstrap"]["accuracy"]
+        print(f"Accuracy 95% CI: [{acc_ci['ci_low']:.4f}, {acc_ci['ci_high']:.4f}] "
+              f"({n_boot} bootstrap replicates)")
+
+    with open(metrics_out, "w", encoding="utf-8") as f:
+        json.dump(metrics, f)
+    return metrics
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Evaluate a trained sentiment model")
     parser.add_argument("--model", required=True, help="Path to saved model .pkl")
     parser.add_argument("--vectorizer", required=True, help="Path to saved vectorizer .pkl")
-    parser.add_argument("--test-data", required=True, help="Path to processed test CSV")
+    parser.add_argument("--test-data", required=True,
+                        help="Processed test split (CSV, Parquet or Feather)")
+    parser.add_argument("--token-cache", default=None, help="Token cache written by preprocess.py")
+    parser.add_argument("--bootstrap", type=int, default=N_BOOTSTRAP,
+                        help="Bootstrap replicates for confidence intervals (0 to disable)")
+    parser.add_argument("--seed", type=int, default=0, help="Bootstrap random seed")
+    parser.add_argument("--metrics-out", default=METRICS_PATH, help="Where to write metrics JSON")
+    add_profile_args(parser, "evaluate")
     args = parser.parse_args()
 
-    evaluate(
-        model_path=args.model,
-        vectorizer_path=args.vectorizer,
-        test_data_path=args.test_data
-    )
+    with profile_stage("evaluate", args.profile, args.profile_mode):
+        evaluate(
+            model_path=args.model,
+            vectorizer_path=args.vectorizer,
+            test_data_path=args.test_data,
+            token_cache=args.token_cache,
+            n_boot=args.bootstrap,
+            seed=args.seed,
+            metrics_out=args.metrics_out
+        )
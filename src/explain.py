@@ -0,0 +1,174 @@
+import os
+import json
+import argparse
+import numpy as np
+import scipy.sparse as sp
+from predict import LinearScorer, read_reviews, SCORER_PATH, BATCH_SIZE
+from profiler import span, profile_stage, add_profile_args
+
+OUTPUT_PATH = "output/explanations.jsonl"
+TOP_K = 5
+# Rows per padded block; bounds memory when a few reviews are very long
+CHUNK_SIZE = 4096
+
+
+def top_contributions(contributions: sp.csr_matrix, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Columns and values of the ``k`` largest entries of every row, largest first.
+
+    The rows are scattered into a dense ``rows x max_nnz`` block padded with -inf, so
+    one ``argpartition`` selects the top ``k`` of the whole batch. Rows with fewer
+    than ``k`` entries are padded with column -1 and value -inf.
+    """
+    n_rows = contributions.shape[0]
+    row_nnz = np.diff(contributions.indptr)
+    width = max(int(row_nnz.max(initial=0)), k)
+    rows = np.repeat(np.arange(n_rows), row_nnz)
+    positions = np.arange(contributions.nnz) - contributions.indptr[rows]
+    values = np.full((n_rows, width), -np.inf)
+    values[rows, positions] = contributions.data
+    columns = np.full((n_rows, width), -1, dtype=np.int64)
+    columns[rows, positions] = contributions.indices
+
+    top = np.argpartition(-values, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(values, top, 1), axis=1), 1)
+    return np.take_along_axis(columns, top, 1), np.take_along_axis(values, top, 1)
+
+
+class Explainer:
+    """Per-n-gram contributions to the logistic-regression margin of TF-IDF rows.
+
+    The margin of a review is ``intercept + sum_j coef[j] * x[j]``, so the
+    contribution of n-gram ``j`` is ``coef[j] * x[j]``: one sparse elementwise
+    product over the whole batch. ``terms`` maps every column back to its n-gram and
+    is built once, when the explainer is created.
+    """
+
+    def __init__(self, features, terms: np.ndarray, coef: np.ndarray, intercept: float,
+                 classes: np.ndarray):
+        self.features = features
+        self.terms = terms
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.classes = classes
+
+    @classmethod
+    def from_scorer(cls, path: str = SCORER_PATH) -> "Explainer":
+        """Explain the exported linear scorer (see predict.py); the fast path."""
+        scorer = LinearScorer.load(path)
+        table = scorer.vocabulary
+        terms = np.empty(len(scorer.idf), dtype=object)
+        terms[np.asarray(table.columns)] = [table[i].decode("utf-8") for i in range(len(table))]
+        idf = np.asarray(scorer.idf)
+
+        def features(texts):
+            x = scorer.transform(texts)
+            x.data *= idf[x.indices]
+            norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+            norms[norms == 0.0] = 1.0
+            x.data /= np.repeat(norms, np.diff(x.indptr))
+            return x
+
+        return cls(features, terms, scorer.coef, scorer.intercept, scorer.classes)
+
+    @classmethod
+    def from_pickles(cls, vectorizer, model) -> "Explainer":
+        """Explain a fitted TfidfVectorizer + LogisticRegression pair."""
+        if not hasattr(vectorizer, "vocabulary_"):
+            raise ValueError("Explanations need a vectorizer with a vocabulary (not hashing)")
+        terms = np.asarray(vectorizer.get_feature_names_out(), dtype=object)
+        return cls(vectorizer.transform, terms, model.coef_[0], model.intercept_[0],
+                   model.classes_)
+
+    def contributions(self, texts: list[str]) -> tuple[sp.csr_matrix, np.ndarray]:
+        """Sparse ``coef * x`` per review and the margins they add up to."""
+        x = sp.csr_matrix(self.features(texts))
+        x.data *= self.coef[x.indices]
+        margins = np.asarray(x.sum(axis=1)).ravel() + self.intercept
+        return x, margins
+
+    def explain(self, texts: list[str], k: int = TOP_K) -> list[dict]:
+        """Probability, prediction and top-``k`` positive/negative n-grams of every review."""
+        records = []
+        for start in range(0, len(texts), CHUNK_SIZE):
+            chunk, margins = self.contributions(texts[start:start + CHUNK_SIZE])
+            pos_cols, pos_values = top_contributions(chunk, k)
+            chunk.data = -chunk.data
+            neg_cols, neg_values = top_contributions(chunk, k)
+            # Rows are sorted, so the entries with the right sign are a prefix of each row
+            n_pos = (pos_values > 0).sum(axis=1).tolist()
+            n_neg = (neg_values > 0).sum(axis=1).tolist()
+            pos_terms, neg_terms = self.terms[pos_cols].tolist(), self.terms[neg_cols].tolist()
+            pos_values = np.round(pos_values, 6).tolist()
+            neg_values = np.round(-neg_values, 6).tolist()
+            probs = np.round(1.0 / (1.0 + np.exp(-margins)), 6).tolist()
+            labels = self.classes[(margins > 0).astype(int)].tolist()
+            for i, prob in enumerate(probs):
+                records.append({
+                    "prediction": labels[i],
+                    "probability": prob,
+                    "positive": list(zip(pos_terms[i][:n_pos[i]], pos_values[i][:n_pos[i]])),
+                    "negative": list(zip(neg_terms[i][:n_neg[i]], neg_values[i][:n_neg[i]])),
+                })
+        return records
+
+
+def explain_file(
+    explainer: Explainer,
+    input_path: str,
+    output_path: str = OUTPUT_PATH,
+    k: int = TOP_K,
+    text_column: str = "Review",
+    batch_size: int = BATCH_SIZE
+) -> int:
+    """Explain every review in a CSV or JSONL file; write one JSON line per review."""
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    n_rows = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for batch in read_reviews(input_path, text_column, batch_size):
+            with span("explain"):
+                records = explainer.explain(batch, k)
+            for text, record in zip(batch, records):
+                f.write(json.dumps({"review": text, **record}) + "\n")
+            n_rows += len(batch)
+    return n_rows
+
+
+def main():
+    """Parse arguments and explain reviews."""
+    p = argparse.ArgumentParser(description="Top n-gram contributions behind predictions.")
+    p.add_argument("--scorer", default=SCORER_PATH, help="Exported scorer to explain.")
+    p.add_argument("--model", default=None,
+                   help="Explain this model .pkl (with --vectorizer) instead of the scorer.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Path to vectorizer .pkl (with --model).")
+    p.add_argument("--text", nargs="+", help="Review(s) to explain; printed as JSON.")
+    p.add_argument("--input", help="CSV or JSONL file of reviews to explain.")
+    p.add_argument("--output", default=OUTPUT_PATH, help="JSONL file to write explanations to.")
+    p.add_argument("--text-column", default="Review", help="Field holding the review text.")
+    p.add_argument("--top-k", type=int, default=TOP_K, help="N-grams per direction.")
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Reviews per batch.")
+    add_profile_args(p, "explain")
+    args = p.parse_args()
+    if not args.text and not args.input:
+        p.error("give --text or --input")
+
+    with profile_stage("explain", args.profile, args.profile_mode):
+        with span("load_artifacts"):
+            if args.model is not None:
+                import joblib  # pylint: disable=import-outside-toplevel
+                explainer = Explainer.from_pickles(joblib.load(args.vectorizer),
+                                                   joblib.load(args.model))
+            else:
+                explainer = Explainer.from_scorer(args.scorer)
+        if args.text:
+            for text, record in zip(args.text, explainer.explain(args.text, args.top_k)):
+                print(json.dumps({"review": text, **record}, indent=2))
+        else:
+            n_rows = explain_file(explainer, args.input, args.output, args.top_k,
+                                  args.text_column, args.batch_size)
+            print(f"Wrote {n_rows} explanations to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
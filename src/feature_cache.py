@@ -0,0 +1,116 @@
+import os
+import hashlib
+from functools import cached_property
+from typing import NamedTuple
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from data_prep import read_table
+from fingerprint import content_hash, preprocessing_fingerprint
+
+CACHE_DIR = "data/cache/features"
+
+
+class Features(NamedTuple):
+    """A transformed dataset: feature rows, labels, class probabilities and predictions."""
+    X: sp.csr_matrix
+    y: np.ndarray
+    proba: np.ndarray
+    pred: np.ndarray
+
+
+class FeatureCache:
+    """Load the artifacts once and memoize each dataset's features in memory and on disk.
+
+    Entries are keyed by the content hash of the dataset and of both artifacts plus
+    the ``preprocessing_fingerprint``, so a retrained model, a changed split or an
+    upgraded lib_ml never reuses stale features. Files are written
+    under a per-process temporary name and renamed into place, so several processes
+    (e.g. pytest-xdist workers) can share ``root``: the first to finish publishes the
+    entry and later readers load it instead of transforming again.
+    """
+
+    def __init__(
+        self,
+        root: str = CACHE_DIR,
+        vectorizer_path: str = "artifacts/vectorizer.pkl",
+        model_path: str = "artifacts/model.pkl"
+    ):
+        self.root = root
+        self.vectorizer_path = vectorizer_path
+        self.model_path = model_path
+        self._keys: dict[tuple, str] = {}
+        self._tables = {}
+        self._features: dict[tuple, Features] = {}
+
+    @cached_property
+    def vectorizer(self):
+        """The fitted vectorizer, unpickled on first access."""
+        return joblib.load(self.vectorizer_path)
+
+    @cached_property
+    def model(self):
+        """The fitted classifier, unpickled on first access."""
+        return joblib.load(self.model_path)
+
+    @cached_property
+    def artifact_hash(self) -> str:
+        """Content hash of the vectorizer/model pair and the preprocessing they call."""
+        artifacts = content_hash([self.vectorizer_path, self.model_path])
+        return hashlib.sha256(f"{artifacts}-{preprocessing_fingerprint()}".encode()).hexdigest()
+
+    def key(self, data_path: str) -> str:
+        """Cache key of ``data_path`` with the current artifacts."""
+        stat = os.stat(data_path)
+        # Re-hash the file only when it changes on disk
+        signature = (os.path.abspath(data_path), stat.st_mtime_ns, stat.st_size)
+        if signature not in self._keys:
+            self._keys[signature] = f"{content_hash([data_path])[:16]}-{self.artifact_hash[:16]}"
+        return self._keys[signature]
+
+    def table(self, data_path: str):
+        """The dataset as a DataFrame, read once per file version."""
+        key = self.key(data_path)
+        if key not in self._tables:
+            self._tables[key] = read_table(data_path)
+        return self._tables[key]
+
+    def features(
+        self,
+        data_path: str,
+        text_column: str = "Review",
+        label_column: str = "Liked"
+    ) -> Features:
+        """Transformed rows, labels, probabilities and predictions of ``data_path``."""
+        key = (self.key(data_path), text_column, label_column)
+        if key not in self._features:
+            path = os.path.join(self.root, f"{key[0]}-{text_column}-{label_column}.npz")
+            if os.path.exists(path):
+                self._features[key] = _load(path)
+            else:
+                self._features[key] = self._compute(data_path, text_column, label_column)
+                _save(self._features[key], path)
+        return self._features[key]
+
+    def _compute(self, data_path: str, text_column: str, label_column: str) -> Features:
+        df = self.table(data_path)
+        x = self.vectorizer.transform(df[text_column].astype(str).tolist())
+        proba = self.model.predict_proba(x)
+        pred = self.model.classes_[proba.argmax(axis=1)]
+        return Features(x.tocsr(), df[label_column].to_numpy(), proba, pred)
+
+
+def _save(features: Features, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, data=features.X.data, indices=features.X.indices,
+                 indptr=features.X.indptr, shape=features.X.shape,
+                 y=features.y, proba=features.proba, pred=features.pred)
+    os.replace(tmp, path)
+
+
+def _load(path: str) -> Features:
+    with np.load(path) as f:
+        x = sp.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+        return Features(x, f["y"], f["proba"], f["pred"])
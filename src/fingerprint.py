@@ -0,0 +1,41 @@
+import os
+import inspect
+import hashlib
+from functools import lru_cache, partial
+from importlib.metadata import version, PackageNotFoundError
+
+
+def content_hash(paths: list[str]) -> str:
+    """SHA-256 over the names and bytes of ``paths``, independent of their order."""
+    digest = hashlib.sha256()
+    for path in sorted(paths, key=os.path.basename):
+        digest.update(os.path.basename(path).encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(partial(f.read, 1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _package_version(name: str) -> str:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@lru_cache(maxsize=1)
+def preprocessing_fingerprint() -> str:
+    """Hash of the preprocessing the pickled vectorizer calls by reference.
+
+    The pickle stores ``lib_ml.preprocessing`` functions by name, so its bytes do not
+    change when lib_ml is upgraded or its stopwords switch between the NLTK corpus
+    and the sklearn fallback. This covers the lib_ml and NLTK versions, the module's
+    source and the stopword list it resolved.
+    """
+    # pylint: disable=import-outside-toplevel
+    from lib_ml import preprocessing
+    digest = hashlib.sha256()
+    for part in (_package_version("lib_ml"), _package_version("nltk"),
+                 inspect.getsource(preprocessing), *sorted(preprocessing.STOPWORDS)):
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()
@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+N_FEATURES = 2 ** 20
+CHUNK_SIZE = 10000
+
+
+class HashingTfidfVectorizer(HashingVectorizer):
+    """TF-IDF over hashed n-gram columns, with the IDF stored only for columns seen in fit.
+
+    Transforming needs no vocabulary: n-grams are hashed straight to one of
+    ``n_features`` columns, weighted by the IDF of that column and L2-normalized.
+    Columns never seen during fit get weight 0, just as out-of-vocabulary terms are
+    dropped by ``TfidfVectorizer``. The fitted state is three small arrays
+    (``columns_``, ``doc_freq_``, ``idf_``), so the pickled vectorizer stays small
+    and chunks can be transformed in separate processes. ``partial_fit`` adds
+    document frequencies from further chunks.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def __init__(
+        self,
+        *,
+        input="content",  # pylint: disable=redefined-builtin
+        encoding="utf-8",
+        decode_error="strict",
+        strip_accents=None,
+        lowercase=True,
+        preprocessor=None,
+        tokenizer=None,
+        stop_words=None,
+        token_pattern=r"(?u)\b\w\w+\b",
+        ngram_range=(1, 1),
+        analyzer="word",
+        n_features=N_FEATURES,
+        binary=False,
+        norm="l2",
+        alternate_sign=False,
+        dtype=np.float64,
+        smooth_idf=True,
+        sublinear_tf=False
+    ):
+        super().__init__(
+            input=input, encoding=encoding, decode_error=decode_error,
+            strip_accents=strip_accents, lowercase=lowercase, preprocessor=preprocessor,
+            tokenizer=tokenizer, stop_words=stop_words, token_pattern=token_pattern,
+            ngram_range=ngram_range, analyzer=analyzer, n_features=n_features, binary=binary,
+            norm=norm, alternate_sign=alternate_sign, dtype=dtype)
+        self.smooth_idf = smooth_idf
+        self.sublinear_tf = sublinear_tf
+        # Fitted state, set by fit/partial_fit
+        self.columns_ = self.doc_freq_ = self.idf_ = None
+        self.n_docs_ = 0
+
+    def _counts(self, raw_documents) -> sp.csr_matrix:
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+        analyzer = self.build_analyzer()
+        hasher = FeatureHasher(n_features=self.n_features, input_type="string",
+                               dtype=self.dtype, alternate_sign=self.alternate_sign)
+        x = hasher.transform(analyzer(doc) for doc in raw_documents)
+        x.sum_duplicates()
+        if self.binary:
+            x.data.fill(1)
+        return x
+
+    def _add_doc_freq(self, counts: sp.csr_matrix) -> None:
+        columns, freq = np.unique(counts.indices, return_counts=True)
+        if self.columns_ is None:
+            self.columns_ = np.empty(0, dtype=np.int32)
+            self.doc_freq_ = np.empty(0, dtype=np.int64)
+            self.n_docs_ = 0
+        merged = np.union1d(self.columns_, columns).astype(np.int32)
+        doc_freq = np.zeros(len(merged), dtype=np.int64)
+        doc_freq[np.searchsorted(merged, self.columns_)] += self.doc_freq_
+        doc_freq[np.searchsorted(merged, columns)] += freq
+        self.columns_, self.doc_freq_ = merged, doc_freq
+        self.n_docs_ += counts.shape[0]
+        smooth = int(self.smooth_idf)
+        self.idf_ = np.log((self.n_docs_ + smooth) / (self.doc_freq_ + smooth)) + 1
+
+    def _weight(self, x: sp.csr_matrix) -> sp.csr_matrix:
+        if self.sublinear_tf:
+            np.log(x.data, out=x.data)
+            x.data += 1
+        if len(self.columns_) == 0:
+            # Every fitted document was empty (e.g. only stopwords): no column has an IDF
+            return sp.csr_matrix(x.shape, dtype=x.dtype)
+        pos = np.minimum(np.searchsorted(self.columns_, x.indices), len(self.columns_) - 1)
+        seen = self.columns_[pos] == x.indices
+        x.data *= np.where(seen, self.idf_[pos], 0.0)
+        x.eliminate_zeros()
+        if self.norm is not None:
+            x = normalize(x, norm=self.norm, copy=False)
+        return x
+
+    def _reset(self) -> None:
+        self.columns_ = self.doc_freq_ = self.idf_ = None
+        self.n_docs_ = 0
+
+    def partial_fit(self, X, y=None):
+        """Add the document frequencies of another chunk of documents."""
+        self._add_doc_freq(self._counts(X))
+        return self
+
+    def fit(self, X, y=None):
+        """Learn the document frequency of every hashed column seen in ``X``."""
+        self._reset()
+        return self.partial_fit(X)
+
+    def transform(self, X):
+        """Hash ``X`` to TF-IDF rows; columns unseen during fit are dropped."""
+        if self.idf_ is None:
+            raise ValueError("HashingTfidfVectorizer is not fitted yet; call fit first")
+        return self._weight(self._counts(X))
+
+    def fit_transform(self, X, y=None):
+        """Fit on ``X`` and return its TF-IDF matrix, hashing every document once."""
+        self._reset()
+        counts = self._counts(X)
+        self._add_doc_freq(counts)
+        return self._weight(counts)
+
+
+def _transform_chunk(vec, texts: list[str]):
+    return vec.transform(texts)
+
+
+def parallel_transform(vec, texts: list[str], workers: int = 1, chunksize: int = CHUNK_SIZE):
+    """Transform ``texts`` in chunks on ``workers`` processes and stack the rows in order.
+
+    Meant for stateless-at-transform vectorizers such as ``HashingTfidfVectorizer``,
+    which are cheap to ship to every worker.
+    """
+    if workers <= 1 or len(texts) <= chunksize:
+        return vec.transform(texts)
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sp.vstack(list(pool.map(_transform_chunk, [vec] * len(chunks), chunks)),
+                         format="csr")
@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from data_prep import read_table, split_path
+from predict import read_reviews, BATCH_SIZE
+from profiler import span, profile_stage, add_profile_args
+
+WINDOWS_PATH = "output/monitor.jsonl"
+SUMMARY_PATH = "output/monitor_summary.json"
+WINDOW = 1000
+# Words per review; the last bin is open-ended
+LENGTH_BINS = np.array([0, 3, 5, 8, 12, 17, 25, 40])
+SCORE_BINS = 10
+# Vocabulary terms are grouped into bins of equal reference document frequency
+TERM_BINS = 20
+SKETCH_WIDTH = 2048
+SKETCH_DEPTH = 4
+TOP_K = 10
+# Common rule of thumb: PSI above 0.2 is a significant shift
+PSI_ALERT = 0.2
+OOV_ALERT = 0.1
+EPS = 1e-4
+
+
+def _proportions(counts: np.ndarray) -> np.ndarray:
+    total = counts.sum()
+    p = counts / total if total else np.full(len(counts), 1 / len(counts))
+    return np.maximum(p, EPS)
+
+
+def psi(current: np.ndarray, reference: np.ndarray) -> float:
+    """Population stability index between two histograms over the same bins."""
+    p, q = _proportions(current), _proportions(reference)
+    return float(np.sum((p - q) * np.log(p / q)))
+
+
+def kl(current: np.ndarray, reference: np.ndarray) -> float:
+    """KL divergence of the ``current`` histogram from the ``reference`` one."""
+    p, q = _proportions(current), _proportions(reference)
+    return float(np.sum(p * np.log(p / q)))
+
+
+class CountMinSketch:
+    """Approximate token counts in ``depth`` x ``width`` counters, plus the heaviest tokens.
+
+    Estimates never undercount and overcount by at most ``2 * total / width`` with
+    probability ``1 - 2 ** -depth``. Only the ``top_k`` tokens with the largest
+    estimates are kept as strings, so memory does not grow with the stream.
+    """
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH,
+                 top_k: int = TOP_K, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self.top_k = top_k
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.a = rng.integers(1, 2 ** 63, depth, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, depth, dtype=np.uint64)
+        self.heavy: dict[str, int] = {}
+
+    def _buckets(self, tokens: list[str]) -> np.ndarray:
+        hashes = pd.util.hash_array(np.array(tokens, dtype=object))
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) >> np.uint64(33)) \
+            % np.uint64(self.width)
+
+    def add(self, tokens: list[str]) -> None:
+        """Count every occurrence in ``tokens``."""
+        if not tokens:
+            return
+        unique, counts = np.unique(np.array(tokens, dtype=object), return_counts=True)
+        buckets = self._buckets(unique.tolist())
+        # One scatter-add over every (row, bucket) pair; counts broadcast across rows
+        rows = np.arange(len(self.table))[:, None]
+        np.add.at(self.table, (rows, buckets), counts)
+        estimates = self.estimate(unique.tolist())
+        self.heavy.update(zip(unique.tolist(), estimates.tolist()))
+        if len(self.heavy) > self.top_k:
+            self.heavy = dict(sorted(self.heavy.items(), key=lambda kv: -kv[1])[:self.top_k])
+
+    def estimate(self, tokens: list[str]) -> np.ndarray:
+        """Estimated count of each token."""
+        buckets = self._buckets(tokens)
+        return np.min(self.table[np.arange(len(self.table))[:, None], buckets], axis=0)
+
+    def top(self) -> list[tuple[str, int]]:
+        """The heaviest tokens and their estimated counts, largest first."""
+        return sorted(self.heavy.items(), key=lambda kv: -kv[1])
+
+
+class WindowStats:
+    """Aggregates of a window of reviews; their size depends only on the bins and vocabulary."""
+
+    def __init__(self, n_features: int):
+        self.reviews = 0
+        self.unigrams = 0
+        self.oov = 0
+        self.score_sum = 0.0
+        self.positive = 0
+        self.length_hist = np.zeros(len(LENGTH_BINS), dtype=np.int64)
+        self.score_hist = np.zeros(SCORE_BINS, dtype=np.int64)
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.oov_terms = CountMinSketch()
+
+
+class DriftMonitor:
+    """Track OOV rate, review length, term and score drift over tumbling windows.
+
+    Reviews are analyzed once with the vectorizer's own analyzer: in-vocabulary
+    n-grams give the TF-IDF row the model scores and the document frequency of each
+    term, and out-of-vocabulary unigrams go to a count-min sketch. Every ``window``
+    reviews the aggregates are compared with the reference: length and score
+    histograms of ``reference_texts`` (the training split) and the term document
+    frequencies implied by the vectorizer's IDF.
+    """
+
+    def __init__(self, vectorizer, model, reference_texts: list[str], window: int = WINDOW):
+        self.vectorizer = vectorizer
+        self.model = model
+        self.window = window
+        self.windows = 0
+        self._analyzer = vectorizer.build_analyzer()
+        self._vocabulary = vectorizer.vocabulary_
+        self._positive = list(model.classes_).index(1) if 1 in model.classes_ else 1
+
+        # With smooth_idf, idf = ln((1 + n) / (1 + df)) + 1, so exp(1 - idf) ~ df / n
+        reference_df = np.exp(1 - vectorizer.idf_)
+        order = np.argsort(-reference_df, kind="stable")
+        mass = np.cumsum(reference_df[order]) / reference_df.sum()
+        self._term_bin = np.empty(len(order), dtype=np.int64)
+        self._term_bin[order] = np.minimum((mass * TERM_BINS).astype(np.int64), TERM_BINS - 1)
+        self.reference_terms = np.bincount(self._term_bin, weights=reference_df,
+                                           minlength=TERM_BINS)
+
+        self.reference = WindowStats(len(self._vocabulary))
+        for start in range(0, len(reference_texts), BATCH_SIZE):
+            self._observe(reference_texts[start:start + BATCH_SIZE], self.reference)
+        self.current = WindowStats(len(self._vocabulary))
+        self.total = WindowStats(len(self._vocabulary))
+
+    def _observe(self, texts: list[str], *targets: WindowStats) -> np.ndarray:
+        cols, indptr, lengths, oov_terms = [], [0], [], []
+        unigrams = 0
+        for text in texts:
+            for gram in self._analyzer(text):
+                col = self._vocabulary.get(gram)
+                if col is not None:
+                    cols.append(col)
+                if " " not in gram:
+                    unigrams += 1
+                    if col is None:
+                        oov_terms.append(gram)
+            indptr.append(len(cols))
+            lengths.append(len(text.split()))
+        counts = sp.csr_matrix((np.ones(len(cols)), cols, indptr),
+                               shape=(len(texts), len(self._vocabulary)))
+        counts.sum_duplicates()
+        # TfidfVectorizer.transform minus the second pass over the text
+        # pylint: disable=protected-access
+        scores = self.model.predict_proba(self.vectorizer._tfidf.transform(counts))
+        scores = scores[:, self._positive]
+
+        length_hist = np.bincount(np.searchsorted(LENGTH_BINS, lengths, side="right") - 1,
+                                  minlength=len(LENGTH_BINS))
+        score_hist = np.bincount(np.minimum((scores * SCORE_BINS).astype(int), SCORE_BINS - 1),
+                                 minlength=SCORE_BINS)
+        doc_freq = np.bincount(counts.indices, minlength=len(self._vocabulary))
+        for stats in targets:
+            stats.reviews += len(texts)
+            stats.unigrams += unigrams
+            stats.oov += len(oov_terms)
+            stats.score_sum += float(scores.sum())
+            stats.positive += int((scores > 0.5).sum())
+            stats.length_hist += length_hist
+            stats.score_hist += score_hist
+            stats.doc_freq += doc_freq
+            stats.oov_terms.add(oov_terms)
+        return scores
+
+    def summarize(self, stats: WindowStats) -> dict:
+        """Compare one window's aggregates with the reference."""
+        ref = self.reference
+        oov_rate = stats.oov / max(stats.unigrams, 1)
+        reference_oov_rate = ref.oov / max(ref.unigrams, 1)
+        terms = np.bincount(self._term_bin, weights=stats.doc_freq, minlength=TERM_BINS)
+        summary = {
+            "reviews": stats.reviews,
+            "oov_rate": round(oov_rate, 4),
+            "reference_oov_rate": round(reference_oov_rate, 4),
+            "length_psi": round(psi(stats.length_hist, ref.length_hist), 4),
+            "term_psi": round(psi(terms, self.reference_terms), 4),
+            "term_kl": round(kl(terms, self.reference_terms), 4),
+            "score_psi": round(psi(stats.score_hist, ref.score_hist), 4),
+            "mean_score": round(stats.score_sum / max(stats.reviews, 1), 4),
+            "positive_rate": round(stats.positive / max(stats.reviews, 1), 4),
+            "top_oov": stats.oov_terms.top(),
+        }
+        summary["alerts"] = [name for name in ("length_psi", "term_psi", "score_psi")
+                             if summary[name] > PSI_ALERT]
+        if oov_rate - reference_oov_rate > OOV_ALERT:
+            summary["alerts"].append("oov_rate")
+        return summary
+
+    def _close(self) -> dict:
+        self.windows += 1
+        summary = {"window": self.windows,
+                   "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                   **self.summarize(self.current)}
+        self.current = WindowStats(len(self._vocabulary))
+        return summary
+
+    def update(self, texts: list[str]) -> list[dict]:
+        """Add a batch of reviews; return the summaries of the windows it completed."""
+        summaries, start = [], 0
+        while start < len(texts):
+            batch = texts[start:start + self.window - self.current.reviews]
+            self._observe(batch, self.current, self.total)
+            start += len(batch)
+            if self.current.reviews == self.window:
+                summaries.append(self._close())
+        return summaries
+
+    def flush(self) -> dict | None:
+        """Summarize a partially filled window, if any."""
+        return self._close() if self.current.reviews else None
+
+
+def monitor(
+    input_path: str,
+    vectorizer_path: str = "artifacts/vectorizer.pkl",
+    model_path: str = "artifacts/model.pkl",
+    reference_path: str | None = None,
+    windows_out: str = WINDOWS_PATH,
+    summary_out: str = SUMMARY_PATH,
+    window: int = WINDOW,
+    text_column: str = "Review",
+    batch_size: int = BATCH_SIZE
+) -> dict:
+    """Stream ``input_path`` through a DriftMonitor; append window summaries as JSON lines.
+
+    Each summary is written and flushed as soon as its window closes, so the file
+    can be tailed while a long stream is processed. The overall summary is written
+    to ``summary_out`` at the end and returned.
+    """
+    with span("load_reference"):
+        reference = read_table(reference_path or split_path("train"), ["Review"])
+        monitor_ = DriftMonitor(joblib.load(vectorizer_path), joblib.load(model_path),
+                                reference["Review"].astype(str).tolist(), window)
+    for path in (windows_out, summary_out):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    alerts = {}
+    with open(windows_out, "w", encoding="utf-8") as f:
+        def write(summary):
+            for name in summary["alerts"]:
+                alerts[name] = alerts.get(name, 0) + 1
+            f.write(json.dumps(summary) + "\n")
+            f.flush()
+
+        with span("observe"):
+            for batch in read_reviews(input_path, text_column, batch_size):
+                for summary in monitor_.update(batch):
+                    write(summary)
+            last = monitor_.flush()
+            if last is not None:
+                write(last)
+
+    summary = {"windows": monitor_.windows, "window_size": window,
+               "alert_windows": alerts, **monitor_.summarize(monitor_.total)}
+    with open(summary_out, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Monitored {summary['reviews']} reviews in {monitor_.windows} windows; "
+          f"alerts: {alerts or 'none'}")
+    return summary
+
+
+def main():
+    """Parse arguments and monitor a stream of reviews for drift."""
+    p = argparse.ArgumentParser(description="Track drift and data quality of incoming reviews.")
+    p.add_argument("--input", required=True, help="CSV or JSONL file of incoming reviews.")
+    p.add_argument("--text-column", default="Review", help="Field holding the review text.")
+    p.add_argument("--model", default="artifacts/model.pkl", help="Path to model .pkl.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Path to vectorizer .pkl.")
+    p.add_argument("--reference", default=None,
+                   help="Training split for the reference histograms (default: train split).")
+    p.add_argument("--window", type=int, default=WINDOW, help="Reviews per summary window.")
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Reviews read per batch.")
+    p.add_argument("--out", default=WINDOWS_PATH, help="JSONL file of window summaries.")
+    p.add_argument("--summary", default=SUMMARY_PATH, help="JSON file of the overall summary.")
+    add_profile_args(p, "monitor")
+    args = p.parse_args()
+    with profile_stage("monitor", args.profile, args.profile_mode):
+        monitor(args.input, args.vectorizer, args.model, args.reference, args.out,
+                args.summary, args.window, args.text_column, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
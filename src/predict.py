@@ -0,0 +1,316 @@
+import os
+import re
+import csv
+import json
+import argparse
+from bisect import bisect_left
+from functools import lru_cache
+import numpy as np
+import scipy.sparse as sp
+from profiler import span, profile_stage, add_profile_args
+
+SCORER_PATH = "artifacts/scorer"
+FORMAT_VERSION = 1
+BATCH_SIZE = 4096
+NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+
+# Scoring never imports lib_ml.preprocessing up front: it imports all of NLTK, which in
+# turn loads scipy.stats, pandas and sklearn (about 1.5s of a 2.4s cold start). The
+# scorer carries its stopwords and the stems of its training words instead, and the
+# stemmer is only imported for a word it has not seen.
+
+
+def clean_review(text: str) -> str:
+    """Same normalization as ``lib_ml.preprocessing.clean_review``."""
+    return NON_ALNUM.sub("", text.lower())
+
+
+@lru_cache(maxsize=1)
+def _stemmer():
+    from lib_ml.preprocessing import STEMMER  # pylint: disable=import-outside-toplevel
+    return STEMMER
+
+
+@lru_cache(maxsize=2 ** 16)
+def _stem(token: str) -> str:
+    return _stemmer().stem(token)
+
+
+def analyze(
+    text: str,
+    ngram_range: tuple[int, int],
+    stopwords: frozenset[str],
+    stems: dict[str, str] | None = None
+) -> list[str]:
+    """Produce the n-grams the trained TfidfVectorizer extracts from ``text``.
+
+    Mirrors ``clean_review`` + ``tokenize_review`` followed by sklearn's word
+    n-gram expansion. Stems are looked up in ``stems`` first; other words are
+    stemmed with memoization across calls.
+    """
+    stems = stems or {}
+    tokens = [stems.get(tok) or _stem(tok)
+              for tok in clean_review(text).split() if tok not in stopwords]
+    min_n, max_n = ngram_range
+    grams = list(tokens) if min_n == 1 else []
+    for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+        grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+
+class StringTable:
+    """Sorted UTF-8 string table stored as one byte blob plus an offsets array.
+
+    Both arrays can be memory-mapped, so every process that opens the table
+    shares one page-cache copy. ``get`` is a binary search over the table.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, columns: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self.columns = columns
+        self._blob = memoryview(blob)
+        self._offsets = memoryview(offsets)
+
+    @staticmethod
+    def build(vocabulary: dict[str, int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (blob, offsets, columns) arrays for a term -> column mapping."""
+        encoded = sorted((term.encode("utf-8"), col) for term, col in vocabulary.items())
+        blob = np.frombuffer(b"".join(term for term, _ in encoded), dtype=np.uint8)
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(term) for term, _ in encoded], out=offsets[1:])
+        columns = np.array([col for _, col in encoded], dtype=np.int64)
+        return blob, offsets, columns
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def get(self, term: str) -> int | None:
+        """Return the column of ``term``, or None if it is not in the table."""
+        key = term.encode("utf-8")
+        i = bisect_left(self, key)
+        if i < len(self) and self[i] == key:
+            return int(self.columns[i])
+        return None
+
+
+def export_scorer(
+    vec,
+    clf,
+    out_dir: str = SCORER_PATH,
+    texts: list[str] | None = None
+) -> None:
+    """Export a fitted TfidfVectorizer + binary LogisticRegression as flat .npy files.
+
+    Layout of ``out_dir``: ``vocab_blob.npy``/``vocab_offsets.npy``/``vocab_columns.npy``
+    (sorted string table), ``idf.npy``, ``coef.npy``, ``meta.json`` (including the
+    stopword list) and, given the training ``texts``, ``stems.json`` with the stem of
+    every word in them, so scoring known words never loads the stemmer.
+    """
+    # pylint: disable=import-outside-toplevel
+    from lib_ml.preprocessing import STOPWORDS
+    if not hasattr(vec, "vocabulary_") or not hasattr(vec, "idf_"):
+        raise ValueError("export_scorer needs a fitted, vocabulary-based TfidfVectorizer")
+    if vec.sublinear_tf or vec.binary or vec.norm != "l2" or len(clf.classes_) != 2:
+        raise ValueError("export_scorer supports raw-count, l2-normalized, binary models only")
+
+    os.makedirs(out_dir, exist_ok=True)
+    blob, offsets, columns = StringTable.build(vec.vocabulary_)
+    arrays = {
+        "vocab_blob": blob,
+        "vocab_offsets": offsets,
+        "vocab_columns": columns,
+        "idf": vec.idf_.astype(np.float64),
+        "coef": clf.coef_.ravel().astype(np.float64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), array)
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "format_version": FORMAT_VERSION,
+            "intercept": float(clf.intercept_[0]),
+            "classes": clf.classes_.tolist(),
+            "ngram_range": list(vec.ngram_range),
+            "stopwords": sorted(STOPWORDS),
+        }, f)
+    if texts is not None:
+        words = {tok for text in texts for tok in clean_review(str(text)).split()} - STOPWORDS
+        with open(os.path.join(out_dir, "stems.json"), "w", encoding="utf-8") as f:
+            json.dump({word: _stem(word) for word in sorted(words)}, f)
+    print(f"Exported scorer with {len(columns)} features to {out_dir}")
+
+
+class LinearScorer:
+    """TF-IDF + logistic-regression scorer evaluated with NumPy/SciPy sparse products."""
+
+    def __init__(self, vocabulary, idf, coef, intercept, classes, ngram_range, stopwords,
+                 stems=None):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.coef = coef
+        self.intercept = intercept
+        self.classes = classes
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+        self.stopwords = frozenset(stopwords)
+        self.stems = stems or {}
+        # Hot n-grams resolve from a small private memo instead of the shared table
+        self._column = lru_cache(maxsize=2 ** 18)(vocabulary.get)
+
+    @classmethod
+    def load(cls, path: str = SCORER_PATH, mmap_mode: str | None = "r") -> "LinearScorer":
+        """Load a scorer written by ``export_scorer``, memory-mapping its arrays by default."""
+        def array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported scorer format {meta['format_version']} at {path}")
+        if "stopwords" in meta:
+            stopwords = meta["stopwords"]
+        else:
+            # Exported before the stopwords were stored with the scorer
+            from lib_ml.preprocessing import STOPWORDS  # pylint: disable=import-outside-toplevel
+            stopwords = STOPWORDS
+        stems = None
+        if os.path.exists(os.path.join(path, "stems.json")):
+            with open(os.path.join(path, "stems.json"), encoding="utf-8") as f:
+                stems = json.load(f)
+        vocabulary = StringTable(array("vocab_blob"), array("vocab_offsets"),
+                                 array("vocab_columns"))
+        return cls(vocabulary, array("idf"), array("coef"), meta["intercept"],
+                   np.array(meta["classes"]), meta["ngram_range"], stopwords, stems)
+
+    def transform(self, texts: list[str]) -> sp.csr_matrix:
+        """Return the raw term-count matrix of ``texts`` over the scorer vocabulary."""
+        column = self._column
+        indptr, indices = [0], []
+        for text in texts:
+            grams = analyze(text, self.ngram_range, self.stopwords, self.stems)
+            indices.extend(col for col in map(column, grams) if col is not None)
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float64)
+        counts = sp.csr_matrix((data, indices, indptr), shape=(len(texts), len(self.idf)))
+        counts.sum_duplicates()
+        return counts
+
+    def decision_function(self, texts: list[str]) -> np.ndarray:
+        """Return the logistic-regression margin for each text."""
+        # Score each distinct text once; repeated reviews are common in traffic
+        unique = list(dict.fromkeys(texts))
+        x = self.transform(unique)
+        x.data *= self.idf[x.indices]
+        norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+        norms[norms == 0.0] = 1.0
+        margins = (x @ self.coef) / norms + self.intercept
+        position = {text: i for i, text in enumerate(unique)}
+        return margins[[position[text] for text in texts]]
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        """Return class probabilities, matching ``LogisticRegression.predict_proba``."""
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, texts: list[str]) -> np.ndarray:
+        """Return predicted class labels."""
+        return self.classes[(self.decision_function(texts) > 0).astype(int)]
+
+
+def read_reviews(path: str, text_column: str = "Review", batch_size: int = BATCH_SIZE):
+    """Yield batches of review texts from a CSV or JSONL file."""
+    batch = []
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            batch.append(str(row[text_column]))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def score_file(
+    scorer: LinearScorer,
+    input_path: str,
+    output_path: str,
+    text_column: str = "Review",
+    batch_size: int = BATCH_SIZE,
+    calibrator=None
+) -> int:
+    """Score every review in ``input_path`` in fixed-size batches and write predictions.
+
+    With a ``calibrate.Calibrator``, probabilities are calibrated and labels use its
+    threshold instead of 0.5.
+    """
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    n_rows = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["prediction", "probability"])
+        for batch in read_reviews(input_path, text_column, batch_size):
+            with span("predict"):
+                probs = scorer.predict_proba(batch)[:, 1]
+                if calibrator is not None:
+                    probs = calibrator.transform(probs)
+                    positive = probs >= calibrator.threshold
+                else:
+                    positive = probs > 0.5
+            writer.writerows(zip(scorer.classes[positive.astype(int)].tolist(),
+                                 np.round(probs, 6).tolist()))
+            n_rows += len(batch)
+    return n_rows
+
+
+def main():
+    """Export a scorer from trained artifacts or score a file of reviews."""
+    p = argparse.ArgumentParser(description="Batch inference with the compiled linear scorer.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="Export a scorer from the trained pickles.")
+    exp.add_argument("--model", default="artifacts/model.pkl", help="Path to model .pkl.")
+    exp.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                     help="Path to vectorizer .pkl.")
+    exp.add_argument("--out", default=SCORER_PATH, help="Where to write the scorer.")
+    exp.add_argument("--data", default=None,
+                     help="Training reviews (CSV or JSONL) whose stems to store with the scorer.")
+
+    score = sub.add_parser("score", help="Score a CSV or JSONL file of reviews.")
+    score.add_argument("--scorer", default=SCORER_PATH, help="Path to exported scorer.")
+    score.add_argument("--input", required=True, help="CSV or JSONL file of reviews.")
+    score.add_argument("--output", required=True, help="CSV file to write predictions to.")
+    score.add_argument("--text-column", default="Review", help="Field holding the review text.")
+    score.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Reviews per batch.")
+    score.add_argument("--calibrator", default=None,
+                       help="Calibrator from calibrate.py to apply.")
+    add_profile_args(score, "predict")
+    args = p.parse_args()
+
+    if args.command == "export":
+        import joblib  # pylint: disable=import-outside-toplevel
+        texts = None
+        if args.data is not None:
+            texts = [text for batch in read_reviews(args.data) for text in batch]
+        export_scorer(joblib.load(args.vectorizer), joblib.load(args.model), args.out, texts)
+        return
+    with profile_stage("predict", args.profile, args.profile_mode):
+        with span("load_artifacts"):
+            scorer = LinearScorer.load(args.scorer)
+            calibrator = None
+            if args.calibrator is not None:
+                from calibrate import Calibrator  # pylint: disable=import-outside-toplevel
+                calibrator = Calibrator.load(args.calibrator)
+        n_rows = score_file(scorer, args.input, args.output, args.text_column, args.batch_size,
+                            calibrator)
+    print(f"Wrote {n_rows} predictions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
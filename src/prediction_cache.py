@@ -0,0 +1,145 @@
+import os
+import hashlib
+import sqlite3
+from collections import OrderedDict
+import numpy as np
+from predict import clean_review
+
+VERSION_PATH = "version.txt"
+CACHE_SIZE = 100_000
+
+
+def model_version(path: str = VERSION_PATH) -> str:
+    """Return the model version recorded in version.txt, or "unversioned" without one."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip() or "unversioned"
+    except FileNotFoundError:
+        return "unversioned"
+
+
+def cache_key(text: str, version: str) -> str:
+    """Key of a review: SHA-256 of model version plus its normalized text.
+
+    The vectorizer only sees ``clean_review(text)`` split on whitespace, so texts
+    that differ in case, punctuation or spacing share one entry.
+    """
+    normalized = " ".join(clean_review(str(text)).split())
+    return hashlib.sha256(f"{version}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """Bounded LRU cache of positive-class probabilities, with an optional SQLite tier.
+
+    Entries evicted from memory stay in the on-disk tier (if ``path`` is given), so
+    a restarted process starts warm. Not thread-safe; use one cache per thread.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE, version: str | None = None,
+                 path: str | None = None):
+        self.maxsize = maxsize
+        self.version = version if version is not None else model_version()
+        self.hits = self.disk_hits = self.misses = 0
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._conn = None
+        if path is not None:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS predictions "
+                               "(key TEXT PRIMARY KEY, probability REAL NOT NULL)")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: str, probability: float) -> None:
+        self._entries[key] = probability
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, keys: list[str]) -> dict[str, float]:
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 900):
+            batch = keys[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self._conn.execute(
+                f"SELECT key, probability FROM predictions WHERE key IN ({placeholders})", batch))
+        return found
+
+    def lookup(self, texts: list[str]) -> tuple[list[str], list[float | None]]:
+        """Return the keys of ``texts`` and their cached probabilities (None on a miss)."""
+        keys = [cache_key(text, self.version) for text in texts]
+        probs = [self._entries.get(key) for key in keys]
+        for key, prob in zip(keys, probs):
+            if prob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if self._conn is not None:
+            missing = list({key for key, prob in zip(keys, probs) if prob is None})
+            on_disk = self._read_disk(missing) if missing else {}
+            for i, key in enumerate(keys):
+                if probs[i] is None and key in on_disk:
+                    probs[i] = on_disk[key]
+                    self._remember(key, on_disk[key])
+                    self.disk_hits += 1
+        self.misses += sum(prob is None for prob in probs)
+        return keys, probs
+
+    def store(self, keys: list[str], probs) -> None:
+        """Cache freshly computed positive-class probabilities under their keys."""
+        items = {key: float(prob) for key, prob in zip(keys, probs)}
+        for key, prob in items.items():
+            self._remember(key, prob)
+        if self._conn is not None:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO predictions (key, probability) VALUES (?, ?)",
+                    items.items())
+
+    def predict_proba(self, texts: list[str], score) -> np.ndarray:
+        """Class probabilities of ``texts``, calling ``score`` only for distinct misses.
+
+        ``score`` maps a list of texts to a (n, 2) probability array, e.g.
+        ``lambda texts: clf.predict_proba(vec.transform(texts))``.
+        """
+        keys, probs = self.lookup(texts)
+        pending = {}
+        for key, text, prob in zip(keys, texts, probs):
+            if prob is None:
+                pending.setdefault(key, text)
+        if pending:
+            fresh = score(list(pending.values()))[:, 1]
+            self.store(list(pending), fresh)
+            computed = dict(zip(pending, fresh))
+            probs = [computed[key] if prob is None else prob for key, prob in zip(keys, probs)]
+        positive = np.asarray(probs, dtype=np.float64)
+        return np.column_stack([1.0 - positive, positive])
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "version": self.version,
+        }
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk."""
+        self._entries.clear()
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM predictions")
+
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
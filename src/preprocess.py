@@ -0,0 +1,201 @@
+import os
+import copy
+import time
+import hashlib
+import sqlite3
+import argparse
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from lib_ml import preprocessing
+from profiler import span, profile_stage, add_profile_args
+from data_prep import read_split, column_or_none
+from fingerprint import preprocessing_fingerprint
+
+# Bump whenever the tokenization in this module changes; lib_ml, NLTK and the
+# stopword list are covered by preprocessing_fingerprint() in the cache key.
+PREPROCESS_VERSION = "1"
+CACHE_PATH = "data/cache/tokens.sqlite"
+CHUNK_SIZE = 256
+PRETOKENIZED_PARAMS = {
+    "preprocessor": None,
+    "tokenizer": str.split,
+    "lowercase": False,
+    "token_pattern": None,
+}
+
+
+def review_key(text: str, version: str | None = None) -> str:
+    """Content address of a review: SHA-256 of preprocessing version plus text.
+
+    The default version combines ``PREPROCESS_VERSION`` with the preprocessing
+    fingerprint, so a lib_ml/NLTK upgrade or a different stopword list misses the cache.
+    """
+    if version is None:
+        version = f"{PREPROCESS_VERSION}-{preprocessing_fingerprint()}"
+    return hashlib.sha256(f"{version}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """On-disk, content-addressed store of token streams backed by SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, tokens TEXT NOT NULL)"
+        )
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Return the cached space-joined token streams for the keys that are present."""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(unique), 900):
+            batch = unique[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, tokens FROM tokens WHERE key IN ({placeholders})", batch
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, items: dict[str, str]) -> None:
+        """Store space-joined token streams under their content keys."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tokens (key, tokens) VALUES (?, ?)", items.items()
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _tokenize_chunk(texts: list[str], cleaned: bool = False) -> list[str]:
+    """Tokenize a chunk of reviews; runs inside pool workers.
+
+    ``cleaned`` texts are ``clean_review`` output already (a split's ``clean_text``
+    column), so only the stopword filter and the stemmer of ``tokenize_review`` run.
+    """
+    if not cleaned:
+        return [" ".join(preprocessing.tokenize_review(text)) for text in texts]
+    stopwords, stem = preprocessing.STOPWORDS, preprocessing.STEMMER.stem
+    return [" ".join(stem(tok) for tok in text.split() if tok not in stopwords)
+            for text in texts]
+
+
+def tokenize_texts(texts: list[str], workers: int = 1, cleaned: bool = False) -> list[str]:
+    """Tokenize reviews into space-joined token streams, in a process pool if workers > 1."""
+    if workers <= 1 or len(texts) <= CHUNK_SIZE:
+        return _tokenize_chunk(texts, cleaned)
+    chunks = [texts[i:i + CHUNK_SIZE] for i in range(0, len(texts), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [doc for chunk in pool.map(_tokenize_chunk, chunks, repeat(cleaned))
+                for doc in chunk]
+
+
+def tokenize_corpus(
+    reviews: list[str],
+    cache_path: str | None = None,
+    workers: int = 1,
+    clean_texts: list[str] | None = None
+) -> list[str]:
+    """Return one space-joined token stream per review, reusing and filling the cache.
+
+    ``clean_texts`` (the ``clean_text`` column of a columnar split, aligned with
+    ``reviews``) are tokenized instead of cleaning the reviews again; the cache is
+    still keyed on the raw review.
+    """
+    reviews = [str(review) for review in reviews]
+    cleaned = clean_texts is not None
+    texts = [str(text) for text in clean_texts] if cleaned else reviews
+    if cache_path is None:
+        with span("tokenize"):
+            return tokenize_texts(texts, workers, cleaned)
+
+    keys = [review_key(review) for review in reviews]
+    with TokenCache(cache_path) as cache:
+        with span("token_cache_read"):
+            cached = cache.get_many(keys)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        if missing:
+            with span("tokenize"):
+                fresh = dict(zip(missing, tokenize_texts(list(missing.values()), workers,
+                                                         cleaned)))
+            with span("token_cache_write"):
+                cache.put_many(fresh)
+            cached.update(fresh)
+    print(f"Token cache: {len(reviews) - len(missing)} hits, {len(missing)} misses")
+    return [cached[key] for key in keys]
+
+
+def pretokenized(vec):
+    """Return a shallow copy of a text vectorizer that consumes space-joined token streams.
+
+    Fitted state (vocabulary, IDF) is shared with ``vec``, so the copy produces
+    the same features as ``vec`` does for the corresponding raw reviews.
+    """
+    fast = copy.copy(vec)
+    fast.set_params(**PRETOKENIZED_PARAMS)
+    return fast
+
+
+def fit_on_tokens(vec, docs: list[str]):
+    """Fit ``vec`` on pretokenized docs and return the transformed matrix.
+
+    The returned vectorizer keeps its original raw-text preprocessor and
+    tokenizer, so the pickled artifact still transforms raw reviews.
+    """
+    fast = pretokenized(vec)
+    x = fast.fit_transform(docs)
+    fitted = {k: v for k, v in vars(fast).items() if k not in PRETOKENIZED_PARAMS}
+    vars(vec).update(fitted)
+    return x
+
+
+def transform_cached(
+    vec,
+    reviews: list[str],
+    cache_path: str | None = None,
+    workers: int = 1,
+    clean_texts: list[str] | None = None
+):
+    """Transform raw reviews with a fitted vectorizer using cached token streams."""
+    docs = tokenize_corpus(reviews, cache_path, workers, clean_texts)
+    return pretokenized(vec).transform(docs)
+
+
+def main():
+    """Tokenize one or more review tables into the token cache."""
+    p = argparse.ArgumentParser(description="Tokenize reviews into the on-disk token cache.")
+    p.add_argument("--data", nargs="+", required=True,
+                   help="CSV, Parquet or Feather file(s) with a Review column.")
+    p.add_argument("--cache", default=CACHE_PATH, help="Path of the token cache database.")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Tokenizer processes.")
+    add_profile_args(p, "preprocess")
+    args = p.parse_args()
+
+    with profile_stage("preprocess", args.profile, args.profile_mode):
+        for path in args.data:
+            start = time.perf_counter()
+            with span("read_table"):
+                df = read_split(path, ["Review"])
+            reviews = df["Review"].tolist()
+            tokenize_corpus(reviews, args.cache, args.workers, column_or_none(df, "clean_text"))
+            print(f"Tokenized {len(reviews)} reviews from {path} "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import resource
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# One metrics file per DVC stage; DVC does not allow two stages to write the same output
+PROFILE_PATH = "output/profile_{stage}.json"
+MODES = ("cprofile", "tracemalloc")
+
+# Profiler of the running stage, if any; spans are no-ops without one
+_ACTIVE = None
+
+
+def write_json(data: dict, path: str) -> None:
+    """Write a stage report as indented JSON to ``path``, creating its directory."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process so far, in MB."""
+    # ru_maxrss is reported in KB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class Profiler:
+    """Wall time and memory growth per named span of one pipeline stage.
+
+    ``ru_maxrss`` only ever rises, so each span records how far it pushed the process peak
+    (``rss_growth_mb``, the largest over its calls); a span running below an earlier peak
+    records 0.
+
+    ``mode="tracemalloc"`` also records the peak of Python allocations inside each
+    top-level span; ``mode="cprofile"`` collects a cProfile dump of the whole stage.
+    """
+
+    def __init__(self, stage: str, mode: str | None = None):
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {MODES}")
+        self.stage = stage
+        self.mode = mode
+        self.spans: dict[str, dict] = {}
+        self._depth = 0
+        self._start = time.perf_counter()
+        self._cprofile = None
+        if mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif mode == "tracemalloc":
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block and record it under ``name``; repeated spans accumulate."""
+        if self.mode == "tracemalloc" and self._depth == 0:
+            tracemalloc.reset_peak()
+        self._depth += 1
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._depth -= 1
+            entry = self.spans.setdefault(name, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+            growth = peak_rss_mb() - rss_before
+            entry["rss_growth_mb"] = max(entry.get("rss_growth_mb", 0.0), growth)
+            if self.mode == "tracemalloc":
+                traced = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                entry["traced_peak_mb"] = max(entry.get("traced_peak_mb", 0.0), traced)
+
+    def report(self) -> dict:
+        """Return the stage summary written to the profile JSON."""
+        return {
+            "stage": self.stage,
+            "seconds": time.perf_counter() - self._start,
+            "process_peak_rss_mb": peak_rss_mb(),
+            "spans": self.spans,
+        }
+
+    def dump(self, path: str) -> None:
+        """Write the report to ``path`` (and the cProfile stats next to it, as ``.prof``)."""
+        write_json(self.report(), path)
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            stats_path = os.path.splitext(path)[0] + ".prof"
+            self._cprofile.dump_stats(stats_path)
+            pstats.Stats(stats_path).sort_stats("cumulative").print_stats(15)
+        elif self.mode == "tracemalloc":
+            tracemalloc.stop()
+
+
+def span(name: str):
+    """Context manager recording ``name`` on the active profiler, if there is one."""
+    return _ACTIVE.span(name) if _ACTIVE is not None else nullcontext()
+
+
+@contextmanager
+def profile_stage(stage: str, path: str | None = None, mode: str | None = None):
+    """Profile a whole stage and write its report to ``path``; a no-op when ``path`` is None."""
+    # pylint: disable=global-statement
+    global _ACTIVE
+    if path is None:
+        yield None
+        return
+    _ACTIVE = Profiler(stage, mode)
+    try:
+        yield _ACTIVE
+    finally:
+        profiler, _ACTIVE = _ACTIVE, None
+        profiler.dump(path)
+        print(f"Wrote {stage} profile to {path}")
+
+
+def add_profile_args(parser, stage: str) -> None:
+    """Add the shared --profile/--profile-mode options to a stage's argument parser."""
+    parser.add_argument("--profile", nargs="?", const=PROFILE_PATH.format(stage=stage),
+                        default=None,
+                        help="Write per-span timings and memory growth to this JSON file "
+                             f"(default path: {PROFILE_PATH.format(stage=stage)}).")
+    parser.add_argument("--profile-mode", choices=MODES, default=None,
+                        help="Also collect a cProfile dump or tracemalloc peaks.")
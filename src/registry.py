@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import shutil
+import argparse
+from functools import cached_property
+from prediction_cache import model_version
+from fingerprint import content_hash
+
+REGISTRY_PATH = "artifacts/registry"
+ALIASES_FILE = "aliases.json"
+# Aliases moved automatically; any other alias (e.g. "champion") is set explicitly
+LATEST = "latest"
+
+
+class ModelVersion:
+    """One registered model; the pickles are only loaded on first use."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = os.path.basename(path)
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+    @cached_property
+    def vectorizer(self):
+        """The fitted vectorizer, unpickled on first access."""
+        import joblib  # pylint: disable=import-outside-toplevel
+        return joblib.load(os.path.join(self.path, "vectorizer.pkl"))
+
+    @cached_property
+    def model(self):
+        """The fitted classifier, unpickled on first access."""
+        import joblib  # pylint: disable=import-outside-toplevel
+        return joblib.load(os.path.join(self.path, "model.pkl"))
+
+    @property
+    def loaded(self) -> bool:
+        """Whether both pickles are in memory."""
+        return "vectorizer" in vars(self) and "model" in vars(self)
+
+    def artifact(self, name: str) -> str:
+        """Path of a file stored with this version (e.g. ``"params.json"``)."""
+        return os.path.join(self.path, name)
+
+    def predict_proba(self, texts: list[str]):
+        """Class probabilities of ``texts``."""
+        return self.model.predict_proba(self.vectorizer.transform(texts))
+
+
+class Registry:
+    """Local model registry: one directory per version plus a JSON file of aliases.
+
+    ``root/<version>/`` holds ``model.pkl``, ``vectorizer.pkl``, ``params.json``,
+    ``metrics.json`` and ``meta.json`` (content hash, release, creation time).
+    Versions are immutable; registering artifacts identical to an existing version
+    returns that version. ``get`` keeps every version it hands out, so switching
+    back and forth between models never unpickles twice.
+    """
+
+    def __init__(self, root: str = REGISTRY_PATH):
+        self.root = root
+        self._versions: dict[str, ModelVersion] = {}
+
+    def versions(self) -> list[str]:
+        """Registered versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, name, "meta.json")))
+
+    def aliases(self) -> dict[str, str]:
+        """Alias -> version mapping."""
+        try:
+            with open(os.path.join(self.root, ALIASES_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def set_alias(self, alias: str, ref: str) -> str:
+        """Point ``alias`` at the version ``ref`` resolves to; return that version."""
+        version = self.resolve(ref)
+        aliases = self.aliases()
+        aliases[alias] = version
+        tmp = os.path.join(self.root, ALIASES_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(aliases, f, indent=2)
+        os.replace(tmp, os.path.join(self.root, ALIASES_FILE))
+        return version
+
+    def resolve(self, ref: str) -> str:
+        """Return the version named by ``ref``: an alias, a version or a unique hash prefix."""
+        versions = self.versions()
+        if ref in versions:
+            return ref
+        aliases = self.aliases()
+        if ref in aliases:
+            return aliases[ref]
+        matches = [v for v in versions if v.split("-", 1)[-1].startswith(ref)]
+        if len(matches) == 1:
+            return matches[0]
+        raise KeyError(f"No model version or alias {ref!r} in {self.root}")
+
+    def register(
+        self,
+        vectorizer_path: str,
+        model_path: str,
+        params: dict | None = None,
+        metrics: dict | None = None
+    ) -> str:
+        """Copy a trained vectorizer/model pair into a new version and mark it latest."""
+        digest = content_hash([vectorizer_path, model_path])
+        for version in self.versions():
+            if ModelVersion(os.path.join(self.root, version)).meta["content_hash"] == digest:
+                self.set_alias(LATEST, version)
+                return version
+
+        versions = self.versions()
+        number = int(versions[-1].split("-", 1)[0]) + 1 if versions else 1
+        version = f"{number:04d}-{digest[:8]}"
+        final = os.path.join(self.root, version)
+        tmp = final + ".tmp"
+        os.makedirs(tmp, exist_ok=True)
+        shutil.copyfile(vectorizer_path, os.path.join(tmp, "vectorizer.pkl"))
+        shutil.copyfile(model_path, os.path.join(tmp, "model.pkl"))
+        files = {
+            "params.json": params or {},
+            "metrics.json": metrics or {},
+            "meta.json": {
+                "version": version,
+                "content_hash": digest,
+                "release": model_version(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+        }
+        for name, content in files.items():
+            with open(os.path.join(tmp, name), "w", encoding="utf-8") as f:
+                json.dump(content, f, indent=2)
+        # Written last, so a version directory is either complete or absent
+        os.replace(tmp, final)
+        self.set_alias(LATEST, version)
+        print(f"Registered model version {version} in {self.root}")
+        return version
+
+    def get(self, ref: str = LATEST) -> ModelVersion:
+        """Return the (lazily loaded, cached) model for a version or alias."""
+        version = self.resolve(ref)
+        if version not in self._versions:
+            self._versions[version] = ModelVersion(os.path.join(self.root, version))
+        return self._versions[version]
+
+    def evict(self, ref: str) -> None:
+        """Drop a version's loaded pickles from this process."""
+        self._versions.pop(self.resolve(ref), None)
+
+
+def main():
+    """List registered versions, show one, or move an alias."""
+    p = argparse.ArgumentParser(description="Inspect the local model registry.")
+    p.add_argument("--registry", default=REGISTRY_PATH, help="Registry directory.")
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List versions and aliases.")
+    show = sub.add_parser("show", help="Print a version's metadata, params and metrics.")
+    show.add_argument("ref", nargs="?", default=LATEST, help="Version or alias.")
+    promote = sub.add_parser("promote", help="Point an alias at a version.")
+    promote.add_argument("ref", help="Version or alias to promote.")
+    promote.add_argument("--alias", default="champion", help="Alias to set.")
+    args = p.parse_args()
+
+    registry = Registry(args.registry)
+    if args.command == "list":
+        by_version = {}
+        for alias, version in registry.aliases().items():
+            by_version.setdefault(version, []).append(alias)
+        for version in registry.versions():
+            print(f"{version}  {' '.join(sorted(by_version.get(version, [])))}".rstrip())
+    elif args.command == "show":
+        model = registry.get(args.ref)
+        info = {"path": model.path, **model.meta}
+        for name in ("params.json", "metrics.json"):
+            with open(model.artifact(name), encoding="utf-8") as f:
+                info[os.path.splitext(name)[0]] = json.load(f)
+        print(json.dumps(info, indent=2))
+    else:
+        version = registry.set_alias(args.alias, args.ref)
+        print(f"{args.alias} -> {version}")
+
+
+if __name__ == "__main__":
+    main()
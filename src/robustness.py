@@ -0,0 +1,214 @@
+import re
+import json
+import time
+import random
+import string
+import argparse
+from functools import lru_cache
+import joblib
+import numpy as np
+from profiler import span, profile_stage, add_profile_args
+from data_prep import read_table
+
+REPORT_PATH = "output/robustness.json"
+TYPO_PROBABILITY = 0.03
+# Cap on variants per review and perturbation; None generates all of them
+MAX_VARIANTS = 20
+AUXILIARIES = re.compile(r"\b(?:is|was|are|were|am|be)\b(?!\s+not\b)", re.IGNORECASE)
+NEGATED = re.compile(r"\b(is|was|are|were|am|be)\s+not\b", re.IGNORECASE)
+IRRELEVANT = (
+    "Visit www.myrestaurant.com to get a discount!",
+    "We went there on a Tuesday.",
+    "The parking lot is across the street.",
+    "lorem ipsum dolor sit amet",
+)
+
+
+@lru_cache(maxsize=1)
+def _wordnet():
+    import nltk  # pylint: disable=import-outside-toplevel
+    from nltk.corpus import wordnet  # pylint: disable=import-outside-toplevel
+    nltk.download("wordnet", quiet=True)
+    nltk.download("omw-1.4", quiet=True)
+    return wordnet
+
+
+@lru_cache(maxsize=None)
+def synonyms(word: str) -> tuple[str, ...]:
+    """Return the single-word WordNet synonyms of ``word``, memoized per word."""
+    found = set()
+    for syn in _wordnet().synsets(word):
+        for lemma in syn.lemmas():
+            name = lemma.name().replace("_", " ")
+            # Exclude the original word and multi-word synonyms
+            if name.lower() != word.lower() and " " not in name:
+                found.add(name)
+    return tuple(sorted(found))
+
+
+def introduce_typos(text: str, typo_probability: float = 0.1, rng=random) -> str:
+    """Introduce random deletions, insertions, substitutions and transpositions."""
+    result = list(text)
+    i = 0
+    while i < len(result):
+        if rng.random() < typo_probability:
+            typo_type = rng.choice(["delete", "insert", "substitute", "transpose"])
+            if typo_type == "delete" and len(result) > 1:
+                result.pop(i)
+                continue  # Skip increment since we removed a character
+            if typo_type == "insert":
+                result.insert(i, rng.choice(string.ascii_lowercase))
+                i += 1  # Skip the inserted character
+            elif typo_type == "substitute":
+                result[i] = rng.choice(string.ascii_lowercase)
+            elif typo_type == "transpose" and i < len(result) - 1:
+                result[i], result[i + 1] = result[i + 1], result[i]
+                i += 1  # Skip the transposed character
+        i += 1
+    return "".join(result)
+
+
+def typo_variants(text: str, rng: random.Random) -> list[str]:
+    """One copy of ``text`` with random character-level typos."""
+    return [introduce_typos(text, TYPO_PROBABILITY, rng)]
+
+
+def synonym_variants(text: str, rng: random.Random) -> list[str]:  # pylint: disable=unused-argument
+    """Every sentence obtained by replacing a single word with one of its synonyms."""
+    words = text.split()
+    return [" ".join(words[:i] + [synonym] + words[i + 1:])
+            for i, word in enumerate(words) for synonym in synonyms(word)]
+
+
+def negation_variants(text: str, rng: random.Random) -> list[str]:  # pylint: disable=unused-argument
+    """Negate the first auxiliary verb ("was" -> "was not"), or drop an existing "not"."""
+    if NEGATED.search(text):
+        return [NEGATED.sub(r"\1", text, count=1)]
+    if AUXILIARIES.search(text):
+        return [AUXILIARIES.sub(lambda m: f"{m.group(0)} not", text, count=1)]
+    return []
+
+
+def irrelevant_variants(text: str, rng: random.Random) -> list[str]:  # pylint: disable=unused-argument
+    """Append sentiment-free sentences (URLs, filler) to ``text``."""
+    return [f"{text} {suffix}" for suffix in IRRELEVANT]
+
+
+# name -> (generator, whether a correct model is expected to flip its prediction)
+PERTURBATIONS = {
+    "typo": (typo_variants, False),
+    "synonym": (synonym_variants, False),
+    "negation": (negation_variants, True),
+    "irrelevant": (irrelevant_variants, False),
+}
+
+
+def perturb(
+    texts: list[str],
+    kinds=None,
+    seed: int = 0,
+    max_variants: int | None = MAX_VARIANTS
+) -> list[tuple[int, str, str]]:
+    """Generate all variants up front as (source index, perturbation, variant) triples."""
+    rng = random.Random(seed)
+    variants = []
+    for kind in kinds or PERTURBATIONS:
+        generate, _ = PERTURBATIONS[kind]
+        for i, text in enumerate(texts):
+            generated = generate(str(text), rng)
+            if max_variants is not None and len(generated) > max_variants:
+                generated = rng.sample(generated, max_variants)
+            variants.extend((i, kind, variant) for variant in generated)
+    return variants
+
+
+def score(model, vectorizer, texts: list[str]) -> np.ndarray:
+    """Positive-class probability of every text from one transform + predict_proba call."""
+    # Score each distinct text once; perturbations often reproduce the original
+    unique = list(dict.fromkeys(texts))
+    probs = model.predict_proba(vectorizer.transform(unique))[:, 1]
+    position = {text: i for i, text in enumerate(unique)}
+    return probs[[position[text] for text in texts]]
+
+
+def check(model, vectorizer, texts: list[str], variants: list[tuple[int, str, str]]):
+    """Score originals and variants in one batch.
+
+    Returns the probability of each variant's source text and of the variant itself.
+    """
+    probs = score(model, vectorizer, list(texts) + [variant for _, _, variant in variants])
+    source = np.array([i for i, _, _ in variants], dtype=np.int64)
+    return probs[source], probs[len(texts):]
+
+
+def robustness_report(
+    model,
+    vectorizer,
+    texts: list[str],
+    kinds=None,
+    seed: int = 0,
+    max_variants: int | None = MAX_VARIANTS
+) -> dict:
+    """Flip rates and probability deltas per perturbation type over ``texts``."""
+    start = time.perf_counter()
+    with span("perturb"):
+        variants = perturb(texts, kinds, seed, max_variants)
+    with span("predict"):
+        before, after = check(model, vectorizer, texts, variants)
+    flipped = (before > 0.5) != (after > 0.5)
+    delta = np.abs(after - before)
+    kind_of = np.array([kind for _, kind, _ in variants])
+
+    report = {"n_texts": len(texts), "n_variants": len(variants)}
+    for kind in kinds or PERTURBATIONS:
+        mask = kind_of == kind
+        if not mask.any():
+            continue
+        expect_flip = PERTURBATIONS[kind][1]
+        report[kind] = {
+            "expected": "flip" if expect_flip else "stable",
+            "n_variants": int(mask.sum()),
+            "flip_rate": float(flipped[mask].mean()),
+            "violation_rate": float((flipped[mask] != expect_flip).mean()),
+            "mean_abs_delta": float(delta[mask].mean()),
+            "max_abs_delta": float(delta[mask].max()),
+        }
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def main():
+    """Parse arguments and write the robustness report for a trained model."""
+    p = argparse.ArgumentParser(description="Metamorphic robustness checks over a review set.")
+    p.add_argument("--model", default="artifacts/model.pkl", help="Path to saved model .pkl.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Path to saved vectorizer .pkl.")
+    p.add_argument("--data", default="data/processed/test.csv", help="Table with a Review column.")
+    p.add_argument("--kinds", nargs="+", choices=list(PERTURBATIONS), default=None,
+                   help="Perturbations to apply (default: all).")
+    p.add_argument("--max-variants", type=int, default=MAX_VARIANTS,
+                   help="Variants per review and perturbation.")
+    p.add_argument("--seed", type=int, default=0, help="Random seed for typos and sampling.")
+    p.add_argument("--output", default=REPORT_PATH, help="Where to write the report JSON.")
+    add_profile_args(p, "robustness")
+    args = p.parse_args()
+
+    with profile_stage("robustness", args.profile, args.profile_mode):
+        with span("load_artifacts"):
+            model, vectorizer = joblib.load(args.model), joblib.load(args.vectorizer)
+        with span("read_table"):
+            texts = read_table(args.data, ["Review"])["Review"].astype(str).tolist()
+        report = robustness_report(model, vectorizer, texts, args.kinds, args.seed,
+                                   args.max_variants)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for kind in args.kinds or PERTURBATIONS:
+        if kind in report:
+            r = report[kind]
+            print(f"{kind:>10}: {r['n_variants']:6d} variants, flip rate {r['flip_rate']:.2%} "
+                  f"(expected {r['expected']}), mean |dp| {r['mean_abs_delta']:.3f}")
+    print(f"Checked {report['n_variants']} variants in {report['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
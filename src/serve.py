@@ -0,0 +1,351 @@
+import os
+import json
+import signal
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from prediction_cache import PredictionCache, CACHE_SIZE
+from registry import Registry, REGISTRY_PATH
+from fingerprint import content_hash
+
+HOST = "127.0.0.1"
+PORT = 8080
+MAX_BATCH = 64
+MAX_WAIT_MS = 5.0
+MAX_BODY = 1 << 20
+STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+          413: "Payload Too Large", 500: "Internal Server Error"}
+
+# Model of the current (worker) process, loaded once by _load_model
+_MODEL = None
+
+
+def _load_model(model_path: str, vectorizer_path: str, scorer_path: str | None,
+                calibrator_path: str | None = None) -> None:
+    """Load the artifacts into this process; used as the pool initializer."""
+    # pylint: disable=global-statement,import-outside-toplevel
+    global _MODEL
+    if scorer_path is not None:
+        from predict import LinearScorer
+        scorer = LinearScorer.load(scorer_path)
+        model = (scorer.predict_proba, scorer.classes)
+    else:
+        import joblib
+        vec, clf = joblib.load(vectorizer_path), joblib.load(model_path)
+        model = (lambda texts: clf.predict_proba(vec.transform(texts)), clf.classes_)
+    calibrator = None
+    if calibrator_path is not None:
+        from calibrate import Calibrator
+        calibrator = Calibrator.load(calibrator_path)
+    _MODEL = (*model, calibrator)
+
+
+def _predict_batch(texts: list[str]) -> list[float]:
+    """Score one micro-batch with a single transform + predict_proba call."""
+    predict_proba, _, calibrator = _MODEL
+    probs = predict_proba(texts)[:, 1]
+    if calibrator is not None:
+        probs = calibrator.transform(probs)
+    return probs.tolist()
+
+
+def _model_classes() -> tuple[list, float]:
+    _, classes, calibrator = _MODEL
+    return classes.tolist(), (calibrator.threshold if calibrator is not None else 0.5)
+
+
+class MicroBatcher:
+    """Queue single requests and flush them as batches of up to ``max_batch`` texts.
+
+    A batch is flushed when it is full or ``max_wait_ms`` after its first request
+    arrived. Batches run in ``executor``, so several can be in flight at once when
+    the executor has more than one worker. Texts found in ``cache`` are answered
+    without entering the queue. A probability above ``threshold`` predicts
+    ``classes[1]`` (at or above it when a calibrator sets the threshold).
+    """
+
+    def __init__(self, executor, classes: list, max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS, max_in_flight: int = 1,
+                 cache: PredictionCache | None = None, threshold: float | None = None):
+        self.executor = executor
+        self.classes = classes
+        self.threshold = threshold
+        self.cache = cache
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._task = None
+        self.batches = 0
+        self.requests = 0
+
+    def start(self) -> None:
+        """Start the background task that forms and dispatches batches."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the batching task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def predict(self, texts: list[str]) -> list[dict]:
+        """Enqueue ``texts`` and wait for their predictions."""
+        if self.cache is not None:
+            keys, probs = self.cache.lookup(texts)
+        else:
+            keys, probs = None, [None] * len(texts)
+        missing = [i for i, prob in enumerate(probs) if prob is None]
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = [loop.create_future() for _ in missing]
+            for i, future in zip(missing, futures):
+                self._queue.put_nowait((texts[i], future))
+            fresh = await asyncio.gather(*futures)
+            for i, prob in zip(missing, fresh):
+                probs[i] = prob
+            if self.cache is not None:
+                self.cache.store([keys[i] for i in missing], fresh)
+        if self.threshold is None:
+            return [{"prediction": self.classes[int(prob > 0.5)], "probability": prob}
+                    for prob in probs]
+        return [{"prediction": self.classes[int(prob >= self.threshold)], "probability": prob}
+                for prob in probs]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Keep draining what is already queued while the batch is not full
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._slots.acquire()
+            loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, _predict_batch,
+                                                 [text for text, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+            self.batches += 1
+            self.requests += len(batch)
+
+
+def _response(status: int, body: dict, keep_alive: bool) -> bytes:
+    payload = json.dumps(body).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + payload
+
+
+async def _route(batcher: MicroBatcher, method: str, path: str, body: bytes) -> tuple[int, dict]:
+    if path == "/health":
+        health = {"status": "ok", "batches": batcher.batches, "requests": batcher.requests}
+        if batcher.cache is not None:
+            health["cache"] = batcher.cache.stats()
+        return 200, health
+    if path != "/predict":
+        return 404, {"error": f"Unknown path {path}"}
+    if method != "POST":
+        return 405, {"error": "Use POST"}
+    try:
+        payload = json.loads(body or b"{}")
+    except json.JSONDecodeError as e:
+        return 400, {"error": f"Invalid JSON: {e}"}
+    if not isinstance(payload, dict):
+        payload = {}
+    if isinstance(payload.get("review"), str):
+        return 200, (await batcher.predict([payload["review"]]))[0]
+    reviews = payload.get("reviews")
+    if isinstance(reviews, list) and all(isinstance(r, str) for r in reviews):
+        return 200, {"predictions": await batcher.predict(reviews)}
+    return 400, {"error": 'Expected {"review": str} or {"reviews": [str, ...]}'}
+
+
+async def _reject(writer, status: int, message: str) -> None:
+    """Answer a request that cannot be read any further and end the connection."""
+    writer.write(_response(status, {"error": message}, False))
+    await writer.drain()
+
+
+async def handle_connection(batcher: MicroBatcher, reader, writer) -> None:
+    """Serve HTTP/1.1 requests on one (keep-alive) connection."""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, version = (lines[0].split(" ") + ["", ""])[:3]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+            keep_alive = (headers.get("connection", "").lower() != "close"
+                          and version == "HTTP/1.1")
+            length = headers.get("content-length") or "0"
+            # Without a valid length the end of the body is unknown, so the connection ends
+            if not (length.isascii() and length.isdigit()):
+                await _reject(writer, 400, f"Invalid Content-Length {length!r}")
+                break
+            length = int(length)
+            if length > MAX_BODY:
+                await _reject(writer, 413, "Body too large")
+                break
+            try:
+                body = await reader.readexactly(length) if length else b""
+            except asyncio.IncompleteReadError as e:
+                await _reject(writer, 400, f"Body ended after {len(e.partial)} of {length} bytes")
+                break
+            try:
+                status, result = await _route(batcher, method, path.split("?")[0], body)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                status, result = 500, {"error": str(e)}
+            writer.write(_response(status, result, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass  # the client went away mid-response
+    finally:
+        writer.close()
+
+
+async def serve(
+    model_path: str = "artifacts/model.pkl",
+    vectorizer_path: str = "artifacts/vectorizer.pkl",
+    scorer_path: str | None = None,
+    host: str = HOST,
+    port: int = PORT,
+    workers: int = 1,
+    max_batch: int = MAX_BATCH,
+    max_wait_ms: float = MAX_WAIT_MS,
+    cache: PredictionCache | None = None,
+    ready: asyncio.Future | None = None,
+    calibrator_path: str | None = None
+) -> None:
+    """Load the artifacts once and serve /predict until cancelled.
+
+    ``ready``, if given, receives the bound port once the server accepts connections.
+    """
+    initargs = (model_path, vectorizer_path, scorer_path, calibrator_path)
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_load_model,
+                                       initargs=initargs)
+    else:
+        _load_model(*initargs)
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    # Start and warm every worker before accepting traffic, so no request pays for it
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(executor, _predict_batch, ["warm up"])
+                           for _ in range(workers)))
+    classes, threshold = await loop.run_in_executor(executor, _model_classes)
+    # Shut the worker pool down cleanly on SIGTERM as well as on Ctrl-C
+    try:
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    batcher = MicroBatcher(executor, classes, max_batch, max_wait_ms, max_in_flight=workers,
+                           cache=cache, threshold=threshold if calibrator_path else None)
+    batcher.start()
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(batcher, r, w), host, port)
+    bound_port = server.sockets[0].getsockname()[1]
+    print(f"Serving on http://{host}:{bound_port} "
+          f"(workers={workers}, max_batch={max_batch}, max_wait_ms={max_wait_ms})")
+    if ready is not None:
+        ready.set_result(bound_port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+        executor.shutdown(cancel_futures=True)
+        if cache is not None:
+            print(f"Prediction cache: {cache.stats()}")
+            cache.close()
+
+
+def cache_version(model_path: str, vectorizer_path: str, scorer_path: str | None,
+                  calibrator_path: str | None = None) -> str:
+    """Prediction-cache version of the served artifacts: a hash of their bytes.
+
+    A retrained model or a refit calibrator gets a new version even if
+    ``version.txt`` is unchanged, so the persistent cache tier never answers with
+    another model's (or calibrator's) probabilities.
+    """
+    if scorer_path is not None:
+        paths = [os.path.join(scorer_path, name) for name in sorted(os.listdir(scorer_path))]
+    else:
+        paths = [vectorizer_path, model_path]
+    if calibrator_path is not None:
+        paths.append(calibrator_path)
+    return content_hash(paths)[:16]
+
+
+def main():
+    """Parse arguments and run the HTTP server."""
+    p = argparse.ArgumentParser(description="Serve the trained sentiment model over HTTP.")
+    p.add_argument("--model", default="artifacts/model.pkl", help="Path to model .pkl.")
+    p.add_argument("--vectorizer", default="artifacts/vectorizer.pkl",
+                   help="Path to vectorizer .pkl.")
+    p.add_argument("--scorer", default=None,
+                   help="Serve the exported linear scorer (see predict.py) instead of the pickles.")
+    p.add_argument("--model-version", default=None,
+                   help="Serve this version or alias (e.g. champion) from --registry instead.")
+    p.add_argument("--registry", default=REGISTRY_PATH, help="Model registry directory.")
+    p.add_argument("--host", default=HOST, help="Interface to bind.")
+    p.add_argument("--port", type=int, default=PORT, help="Port to listen on.")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Inference processes; batches run in parallel when > 1.")
+    p.add_argument("--max-batch", type=int, default=MAX_BATCH, help="Largest micro-batch.")
+    p.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                   help="How long a batch waits for more requests before it is flushed.")
+    p.add_argument("--cache-size", type=int, default=CACHE_SIZE,
+                   help="Predictions kept in the in-memory LRU cache (0 disables caching).")
+    p.add_argument("--cache-path", default=None,
+                   help="SQLite file for a persistent cache tier that survives restarts.")
+    p.add_argument("--calibrator", default=None,
+                   help="Calibrator from calibrate.py (e.g. artifacts/calibrator.pkl) to apply.")
+    args = p.parse_args()
+    if args.model_version is not None:
+        entry = Registry(args.registry).get(args.model_version)
+        args.model, args.vectorizer = entry.artifact("model.pkl"), entry.artifact("vectorizer.pkl")
+        print(f"Serving model version {entry.version}")
+    cache = None
+    if args.cache_size > 0:
+        version = cache_version(args.model, args.vectorizer, args.scorer, args.calibrator)
+        cache = PredictionCache(args.cache_size, version=version, path=args.cache_path)
+    try:
+        asyncio.run(serve(args.model, args.vectorizer, args.scorer, args.host, args.port,
+                          args.workers or os.cpu_count(), args.max_batch, args.max_wait_ms,
+                          cache, calibrator_path=args.calibrator))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,437 @@
 import os
+import time
 import argparse
 import json
+from concurrent.futures import ProcessPoolExecutor
 import joblib
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.feature_extraction.text import TfidfVectorizer
-from lib_ml.preprocessing import clean_review, tokenize_review
+import numpy as np
+from predict import export_scorer
+from evaluate import point_metrics
+from profiler import span, profile_stage, add_profile_args
+from registry import Registry
+
+CHUNK_SIZE = 10000
+N_FEATURES = 2 ** 20
+METRICS_PATH = "output/train_metrics.json"
+TRAIN_STATE = "train_state.npz"
+VECTORIZER_TYPES = ("tfidf", "hashing")
+CV_METRICS = ("accuracy", "f1", "roc_auc")
+# LogisticRegression solvers that honour warm_start; liblinear always starts from zero
+WARM_START_SOLVERS = ("lbfgs", "newton-cg", "newton-cholesky", "sag", "saga")
+DEFAULT_PARAMS = {
+    "ngram_range": (1, 2),
+    "max_features": 5000,
+    "C": 1.0,
+    "solver": "liblinear",
+}
+
+def load_params(path: str | None) -> dict:
+    """Return training hyperparameters, overriding the defaults with a tune.py result file."""
+    params = dict(DEFAULT_PARAMS)
+    if path is not None:
+        with open(path, encoding="utf-8") as f:
+            params.update(json.load(f))
+    params["ngram_range"] = tuple(params["ngram_range"])
+    return params
+
+def train_state_path(model_out: str) -> str:
+    """Document-frequency state is kept next to the model it was trained with."""
+    return os.path.join(os.path.dirname(model_out), TRAIN_STATE)
+
+def save_train_state(model_out: str, doc_freq: np.ndarray, n_docs: int) -> None:
+    """Persist per-feature document frequencies so IDF can be refit incrementally."""
+    np.savez(train_state_path(model_out), doc_freq=doc_freq, n_docs=n_docs)
+
+# Shared read-only state of each cross-validation worker, set once by _init_cv_worker
+_CV_COUNTS = None
+_CV_LABELS: np.ndarray | None = None
+
+def _init_cv_worker(counts, labels: np.ndarray) -> None:
+    # pylint: disable=global-statement
+    global _CV_COUNTS, _CV_LABELS
+    _CV_COUNTS, _CV_LABELS = counts, labels
+
+def _cv_fold(train_idx: np.ndarray, eval_idx: np.ndarray, params: dict) -> dict:
+    """Fit and score one fold on the shared count matrix."""
+    # pylint: disable=import-outside-toplevel
+    from sklearn.linear_model import LogisticRegression
+    from tune import tfidf_features
+    start = time.perf_counter()
+    x_train, x_eval = tfidf_features(_CV_COUNTS, train_idx, eval_idx, params["max_features"])
+    clf = LogisticRegression(C=params["C"], solver=params["solver"], random_state=0)
+    clf.fit(x_train, _CV_LABELS[train_idx])
+    fit_seconds = time.perf_counter() - start
+    scores = clf.predict_proba(x_eval)[:, 1]
+    metrics = point_metrics(_CV_LABELS[eval_idx], clf.classes_[(scores > 0.5).astype(int)],
+                            scores)
+    return {**{name: metrics[name] for name in CV_METRICS}, "fit_seconds": fit_seconds}
+
+def cross_validate(
+    docs: list[str],
+    labels: np.ndarray,
+    params: dict,
+    folds: int = 5,
+    workers: int = 1
+) -> dict:
+    """K-fold cross-validation over a pretokenized corpus, one fold per worker task.
+
+    N-grams are counted once for the whole corpus; each fold derives its TF-IDF
+    features (vocabulary and IDF from its training rows only, as a fresh
+    TfidfVectorizer would) from that shared count matrix.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sklearn.model_selection import StratifiedKFold
+    from tune import count_matrices
+    with span("count_matrices"):
+        counts = count_matrices(docs, [params["ngram_range"]])[params["ngram_range"]]
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    splits = list(splitter.split(np.zeros(len(labels)), labels))
+    with span("cross_validate"):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, folds), initializer=_init_cv_worker,
+                                     initargs=(counts, labels)) as pool:
+                futures = [pool.submit(_cv_fold, train_idx, eval_idx, params)
+                           for train_idx, eval_idx in splits]
+                results = [future.result() for future in futures]
+        else:
+            _init_cv_worker(counts, labels)
+            results = [_cv_fold(train_idx, eval_idx, params) for train_idx, eval_idx in splits]
+
+    summary = {"cv_folds": folds}
+    for name in CV_METRICS:
+        values = [fold[name] for fold in results]
+        summary[f"cv_{name}_mean"] = float(np.mean(values))
+        summary[f"cv_{name}_std"] = float(np.std(values))
+    summary["cv_fold_metrics"] = [{name: float(value) for name, value in fold.items()}
+                                  for fold in results]
+    print(f"{folds}-fold CV accuracy: {summary['cv_accuracy_mean']:.4f} "
+          f"± {summary['cv_accuracy_std']:.4f}, F1: {summary['cv_f1_mean']:.4f} "
+          f"± {summary['cv_f1_std']:.4f}, ROC-AUC: {summary['cv_roc_auc_mean']:.4f} "
+          f"± {summary['cv_roc_auc_std']:.4f}")
+    return summary
+
+def save_artifacts(
+    vec,
+    clf,
+    vec_out: str,
+    model_out: str,
+    metrics: dict,
+    metrics_out: str = METRICS_PATH
+) -> None:
+    """Dump the vectorizer and model and record training metrics for DVC."""
+    os.makedirs(os.path.dirname(vec_out), exist_ok=True)
+    os.makedirs(os.path.dirname(model_out), exist_ok=True)
+    with span("dump_artifacts"):
+        joblib.dump(vec, vec_out)
+        joblib.dump(clf, model_out)
+    print(f"Downloaded model at {model_out} and vectorizer at {vec_out}")
+
+    # Save training accuracy for DVC
+    with open(metrics_out, "w", encoding="utf-8") as f:
+        json.dump(metrics, f)
 
 def train_and_save(
     data_path: str,
     vec_out: str,
-    model_out: str
+    model_out: str,
+    token_cache: str | None = None,
+    workers: int = 1,
+    metrics_out: str = METRICS_PATH,
+    scorer_out: str | None = None,
+    params: dict | None = None,
+    vectorizer_type: str = "tfidf",
+    n_features: int = N_FEATURES,
+    cv: int = 0
+) -> None:
+    """Train a sentiment model and save the vectorizer and model.
+
+    ``vectorizer_type="hashing"`` hashes n-grams into ``n_features`` columns with a
+    stored IDF (see hashing.py) instead of building a vocabulary; ``max_features``
+    does not apply to it. With ``cv`` > 1 the TF-IDF model is first cross-validated
+    with that many folds on the same tokenized corpus, and the fold metrics are
+    added to the training metrics.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from lib_ml.preprocessing import clean_review, tokenize_review
+    from preprocess import tokenize_corpus, fit_on_tokens
+    from hashing import HashingTfidfVectorizer
+    from data_prep import read_split, column_or_none
+    if vectorizer_type != "tfidf" and scorer_out is not None:
+        raise ValueError("The compiled scorer supports the tfidf vectorizer only")
+    if vectorizer_type != "tfidf" and cv > 1:
+        raise ValueError("Cross-validation supports the tfidf vectorizer only")
+    params = params or load_params(None)
+    with span("read_table"):
+        df = read_split(data_path, ["Review", "Liked"])
+    reviews, labels = df["Review"].tolist(), df["Liked"].values
+    clean_texts = column_or_none(df, "clean_text")
+
+    if vectorizer_type == "hashing":
+        vec = HashingTfidfVectorizer(
+            tokenizer=tokenize_review,
+            preprocessor=clean_review,
+            ngram_range=params["ngram_range"],
+            n_features=n_features
+        )
+    elif vectorizer_type == "tfidf":
+        vec = TfidfVectorizer(
+            tokenizer=tokenize_review,
+            preprocessor=clean_review,
+            ngram_range=params["ngram_range"],
+            max_features=params["max_features"]
+        )
+    else:
+        raise ValueError(f"Unknown vectorizer type {vectorizer_type!r}; "
+                         f"expected one of {VECTORIZER_TYPES}")
+    metrics = {}
+    if token_cache is not None or workers > 1 or cv > 1 or clean_texts is not None:
+        docs = tokenize_corpus(reviews, token_cache, workers, clean_texts)
+        if cv > 1:
+            metrics.update(cross_validate(docs, labels, params, cv, workers))
+        with span("vectorizer_fit"):
+            x = fit_on_tokens(vec, docs)
+    else:
+        with span("vectorizer_fit"):
+            x = vec.fit_transform(reviews)
+
+    with span("classifier_fit"):
+        clf = LogisticRegression(
+            C=params["C"],
+            solver=params["solver"],
+            random_state=0
+        ).fit(x, labels)
+
+    acc = clf.score(x, labels)
+    print(f"Train accuracy: {acc:.4f}")
+
+    metrics = {"train_accuracy": acc, **metrics}
+    save_artifacts(vec, clf, vec_out, model_out, metrics, metrics_out)
+    if vectorizer_type == "tfidf":
+        # Incremental training refits IDF over a fixed vocabulary; hashing has none
+        save_train_state(model_out, np.bincount(x.indices, minlength=x.shape[1]), x.shape[0])
+    if scorer_out is not None:
+        with span("export_scorer"):
+            export_scorer(vec, clf, scorer_out, reviews)
+
+def refit_classifier(previous, x, labels: np.ndarray):
+    """Fit a clone of ``previous``, warm-started from its coefficients where the solver allows.
+
+    A clone keeps the tuned configuration; switching solvers would change the objective.
+    """
+    from sklearn.base import clone  # pylint: disable=import-outside-toplevel
+    clf = clone(previous)
+    if clf.solver in WARM_START_SOLVERS:
+        clf.set_params(warm_start=True)
+        clf.coef_, clf.intercept_ = previous.coef_, previous.intercept_
+    clf.fit(x, labels)
+    return clf.set_params(warm_start=previous.warm_start)
+
+def train_incremental(
+    data_path: str,
+    vec_out: str,
+    model_out: str,
+    token_cache: str | None = None,
+    workers: int = 1,
+    metrics_out: str = METRICS_PATH,
+    scorer_out: str | None = None,
+    params: dict | None = None
 ) -> None:
-    """Train a sentiment model and save the vectorizer and model."""
-    df = pd.read_csv(data_path)
+    """Update the saved model with rows appended to ``data_path`` since it was trained.
+
+    Only the new rows are tokenized (older rows come from the token cache, which is
+    therefore required), IDF is refit from the stored document frequencies plus
+    those of the new rows, and the classifier is refit with its tuned solver and C
+    (warm-started from the previous coefficients when the solver supports it), so it
+    optimizes the same objective as a full training. The vocabulary is kept fixed; run
+    a full training to pick up new n-grams.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sklearn.feature_extraction.text import CountVectorizer
+    from preprocess import tokenize_corpus, pretokenized
+    from data_prep import read_split, column_or_none
+    if token_cache is None:
+        raise ValueError("Incremental training needs a token cache (--token-cache); "
+                         "without one every old row would be tokenized again")
+    state_path = train_state_path(model_out)
+    if not all(os.path.exists(p) for p in (vec_out, model_out, state_path)):
+        print("No previous training state found; running full training")
+        train_and_save(data_path, vec_out, model_out, token_cache, workers, metrics_out,
+                       scorer_out, params)
+        return
+
+    start = time.perf_counter()
+    with span("load_artifacts"):
+        vec, clf = joblib.load(vec_out), joblib.load(model_out)
+    if not hasattr(vec, "vocabulary_"):
+        raise ValueError(f"Incremental training needs a TfidfVectorizer, got {type(vec).__name__}")
+    with np.load(state_path) as state:
+        doc_freq, n_docs = state["doc_freq"], int(state["n_docs"])
+
+    with span("read_table"):
+        df = read_split(data_path, ["Review", "Liked"])
     reviews, labels = df["Review"].tolist(), df["Liked"].values
+    clean_texts = column_or_none(df, "clean_text")
+    if len(reviews) < n_docs:
+        raise ValueError(f"{data_path} has {len(reviews)} rows but the model saw {n_docs}; "
+                         "incremental training needs append-only data")
+
+    tokenize_start = time.perf_counter()
+    new_docs = tokenize_corpus(reviews[n_docs:], token_cache, workers,
+                               clean_texts and clean_texts[n_docs:])
+    tokenize_seconds = time.perf_counter() - tokenize_start
+    reuse_start = time.perf_counter()
+    docs = tokenize_corpus(reviews[:n_docs], token_cache, workers,
+                           clean_texts and clean_texts[:n_docs]) + new_docs
+    reuse_seconds = time.perf_counter() - reuse_start
+
+    # Raw counts of the new rows only, over the fixed vocabulary
+    with span("vectorizer_fit"):
+        fast = pretokenized(vec)
+        new_counts = CountVectorizer.transform(fast, new_docs)
+        doc_freq = doc_freq + np.bincount(new_counts.indices, minlength=len(doc_freq))
+        smooth = int(vec.smooth_idf)
+        vec.idf_ = np.log((len(reviews) + smooth) / (doc_freq + smooth)) + 1
+        x = fast.transform(docs)
+
+    with span("classifier_fit"):
+        clf = refit_classifier(clf, x, labels)
+
+    acc = clf.score(x, labels)
+    n_new = len(reviews) - n_docs
+    seconds = time.perf_counter() - start
+    print(f"Train accuracy: {acc:.4f}")
+    print(f"Incremental update: {n_new} new rows tokenized in {tokenize_seconds:.2f}s, "
+          f"{n_docs} rows read from the token cache in {reuse_seconds:.2f}s, "
+          f"{seconds:.2f}s in total")
+
+    save_artifacts(vec, clf, vec_out, model_out, {
+        "train_accuracy": acc,
+        "rows_new": n_new,
+        "rows_reused": n_docs,
+        "seconds": seconds,
+        "tokenize_seconds": tokenize_seconds,
+        "token_cache_seconds": reuse_seconds,
+    }, metrics_out)
+    save_train_state(model_out, doc_freq, len(reviews))
+    if scorer_out is not None:
+        with span("export_scorer"):
+            export_scorer(vec, clf, scorer_out, reviews)
+
+def train_streaming(
+    data_path: str,
+    vec_out: str,
+    model_out: str,
+    chunksize: int = CHUNK_SIZE,
+    n_features: int = N_FEATURES,
+    epochs: int = 1,
+    token_cache: str | None = None,
+    workers: int = 1,
+    metrics_out: str = METRICS_PATH
+) -> None:
+    """Train out-of-core on table chunks with a hashing vectorizer and an SGD logistic model.
 
-    vec = TfidfVectorizer(
+    Memory is bounded by the chunk size and ``n_features``, not by the corpus size.
+    Accuracy is measured progressively: each chunk is scored before the model learns
+    from it during the final epoch.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from lib_ml.preprocessing import clean_review, tokenize_review
+    from preprocess import tokenize_corpus, pretokenized
+    from data_prep import iter_table
+    vec = HashingVectorizer(
         tokenizer=tokenize_review,
         preprocessor=clean_review,
         ngram_range=(1, 2),
-        max_features=5000
+        n_features=n_features,
+        alternate_sign=False
     )
-    x = vec.fit_transform(reviews)
+    clf = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=0)
+    classes = np.array([0, 1])
 
-    clf = LogisticRegression(
-        solver="liblinear",
-        random_state=0
-    ).fit(x, labels)
+    correct = seen = 0
+    for epoch in range(epochs):
+        for chunk in iter_table(data_path, chunksize, ["Review", "Liked"]):
+            reviews, labels = chunk["Review"].tolist(), chunk["Liked"].values
+            if token_cache is not None or workers > 1:
+                docs = tokenize_corpus(reviews, token_cache, workers)
+                with span("vectorizer_transform"):
+                    x = pretokenized(vec).transform(docs)
+            else:
+                with span("vectorizer_transform"):
+                    x = vec.transform(reviews)
 
-    acc = clf.score(x, labels)
-    print(f"Train accuracy: {acc:.4f}")
+            if epoch == epochs - 1 and hasattr(clf, "coef_"):
+                with span("predict"):
+                    correct += int((clf.predict(x) == labels).sum())
+                seen += len(labels)
+            with span("classifier_fit"):
+                clf.partial_fit(x, labels, classes=classes)
 
-    os.makedirs(os.path.dirname(vec_out), exist_ok=True)
-    os.makedirs(os.path.dirname(model_out), exist_ok=True)
-    joblib.dump(vec, vec_out)
-    joblib.dump(clf, model_out)
-    print(f"Downloaded model at {model_out} and vectorizer at {vec_out}")
+    acc = correct / seen if seen else float("nan")
+    print(f"Progressive train accuracy: {acc:.4f}")
 
-    # Save training accuracy for DVC
-    with open("output/train_metrics.json", "w", encoding="utf-8") as f:
-        json.dump({"train_accuracy": acc}, f)
+    save_artifacts(vec, clf, vec_out, model_out, {"train_accuracy": acc}, metrics_out)
 
 def main():
     """Parse arguments and run training."""
     p = argparse.ArgumentParser(description="Train a sentiment model.")
-    p.add_argument("--data", required=True, help="Path to training data CSV.")
+    p.add_argument("--data", required=True, help="Training data (CSV, Parquet or Feather).")
     p.add_argument("--vectorizer", required=True, help="Path to save vectorizer .pkl.")
     p.add_argument("--model", required=True, help="Path to save model .pkl.")
+    p.add_argument("--vectorizer-type", choices=VECTORIZER_TYPES, default="tfidf",
+                   help="Vocabulary TF-IDF, or hashed n-grams with a stored IDF (no vocabulary).")
+    p.add_argument("--token-cache", default=None, help="Token cache written by preprocess.py.")
+    p.add_argument("--workers", type=int, default=1, help="Processes used to tokenize misses.")
+    p.add_argument("--params", default=None,
+                   help="JSON hyperparameters from tune.py (defaults are used if omitted).")
+    p.add_argument("--incremental", action="store_true",
+                   help="Warm-start from the saved model using only rows appended since.")
+    p.add_argument("--streaming", action="store_true",
+                   help="Train out-of-core on table chunks (hashing vectorizer + SGD).")
+    p.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="Rows per streamed chunk.")
+    p.add_argument("--n-features", type=int, default=N_FEATURES,
+                   help="Hashing vectorizer width (streaming mode and --vectorizer-type hashing).")
+    p.add_argument("--epochs", type=int, default=1, help="Passes over the data in streaming mode.")
+    p.add_argument("--metrics-out", default=METRICS_PATH, help="Where to write training metrics.")
+    p.add_argument("--scorer", default=None,
+                   help="Also export the compiled linear scorer (see predict.py) to this path.")
+    p.add_argument("--cv", type=int, default=0,
+                   help="Cross-validate with this many folds (run on --workers processes) "
+                        "and add mean/std metrics to --metrics-out.")
+    p.add_argument("--registry", default=None,
+                   help="Also register the trained artifacts as a new version in this registry.")
+    add_profile_args(p, "train")
     args = p.parse_args()
-    train_and_save(args.data, args.vectorizer, args.model)
+    if args.incremental and args.token_cache is None:
+        p.error("--incremental needs --token-cache, or every old row is tokenized again")
+    if args.vectorizer_type == "hashing":
+        # Checked before training so existing artifacts are not overwritten first
+        for flag, used in (("--scorer", args.scorer), ("--incremental", args.incremental),
+                           ("--cv", args.cv > 1)):
+            if used:
+                p.error(f"{flag} needs the vocabulary TF-IDF (--vectorizer-type tfidf)")
+    params = load_params(args.params)
+    with profile_stage("train", args.profile, args.profile_mode):
+        if args.incremental:
+            train_incremental(args.data, args.vectorizer, args.model, args.token_cache,
+                              args.workers, args.metrics_out, args.scorer, params)
+        elif args.streaming:
+            train_streaming(args.data, args.vectorizer, args.model, args.chunksize,
+                            args.n_features, args.epochs, args.token_cache, args.workers,
+                            args.metrics_out)
+        else:
+            train_and_save(args.data, args.vectorizer, args.model, args.token_cache,
+                           args.workers, args.metrics_out, args.scorer, params,
+                           args.vectorizer_type, args.n_features, args.cv)
+        if args.registry is not None:
+            with open(args.metrics_out, encoding="utf-8") as f:
+                metrics = json.load(f)
+            with span("register"):
+                Registry(args.registry).register(args.vectorizer, args.model, params, metrics)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import normalize
+from preprocess import tokenize_corpus, PRETOKENIZED_PARAMS
+from data_prep import read_split, column_or_none
+from profiler import span, profile_stage, add_profile_args
+
+RESULTS_PATH = "output/tune_results.csv"
+BEST_PARAMS_PATH = "output/best_params.json"
+PARAM_GRID = {
+    "ngram_range": [(1, 1), (1, 2)],
+    "max_features": [1000, 2500, 5000],
+    "C": [0.3, 1.0, 3.0],
+}
+
+# Shared read-only state of each pool worker, set once by _init_worker
+_COUNTS: dict = {}
+_LABELS: np.ndarray | None = None
+_FOLDS: list = []
+
+
+def count_matrices(docs: list[str], ngram_ranges) -> dict:
+    """Count every n-gram of the pretokenized corpus once per n-gram setting."""
+    return {
+        ngram_range: CountVectorizer(ngram_range=ngram_range, **PRETOKENIZED_PARAMS)
+        .fit_transform(docs).tocsr()
+        for ngram_range in ngram_ranges
+    }
+
+
+def tfidf_features(counts, train_idx, eval_idx, max_features: int):
+    """Build TF-IDF features for a fold from a shared count matrix.
+
+    Matches a TfidfVectorizer(max_features=...) fit on the training rows only:
+    the top ``max_features`` terms by training term frequency, with smoothed IDF
+    from training document frequencies and l2 row normalization.
+    """
+    train_counts = counts[train_idx]
+    term_freq = np.asarray(train_counts.sum(axis=0)).ravel()
+    present = np.flatnonzero(term_freq)
+    # Same argsort over the same sorted-term columns as CountVectorizer, so ties break alike
+    keep = present[np.argsort(-term_freq[present])[:max_features]]
+    columns = np.sort(keep)
+
+    train_counts = train_counts[:, columns]
+    doc_freq = np.bincount(train_counts.indices, minlength=len(columns))
+    idf = np.log((1 + len(train_idx)) / (1 + doc_freq)) + 1
+
+    def weight(x):
+        x = x.astype(np.float64)
+        x.data *= idf[x.indices]
+        return normalize(x)
+
+    return weight(train_counts), weight(counts[eval_idx][:, columns])
+
+
+def _init_worker(counts: dict, labels: np.ndarray, folds: list) -> None:
+    # pylint: disable=global-statement
+    global _COUNTS, _LABELS, _FOLDS
+    _COUNTS, _LABELS, _FOLDS = counts, labels, folds
+
+
+def _evaluate_group(ngram_range: tuple, max_features: int, cs: list[float]) -> list[dict]:
+    """Cross-validate every C for one vectorizer setting, reusing the fold features."""
+    scores = {c: {"accuracy": [], "f1": [], "fit_seconds": 0.0} for c in cs}
+    for train_idx, eval_idx in _FOLDS:
+        x_train, x_eval = tfidf_features(_COUNTS[ngram_range], train_idx, eval_idx,
+                                         max_features)
+        y_train, y_eval = _LABELS[train_idx], _LABELS[eval_idx]
+        for c in cs:
+            start = time.perf_counter()
+            clf = LogisticRegression(C=c, solver="liblinear", random_state=0)
+            clf.fit(x_train, y_train)
+            scores[c]["fit_seconds"] += time.perf_counter() - start
+            y_pred = clf.predict(x_eval)
+            scores[c]["accuracy"].append(accuracy_score(y_eval, y_pred))
+            scores[c]["f1"].append(f1_score(y_eval, y_pred))
+
+    return [{
+        "ngram_range": list(ngram_range),
+        "max_features": max_features,
+        "C": c,
+        "mean_accuracy": float(np.mean(s["accuracy"])),
+        "std_accuracy": float(np.std(s["accuracy"])),
+        "mean_f1": float(np.mean(s["f1"])),
+        "fit_seconds": s["fit_seconds"],
+    } for c, s in scores.items()]
+
+
+def tune(
+    data_path: str,
+    results_out: str = RESULTS_PATH,
+    best_out: str = BEST_PARAMS_PATH,
+    token_cache: str | None = None,
+    workers: int = 1,
+    folds: int = 5,
+    param_grid: dict | None = None
+) -> dict:
+    """Grid-search vectorizer and classifier parameters; write results and the best params."""
+    grid = param_grid or PARAM_GRID
+    with span("read_table"):
+        df = read_split(data_path, ["Review", "Liked"])
+    labels = df["Liked"].values
+    docs = tokenize_corpus(df["Review"].tolist(), token_cache, workers,
+                           column_or_none(df, "clean_text"))
+
+    with span("count_matrices"):
+        counts = count_matrices(docs, grid["ngram_range"])
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    fold_indices = list(splitter.split(np.zeros(len(labels)), labels))
+
+    groups = list(itertools.product(grid["ngram_range"], grid["max_features"]))
+    with span("search"), ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(counts, labels, fold_indices)) as pool:
+        futures = [pool.submit(_evaluate_group, ngram_range, max_features, grid["C"])
+                   for ngram_range, max_features in groups]
+        results = [row for future in futures for row in future.result()]
+
+    table = pd.DataFrame(results).sort_values("mean_accuracy", ascending=False, kind="stable")
+    os.makedirs(os.path.dirname(results_out) or ".", exist_ok=True)
+    table.to_csv(results_out, index=False)
+    print(table.to_string(index=False))
+
+    best = table.iloc[0]
+    best_params = {
+        "ngram_range": list(best["ngram_range"]),
+        "max_features": int(best["max_features"]),
+        "C": float(best["C"]),
+        "solver": "liblinear",
+    }
+    with open(best_out, "w", encoding="utf-8") as f:
+        json.dump(best_params, f, indent=2)
+    print(f"Best params ({best['mean_accuracy']:.4f} CV accuracy): {best_params}")
+    return best_params
+
+
+def main():
+    """Parse arguments and run the hyperparameter search."""
+    p = argparse.ArgumentParser(description="Grid-search TF-IDF and classifier parameters.")
+    p.add_argument("--data", required=True, help="Training data (CSV, Parquet or Feather).")
+    p.add_argument("--results", default=RESULTS_PATH, help="Where to write the results table.")
+    p.add_argument("--best-params", default=BEST_PARAMS_PATH,
+                   help="Where to write the winning params for train.py.")
+    p.add_argument("--token-cache", default=None, help="Token cache written by preprocess.py.")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Search processes.")
+    p.add_argument("--folds", type=int, default=5, help="Cross-validation folds.")
+    add_profile_args(p, "tune")
+    args = p.parse_args()
+    with profile_stage("tune", args.profile, args.profile_mode):
+        tune(args.data, args.results, args.best_params, args.token_cache, args.workers,
+             args.folds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import pytest
+
+# Pipeline modules live in src/ and import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# pylint: disable=wrong-import-position
+from data_prep import split_path
+from feature_cache import FeatureCache, CACHE_DIR
+
+
+@pytest.fixture(scope="session")
+def feature_cache():
+    """One artifact load per test process; transformed splits are shared on disk.
+
+    Under ``pytest -n <workers>`` every worker has its own session, but all of them
+    read the same cache directory (``FEATURE_CACHE_DIR``), so each split is
+    transformed once per artifact/dataset version rather than once per module.
+    """
+    return FeatureCache(os.environ.get("FEATURE_CACHE_DIR", CACHE_DIR))
+
+
+@pytest.fixture(scope="session")
+def vectorizer(feature_cache):
+    return feature_cache.vectorizer
+
+
+@pytest.fixture(scope="session")
+def model(feature_cache):
+    return feature_cache.model
+
+
+@pytest.fixture(scope="session")
+def train_data(feature_cache):
+    return feature_cache.table(split_path("train"))
+
+
+@pytest.fixture(scope="session")
+def test_data(feature_cache):
+    return feature_cache.table(split_path("test"))
+
+
+@pytest.fixture(scope="session")
+def train_features(feature_cache):
+    return feature_cache.features(split_path("train"))
+
+
+@pytest.fixture(scope="session")
+def test_features(feature_cache):
+    return feature_cache.features(split_path("test"))
@@ -0,0 +1,26 @@
+import os
+import sys
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+
+def test_run_benchmarks_runs():
+    result = subprocess.run(["python", "benchmarks/run_benchmarks.py", "--help"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def test_compare_flags_regressions_in_both_directions():
+    from run_benchmarks import compare
+
+    baselines = {"10000": {"train_seconds": 10.0, "throughput_rows_per_s": 1000.0,
+                           "load_seconds": 0.0}}
+    ok = {"10000": {"train_seconds": 12.0, "throughput_rows_per_s": 900.0, "load_seconds": 1.0}}
+    assert compare(ok, baselines, tolerance=0.25) == []
+
+    slow = {"10000": {"train_seconds": 13.0, "throughput_rows_per_s": 700.0}}
+    regressions = compare(slow, baselines, tolerance=0.25)
+    assert len(regressions) == 2
+    assert any("train_seconds" in r for r in regressions)
+    assert any("throughput_rows_per_s" in r for r in regressions)
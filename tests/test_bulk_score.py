@@ -0,0 +1,38 @@
+import subprocess
+import joblib
+import numpy as np
+import pandas as pd
+from bulk_score import bulk_score, bulk_transform
+from data_prep import read_table, split_path
+
+
+def test_bulk_score_runs():
+    result = subprocess.run(["python", "src/bulk_score.py", "--help"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def test_chunks_are_scored_in_order(tmp_path):
+    reviews = read_table(split_path("test"), ["Review"])["Review"].tolist()
+    data = tmp_path / "archive.csv"
+    pd.DataFrame({"Review": reviews}).to_csv(data, index=False)
+    vec, clf = joblib.load("artifacts/vectorizer.pkl"), joblib.load("artifacts/model.pkl")
+    x = vec.transform(reviews)
+
+    out = tmp_path / "predictions.csv"
+    assert bulk_score(str(data), str(out), workers=2, chunksize=17) == len(reviews)
+    predictions = pd.read_csv(out)
+    assert np.allclose(predictions["probability"], clf.predict_proba(x)[:, 1], atol=1e-6)
+    assert (predictions["prediction"].values == clf.predict(x)).all()
+
+    stacked = bulk_transform(reviews, workers=2, chunksize=17)
+    assert abs(stacked - x).max() < 1e-12
+
+
+def test_empty_input(tmp_path):
+    data, out = tmp_path / "empty.csv", tmp_path / "predictions.csv"
+    data.write_text("Review\n")
+    assert bulk_score(str(data), str(out), workers=2) == 0
+    assert pd.read_csv(out).empty
+    vec = joblib.load("artifacts/vectorizer.pkl")
+    assert bulk_transform([], workers=2).shape == (0, len(vec.vocabulary_))
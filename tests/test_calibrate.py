@@ -0,0 +1,92 @@
+import json
+import subprocess
+import numpy as np
+import pytest
+from calibrate import (Calibrator, threshold_costs, best_threshold, calibration_metrics,
+                       calibrate, select_threshold)
+
+
+def test_calibrate_runs():
+    result = subprocess.run(["python", "src/calibrate.py", "--help"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def _miscalibrated(n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    truth = rng.uniform(size=n)
+    y = (rng.uniform(size=n) < truth).astype(int)
+    return truth ** 3, y
+
+
+def test_threshold_sweep_matches_brute_force():
+    scores, y = _miscalibrated(500)
+    scores = np.round(scores, 2)  # ties
+    cutpoints, costs = threshold_costs(y, scores, cost_fp=1.0, cost_fn=3.0)
+    for t, cost in zip(cutpoints, costs):
+        predicted = scores >= t
+        assert cost == np.sum(predicted & (y == 0)) + 3 * np.sum(~predicted & (y == 1))
+    t, cost = best_threshold(y, scores, 1.0, 3.0)
+    assert cost == costs.min() and t in cutpoints
+
+
+@pytest.mark.parametrize("method", ["isotonic", "platt"])
+def test_calibrator_fixes_distorted_scores(tmp_path, method):
+    scores, y = _miscalibrated()
+    calibrator = Calibrator(method).fit(scores, y)
+    held_out, y_held_out = _miscalibrated(seed=1)
+    before = calibration_metrics(y_held_out, held_out)
+    after = calibration_metrics(y_held_out, calibrator.transform(held_out))
+    assert after["ece"] < before["ece"] / 2
+
+    calibrator.threshold = 0.4
+    calibrator.save(str(tmp_path / "calibrator.pkl"))
+    loaded = Calibrator.load(str(tmp_path / "calibrator.pkl"))
+    assert loaded.threshold == 0.4
+    assert np.allclose(loaded.transform(held_out), calibrator.transform(held_out))
+
+
+def test_calibrate_writes_calibrator_and_report(tmp_path):
+    report = calibrate(calibrator_out=str(tmp_path / "calibrator.pkl"),
+                       report_out=str(tmp_path / "calibration.json"),
+                       cache_dir=str(tmp_path / "cache"), cost_fn=2.0)
+    assert json.loads((tmp_path / "calibration.json").read_text()) == report
+    # Fitted on cross-fitted training scores, never on the test split evaluate.py reports on
+    assert report["data"].endswith("train.csv") and report["cross_fitted_scores"]
+    assert report["after"]["ece"] <= report["before"]["ece"]
+    assert report["after"]["cost"] == min(report["threshold_costs"].values())
+    calibrator = Calibrator.load(str(tmp_path / "calibrator.pkl"))
+    assert calibrator.threshold == pytest.approx(report["threshold"], abs=1e-6)
+
+
+def test_threshold_falls_back_unless_tuning_pays_off():
+    scores, y = _miscalibrated()
+    calibrator = Calibrator("isotonic").fit(scores, y)
+    # The tuned cutpoint lost on the held-out folds: keep the model's own decision
+    rule = select_threshold(calibrator, scores, y, {"model": 37, "default": 40, "tuned": 41})
+    assert rule == "model"
+    assert calibrator.threshold == pytest.approx(float(calibrator.transform(0.5)))
+    rule = select_threshold(calibrator, scores, y, {"model": 41, "default": 37, "tuned": 37})
+    assert rule == "default" and calibrator.threshold == 0.5
+    rule = select_threshold(calibrator, scores, y, {"model": 41, "default": 40, "tuned": 37},
+                            cost_fn=3.0)
+    assert rule == "tuned"
+    assert calibrator.threshold == best_threshold(y, calibrator.transform(scores), 1.0, 3.0)[0]
+
+
+def test_scoring_applies_calibrator(tmp_path, vectorizer, model):
+    from predict import export_scorer, LinearScorer, score_file
+
+    texts = ["The food was great", "Awful service", "It was fine I guess"]
+    (tmp_path / "reviews.jsonl").write_text(
+        "".join(json.dumps({"Review": t}) + "\n" for t in texts))
+    export_scorer(vectorizer, model, str(tmp_path / "scorer"))
+    raw = model.predict_proba(vectorizer.transform(texts))[:, 1]
+    calibrator = Calibrator("platt")
+    calibrator.a_, calibrator.b_, calibrator.threshold = 1.0, 0.0, 0.99  # identity mapping
+
+    score_file(LinearScorer.load(str(tmp_path / "scorer")), str(tmp_path / "reviews.jsonl"),
+               str(tmp_path / "out.csv"), calibrator=calibrator)
+    rows = (tmp_path / "out.csv").read_text().splitlines()[1:]
+    assert np.allclose([float(row.split(",")[1]) for row in rows], raw, atol=1e-5)
+    assert [int(row.split(",")[0]) for row in rows] == (raw >= 0.99).astype(int).tolist()
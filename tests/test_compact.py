@@ -0,0 +1,37 @@
+import json
+import subprocess
+import joblib
+import numpy as np
+from compact import prune, threshold_mask, compact
+
+
+def test_compact_runs():
+    result = subprocess.run(["python", "src/compact.py", "--help"], capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def test_prune_keeps_surviving_columns():
+    vec, clf = joblib.load("artifacts/vectorizer.pkl"), joblib.load("artifacts/model.pkl")
+    reviews = ["The food was great", "Terrible service, not coming back"]
+    same_vec, same_clf = prune(vec, clf, np.ones(len(vec.vocabulary_), dtype=bool))
+    assert np.allclose(same_clf.predict_proba(same_vec.transform(reviews)),
+                       clf.predict_proba(vec.transform(reviews)))
+
+    keep = threshold_mask(clf, 0.5)
+    small_vec, small_clf = prune(vec, clf, keep)
+    assert len(small_vec.vocabulary_) == small_clf.coef_.shape[1] == keep.sum()
+    assert np.allclose(small_clf.coef_.ravel(), clf.coef_.ravel()[keep])
+    for term, col in small_vec.vocabulary_.items():
+        assert small_vec.idf_[col] == vec.idf_[vec.vocabulary_[term]]
+
+
+def test_compaction_report(tmp_path):
+    report_path = tmp_path / "compaction.json"
+    report = compact("artifacts/model.pkl", "artifacts/vectorizer.pkl",
+                     "data/processed/train.csv", "data/processed/test.csv",
+                     str(tmp_path / "model.pkl"), str(tmp_path / "vectorizer.pkl"),
+                     threshold=0.2, report_out=str(report_path))
+    assert report["after"]["features"] < report["before"]["features"]
+    assert report["after"]["size_bytes"] < report["before"]["size_bytes"]
+    assert report["delta"]["accuracy"] > -0.05
+    assert json.loads(report_path.read_text())["delta"] == report["delta"]
@@ -1,3 +1,5 @@
+import pytest
+
 #Smoke-test data_prep.py
 def test_data_prep_runs():
     import subprocess
@@ -7,3 +9,99 @@ def test_data_prep_runs():
     )
     assert result.returncode == 0
 
+
+def test_incremental_split_keeps_existing_rows(tmp_path):
+    import pandas as pd
+    from data_prep import split_data, split_incremental
+
+    raw = tmp_path / "reviews.tsv"
+    train_out, test_out = str(tmp_path / "train.csv"), str(tmp_path / "test.csv")
+    manifest = str(tmp_path / "manifest.json")
+    rows = pd.DataFrame({"Review": [f"Review number {i}" for i in range(50)],
+                         "Liked": [i % 2 for i in range(50)]})
+    rows.to_csv(raw, sep="\t", index=False)
+    split_data(str(raw), train_out, test_out, manifest_path=manifest)
+    before_train, before_test = pd.read_csv(train_out), pd.read_csv(test_out)
+
+    appended = pd.DataFrame({"Review": [f"Appended review {i}" for i in range(20)],
+                             "Liked": [1] * 20})
+    appended.to_csv(raw, sep="\t", index=False, header=False, mode="a")
+    assert split_incremental(str(raw), train_out, test_out, manifest) == 20
+    after_train, after_test = pd.read_csv(train_out), pd.read_csv(test_out)
+
+    # Existing rows never move; only the appended rows are added
+    assert after_train.iloc[:len(before_train)].equals(before_train)
+    assert after_test.iloc[:len(before_test)].equals(before_test)
+    assert len(after_train) + len(after_test) == 70
+    # A second run with no new rows is a no-op
+    assert split_incremental(str(raw), train_out, test_out, manifest) == 0
+
+
+@pytest.mark.parametrize("ext", [".parquet", ".feather"])
+def test_columnar_split_matches_csv(tmp_path, ext):
+    import pandas as pd
+    from lib_ml.preprocessing import clean_review
+    from data_prep import split_data, split_incremental, read_table, read_split, iter_table
+
+    raw = tmp_path / "reviews.tsv"
+    rows = pd.DataFrame({"Review": [f"Review, number {i}!" for i in range(50)],
+                         "Liked": [i % 2 for i in range(50)]})
+    rows.to_csv(raw, sep="\t", index=False)
+    csv_train, csv_test = str(tmp_path / "train.csv"), str(tmp_path / "test.csv")
+    train_out, test_out = str(tmp_path / f"train{ext}"), str(tmp_path / f"test{ext}")
+    split_data(str(raw), csv_train, csv_test)
+    split_data(str(raw), train_out, test_out, manifest_path=str(tmp_path / "manifest.json"))
+
+    train = read_split(train_out, ["Review", "Liked"])
+    assert train[["Review", "Liked"]].equals(read_table(csv_train))
+    assert (train["clean_text"] == train["Review"].map(clean_review)).all()
+    assert (train["length"] == train["Review"].str.split().str.len()).all()
+    assert list(read_split(csv_train, ["Review"]).columns) == ["Review"]
+    assert list(read_table(test_out, ["Liked"]).columns) == ["Liked"]
+
+    pd.DataFrame({"Review": ["Appended review"] * 10, "Liked": [1] * 10}).to_csv(
+        raw, sep="\t", index=False, header=False, mode="a")
+    assert split_incremental(str(raw), train_out, test_out, str(tmp_path / "manifest.json")) == 10
+    chunks = list(iter_table(train_out, 7, ["Review"]))
+    assert all(len(chunk) <= 7 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) + len(read_table(test_out)) == 60
+
+
+def test_split_path_format_is_explicit(tmp_path, monkeypatch):
+    import pandas as pd
+    from data_prep import split_path
+
+    # A leftover columnar copy is not picked up in place of the DVC-tracked CSV
+    pd.DataFrame({"Review": ["Stale"], "Liked": [1]}).to_parquet(tmp_path / "train.parquet")
+    monkeypatch.delenv("SPLIT_FORMAT", raising=False)
+    assert split_path("train", str(tmp_path)) == str(tmp_path / "train.csv")
+    assert split_path("train", str(tmp_path), "parquet") == str(tmp_path / "train.parquet")
+    monkeypatch.setenv("SPLIT_FORMAT", "feather")
+    assert split_path("test", str(tmp_path)) == str(tmp_path / "test.feather")
+    with pytest.raises(ValueError):
+        split_path("train", str(tmp_path), "xlsx")
+
+
+def test_readers_use_derived_columns(tmp_path, monkeypatch):
+    import pandas as pd
+    from lib_ml import preprocessing
+    from data_prep import write_table, read_split
+    from preprocess import tokenize_corpus
+    from evaluate import slice_masks
+
+    reviews = ["The food was NOT good!!", "Loved it... would come back", "Meh."]
+    path = str(tmp_path / "test.parquet")
+    write_table(pd.DataFrame({"Review": reviews, "Liked": [0, 1, 0]}), path)
+    df = read_split(path, ["Review", "Liked"])
+    expected = tokenize_corpus(reviews)
+    masks = slice_masks(reviews)
+
+    # Readers take the precomputed columns instead of cleaning or counting again
+    def fail(text):
+        raise AssertionError(f"clean_review called on {text!r}")
+    monkeypatch.setattr(preprocessing, "clean_review", fail)
+    monkeypatch.setattr(preprocessing, "tokenize_review", fail)
+    assert tokenize_corpus(reviews, clean_texts=df["clean_text"].tolist()) == expected
+    derived = slice_masks(["unused"] * 3, df["length"].tolist())
+    assert all((derived[name] == mask).all() for name, mask in masks.items()
+               if name.startswith("length_"))
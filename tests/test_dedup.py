@@ -0,0 +1,85 @@
+import json
+import subprocess
+import pandas as pd
+from dedup import dedup
+from data_prep import split_data, split_incremental
+
+BASE = [
+    "The pasta was cooked perfectly and the sauce was rich and full of flavour",
+    "Our waiter ignored us for twenty minutes and then brought the wrong order",
+    "Cozy little place with friendly staff and the best espresso in town",
+    "The burger was dry, the fries were cold and the bill was far too high",
+]
+
+
+def _write_raw(path, reviews):
+    pd.DataFrame({"Review": reviews, "Liked": [i % 2 for i in range(len(reviews))]}) \
+        .to_csv(path, sep="\t", index=False)
+
+
+def test_dedup_runs():
+    result = subprocess.run(["python", "src/dedup.py", "--help"], capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def test_exact_and_near_duplicates(tmp_path):
+    raw, out, report_path = tmp_path / "raw.tsv", tmp_path / "out.tsv", tmp_path / "report.json"
+    reviews = BASE + [
+        BASE[0].upper() + "!!",  # exact duplicate after normalization
+        BASE[1] + " again",      # near duplicate
+    ]
+    _write_raw(raw, reviews)
+    report = dedup(str(raw), str(out), str(report_path), chunksize=2)
+
+    df = pd.read_csv(out, sep="\t", quoting=3)
+    assert list(df.columns) == ["Review", "Liked", "dup_group"]
+    assert df["Review"].tolist() == BASE + [BASE[1] + " again"]
+    groups = df["dup_group"].tolist()
+    assert groups[1] == groups[4]
+    assert len(set(groups)) == 4
+    assert report["rows_in"] == 6 and report["rows_out"] == 5
+    assert report["exact_duplicates_removed"] == 1
+    assert report["near_duplicate_groups"] == 1
+    assert report["rows_in_near_duplicate_groups"] == 2
+    assert json.loads(report_path.read_text())["rows_out"] == 5
+
+
+def test_split_keeps_groups_together(tmp_path):
+    raw, out = tmp_path / "raw.tsv", tmp_path / "out.tsv"
+    reviews = [f"{text} visit number {i}" for i in range(20) for text in BASE[:2]]
+    reviews += [f"Completely different review {i} about item {i * 7919}" for i in range(40)]
+    _write_raw(raw, reviews)
+    dedup(str(raw), str(out), str(tmp_path / "report.json"), threshold=0.5)
+    train_out, test_out = tmp_path / "train.csv", tmp_path / "test.csv"
+    split_data(str(out), str(train_out), str(test_out), test_size=0.3)
+
+    groups = pd.read_csv(out, sep="\t", quoting=3).set_index("Review")["dup_group"]
+    train, test = pd.read_csv(train_out), pd.read_csv(test_out)
+    assert list(train.columns) == ["Review", "Liked"]
+    assert len(train) + len(test) == len(groups)
+    assert not set(groups[train["Review"]]) & set(groups[test["Review"]])
+
+
+def test_incremental_split_repairs_leaky_splits(tmp_path):
+    raw, out = tmp_path / "raw.tsv", tmp_path / "out.tsv"
+    train_out, test_out = str(tmp_path / "train.csv"), str(tmp_path / "test.csv")
+    manifest = str(tmp_path / "manifest.json")
+    reviews = [f"{text} visit number {i}" for i in range(10) for text in BASE]
+    reviews += [text.upper() + "!" for text in reviews[:20]]  # normalized duplicates
+    _write_raw(raw, reviews)
+    # Splits persisted before dedup existed: duplicates sit on both sides
+    split_data(str(raw), train_out, test_out, manifest_path=manifest)
+    assert set(pd.read_csv(train_out)["Review"].str.lower().str.rstrip("!")) \
+        & set(pd.read_csv(test_out)["Review"].str.lower().str.rstrip("!"))
+
+    dedup(str(raw), str(out), str(tmp_path / "report.json"), threshold=0.5)
+    deduped = pd.read_csv(out, sep="\t", quoting=3)
+    assert split_incremental(str(out), train_out, test_out, manifest) == len(deduped)
+
+    groups = deduped.set_index("Review")["dup_group"]
+    train, test = pd.read_csv(train_out), pd.read_csv(test_out)
+    assert sorted(train["Review"].tolist() + test["Review"].tolist()) \
+        == sorted(deduped["Review"].tolist())
+    assert not set(groups[train["Review"]]) & set(groups[test["Review"]])
+    # Once the splits match the deduplicated input, re-running is a no-op
+    assert split_incremental(str(out), train_out, test_out, manifest) == 0
@@ -0,0 +1,194 @@
+import hashlib
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+import download_data
+from download_data import download_file, download_all, sha256_file
+
+
+class FileServer(ThreadingHTTPServer):
+    """Local stand-in for the data host: serves ``files`` with ETag and Range support."""
+
+    def __init__(self, files: dict):
+        super().__init__(("127.0.0.1", 0), RangeHandler)
+        self.files = files
+        self.requests = []
+        self.drop_after = None  # cut the first full response after this many bytes
+        self.fail_with = []  # status codes answered to the next requests, one each
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, head_only: bool) -> None:
+        body = self.server.files.get(self.path)
+        self.server.requests.append((self.command, self.path, self.headers.get("Range")))
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        start, status = 0, 200
+        if self.headers.get("Range") and self.headers.get("If-Range", etag) == etag:
+            start, status = int(self.headers["Range"].split("=")[1].rstrip("-")), 206
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.end_headers()
+        if head_only:
+            return
+        if status == 200 and self.server.drop_after is not None:
+            self.wfile.write(body[:self.server.drop_after])
+            self.server.drop_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+    def _fail(self) -> bool:
+        if not self.server.fail_with:
+            return False
+        self.server.requests.append((self.command, self.path, None))
+        self.send_error(self.server.fail_with.pop(0))
+        return True
+
+    def do_GET(self):
+        if not self._fail():
+            self._send(head_only=False)
+
+    def do_HEAD(self):
+        if not self._fail():
+            self._send(head_only=True)
+
+
+@pytest.fixture(name="server")
+def fixture_server():
+    files = {f"/shard_{i}.tsv": f"Review\tLiked\n{i} great food\t1\n".encode() * 20000
+             for i in range(4)}
+    server = FileServer(files)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_download_data_runs():
+    result = subprocess.run(["python", "src/download_data.py", "--help"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def test_download_verifies_and_skips_when_current(server, tmp_path):
+    body = server.files["/shard_0.tsv"]
+    out = str(tmp_path / "raw" / "reviews.tsv")
+    assert download_file(server.base_url + "/shard_0.tsv", out, _sha(body))
+    assert sha256_file(out) == _sha(body)
+
+    server.requests.clear()
+    assert not download_file(server.base_url + "/shard_0.tsv", out, _sha(body))
+    assert not server.requests  # pinned hash matches: no request at all
+
+    # Unpinned entries ask the server whether the stored ETag is still current
+    assert not download_file(server.base_url + "/shard_0.tsv", out)
+    assert [method for method, _, _ in server.requests] == ["HEAD"]
+
+
+def test_interrupted_download_resumes_with_range(server, tmp_path):
+    body = server.files["/shard_1.tsv"]
+    server.drop_after = len(body) // 3
+    out = str(tmp_path / "reviews.tsv")
+    assert download_file(server.base_url + "/shard_1.tsv", out, _sha(body), backoff=0)
+    with open(out, "rb") as f:
+        assert f.read() == body
+    first, resumed = [rng for method, _, rng in server.requests if method == "GET"]
+    assert first is None
+    assert 0 < int(resumed.split("=")[1].rstrip("-")) <= len(body) // 3
+
+
+def test_checksum_mismatch_raises_and_keeps_nothing(server, tmp_path):
+    out = tmp_path / "reviews.tsv"
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        download_file(server.base_url + "/shard_2.tsv", str(out), "0" * 64)
+    assert not out.exists() and not (tmp_path / "reviews.tsv.part").exists()
+
+
+def test_shards_download_concurrently(server, tmp_path):
+    entries = [{"url": server.base_url + path, "path": str(tmp_path / path.lstrip("/")),
+                "sha256": _sha(body)} for path, body in server.files.items()]
+    assert download_all(entries, workers=4) == 4
+    assert download_all(entries, workers=4) == 0
+    for entry in entries:
+        assert sha256_file(entry["path"]) == entry["sha256"]
+
+
+def test_unpinned_entries_need_opt_in(server, tmp_path, capsys):
+    entries = [{"url": server.base_url + "/shard_3.tsv", "path": str(tmp_path / "reviews.tsv"),
+                "sha256": None}]
+    with pytest.raises(ValueError, match="--allow-unpinned"):
+        download_all(entries)
+    assert not server.requests
+    assert download_all(entries, allow_unpinned=True) == 1
+    assert "no pinned sha256" in capsys.readouterr().out
+
+
+def test_unverifiable_partial_download_restarts(server, tmp_path):
+    # A .part file without a recorded ETag may come from another version of the file
+    out = tmp_path / "reviews.tsv"
+    (tmp_path / "reviews.tsv.part").write_bytes(b"stale bytes from an older remote file")
+    assert download_file(server.base_url + "/shard_3.tsv", str(out))
+    assert out.read_bytes() == server.files["/shard_3.tsv"]
+    assert [rng for method, _, rng in server.requests if method == "GET"] == [None]
+
+
+def test_transient_statuses_are_retried(server, tmp_path):
+    body = server.files["/shard_0.tsv"]
+    server.fail_with = [503, 429]
+    out = str(tmp_path / "reviews.tsv")
+    assert download_file(server.base_url + "/shard_0.tsv", out, _sha(body), backoff=0)
+    assert sha256_file(out) == _sha(body)
+    assert [method for method, _, _ in server.requests] == ["GET"] * 3
+
+    server.requests.clear()
+    with pytest.raises(requests.HTTPError):
+        download_file(server.base_url + "/missing.tsv", str(tmp_path / "x.tsv"), backoff=0)
+    assert len(server.requests) == 1
+
+
+def test_etag_check_is_retried(server, tmp_path):
+    out = str(tmp_path / "reviews.tsv")
+    assert download_file(server.base_url + "/shard_1.tsv", out)
+    server.requests.clear()
+    server.fail_with = [503]
+    assert not download_file(server.base_url + "/shard_1.tsv", out, backoff=0)
+    assert [method for method, _, _ in server.requests] == ["HEAD", "HEAD"]
+
+
+def test_each_download_thread_has_its_own_session():
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        # Both threads hold their session until the barrier, so neither is reused
+        barrier = threading.Barrier(2)
+
+        def session_id():
+            session = download_data._session()
+            barrier.wait()
+            return id(session), session is download_data._session()
+
+        ids = list(pool.map(lambda _: session_id(), range(2)))
+    assert ids[0][0] != ids[1][0] and ids[0][1] and ids[1][1]
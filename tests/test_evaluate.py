@@ -5,4 +5,39 @@ def test_evaluate_runs():
         ["python", "src/evaluate.py", "--help"],
         capture_output=True, text=True
     )
-    assert result.returncode == 0 
\ No newline at end of file
+    assert result.returncode == 0 
+
+def test_bootstrap_replicates_match_sklearn():
+    import numpy as np
+    import scipy.sparse as sp
+    from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+    from evaluate import _weighted_metrics, bootstrap_metrics
+
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 300)
+    scores = np.round(np.clip(y_true * 0.3 + rng.random(300), 0, 1), 2)
+    y_pred = (scores > 0.5).astype(int)
+
+    idx = rng.integers(0, 300, (5, 300))
+    weights = np.stack([np.bincount(row, minlength=300) for row in idx]).astype(float)
+    _, rank = np.unique(scores, return_inverse=True)
+    score_bins = sp.csr_matrix((np.ones(300), (np.arange(300), rank)))
+    replicates = _weighted_metrics(weights, y_true, y_pred, score_bins)
+    for b, row in enumerate(idx):
+        assert np.isclose(replicates["accuracy"][b], accuracy_score(y_true[row], y_pred[row]))
+        assert np.isclose(replicates["f1"][b], f1_score(y_true[row], y_pred[row]))
+        assert np.isclose(replicates["roc_auc"][b], roc_auc_score(y_true[row], scores[row]))
+
+    intervals = bootstrap_metrics(y_true, y_pred, scores, n_boot=200)
+    auc = roc_auc_score(y_true, scores)
+    assert intervals["roc_auc"]["ci_low"] < auc < intervals["roc_auc"]["ci_high"]
+
+def test_import_skips_training_dependencies():
+    # --help and argument errors must not pay for pandas, sklearn or NLTK
+    import subprocess
+    import sys
+    code = ("import sys, evaluate; "
+            "print(sorted(m for m in ('nltk', 'sklearn', 'pandas') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd="src",
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
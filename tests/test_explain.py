@@ -0,0 +1,70 @@
+import json
+import subprocess
+import numpy as np
+import scipy.sparse as sp
+import pytest
+from predict import export_scorer
+from explain import Explainer, top_contributions, explain_file
+
+REVIEWS = [
+    "The food was great but the service was terribly slow",
+    "Not good at all, I would never come back",
+    "Amazing place, friendly staff and delicious food",
+    "",
+]
+
+
+def test_explain_runs():
+    result = subprocess.run(["python", "src/explain.py", "--help"], capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+@pytest.fixture(scope="module")
+def explainers(tmp_path_factory, vectorizer, model):
+    scorer_dir = str(tmp_path_factory.mktemp("scorer"))
+    export_scorer(vectorizer, model, scorer_dir)
+    return Explainer.from_pickles(vectorizer, model), Explainer.from_scorer(scorer_dir)
+
+
+def test_top_contributions_match_sorting():
+    rng = np.random.default_rng(0)
+    x = sp.random(50, 30, density=0.2, format="csr", random_state=1)
+    x.data = rng.normal(size=x.nnz)
+    columns, values = top_contributions(x, 3)
+    for i in range(x.shape[0]):
+        row = x.getrow(i)
+        expected = np.sort(row.data)[::-1][:3]
+        assert np.allclose(values[i][:len(expected)], expected)
+        assert np.all(values[i][len(expected):] == -np.inf)
+        assert np.allclose(x[i, columns[i][:len(expected)]].toarray().ravel(), expected)
+
+
+def test_contributions_add_up_to_margin(explainers, vectorizer, model):
+    for explainer in explainers:
+        contributions, margins = explainer.contributions(REVIEWS)
+        assert np.allclose(margins, model.decision_function(vectorizer.transform(REVIEWS)))
+        assert np.allclose(np.asarray(contributions.sum(axis=1)).ravel() + explainer.intercept,
+                           margins)
+
+
+def test_scorer_and_pickles_agree(explainers, model, vectorizer):
+    from_pickles, from_scorer = explainers
+    a, b = from_pickles.explain(REVIEWS, k=3), from_scorer.explain(REVIEWS, k=3)
+    probs = model.predict_proba(vectorizer.transform(REVIEWS))[:, 1]
+    for record, other, prob in zip(a, b, probs):
+        assert record["probability"] == pytest.approx(prob, abs=1e-6)
+        assert [t for t, _ in record["positive"]] == [t for t, _ in other["positive"]]
+        assert [t for t, _ in record["negative"]] == [t for t, _ in other["negative"]]
+        assert all(v > 0 for _, v in record["positive"]) and len(record["positive"]) <= 3
+        assert all(v < 0 for _, v in record["negative"]) and len(record["negative"]) <= 3
+    assert a[-1]["positive"] == a[-1]["negative"] == []
+    assert "great" in [t for t, _ in a[0]["positive"]]
+
+
+def test_explain_file(tmp_path, explainers):
+    stream = tmp_path / "reviews.jsonl"
+    stream.write_text("".join(json.dumps({"Review": r}) + "\n" for r in REVIEWS))
+    out = tmp_path / "explanations.jsonl"
+    assert explain_file(explainers[1], str(stream), str(out), k=2, batch_size=3) == len(REVIEWS)
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [row["review"] for row in rows] == REVIEWS
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+import pandas as pd
+import feature_cache
+from feature_cache import FeatureCache
+
+
+def test_features_match_direct_transform(tmp_path, vectorizer, model, test_data):
+    data = tmp_path / "test.csv"
+    test_data.to_csv(data, index=False)
+    features = FeatureCache(str(tmp_path / "cache")).features(str(data))
+    x = vectorizer.transform(test_data["Review"].astype(str).tolist())
+    assert (features.X != x).nnz == 0
+    assert np.allclose(features.proba, model.predict_proba(x))
+    assert (features.pred == model.predict(x)).all()
+    assert (features.y == test_data["Liked"].to_numpy()).all()
+
+
+def test_disk_cache_shared_between_instances(tmp_path, test_data):
+    data, root = tmp_path / "test.csv", str(tmp_path / "cache")
+    test_data.to_csv(data, index=False)
+    first = FeatureCache(root).features(str(data))
+    assert len(os.listdir(root)) == 1
+
+    # A second process reads the entry without unpickling the artifacts
+    other = FeatureCache(root)
+    second = other.features(str(data))
+    assert "vectorizer" not in vars(other) and "model" not in vars(other)
+    assert (first.X != second.X).nnz == 0
+    assert np.array_equal(first.proba, second.proba)
+    assert other.features(str(data)) is second
+
+
+def test_changed_dataset_gets_new_entry(tmp_path, test_data):
+    data, root = tmp_path / "test.csv", str(tmp_path / "cache")
+    test_data.to_csv(data, index=False)
+    cache = FeatureCache(root)
+    before = cache.features(str(data))
+    pd.concat([test_data, test_data.head(3)]).to_csv(data, index=False)
+    after = cache.features(str(data))
+    assert after.X.shape[0] == before.X.shape[0] + 3
+    assert len(os.listdir(root)) == 2
+
+
+def test_changed_preprocessing_gets_new_entry(tmp_path, test_data, monkeypatch):
+    # The pickled vectorizer calls lib_ml by reference: upgrading it must invalidate entries
+    data, root = tmp_path / "test.csv", str(tmp_path / "cache")
+    test_data.to_csv(data, index=False)
+    key = FeatureCache(root).key(str(data))
+    monkeypatch.setattr(feature_cache, "preprocessing_fingerprint", lambda: "lib_ml 2.0")
+    assert FeatureCache(root).key(str(data)) != key
@@ -1,10 +1,6 @@
 import time
-import joblib
-
-def test_feature_extraction_latency():
-    # Load the vectorizer
-    vectorizer = joblib.load('artifacts/vectorizer.pkl')
 
+def test_feature_extraction_latency(vectorizer):
     # Prepare a batch of sample texts
     sample_texts = ["The service was quick and the food was delicious." for _ in range(1000)]
 
@@ -0,0 +1,57 @@
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from lib_ml.preprocessing import clean_review, tokenize_review
+from data_prep import read_table, split_path
+from hashing import HashingTfidfVectorizer, parallel_transform
+from preprocess import fit_on_tokens, tokenize_corpus
+
+PARAMS = {"tokenizer": tokenize_review, "preprocessor": clean_review, "ngram_range": (1, 2)}
+
+
+def _reviews() -> list[str]:
+    return read_table(split_path("train"), ["Review"])["Review"].tolist()
+
+
+def test_matches_tfidf_up_to_column_order():
+    reviews = _reviews()
+    hashed = HashingTfidfVectorizer(**PARAMS).fit_transform(reviews)
+    tfidf = TfidfVectorizer(**PARAMS).fit_transform(reviews)
+    # Without collisions every document has the same weights, just in other columns
+    for i in range(0, len(reviews), 50):
+        assert np.allclose(np.sort(hashed[i].data), np.sort(tfidf[i].data))
+
+
+def test_unseen_ngrams_are_dropped():
+    vec = HashingTfidfVectorizer(**PARAMS).fit(["great food", "awful service"])
+    x = vec.transform(["great food", "zxqv wwyt"])
+    assert x[0].nnz > 0 and x[1].nnz == 0
+
+
+def test_all_empty_fit_transforms_to_zeros():
+    # Only stopwords: nothing survives tokenization, so no column has an IDF
+    vec = HashingTfidfVectorizer(**PARAMS, n_features=2 ** 10)
+    x = vec.fit_transform(["the", "and a"])
+    assert x.shape == (2, 2 ** 10) and x.nnz == 0
+    assert vec.transform(["great food"]).shape == (1, 2 ** 10)
+
+
+def test_partial_fit_and_pretokenized_fit_agree():
+    reviews = _reviews()
+    expected = HashingTfidfVectorizer(**PARAMS).fit_transform(reviews)
+
+    chunked = HashingTfidfVectorizer(**PARAMS)
+    for start in range(0, len(reviews), 128):
+        chunked.partial_fit(reviews[start:start + 128])
+    assert abs(chunked.transform(reviews) - expected).max() < 1e-12
+
+    pretokenized = HashingTfidfVectorizer(**PARAMS)
+    x = fit_on_tokens(pretokenized, tokenize_corpus(reviews))
+    assert abs(x - expected).max() < 1e-12
+    assert abs(pretokenized.transform(reviews) - expected).max() < 1e-12
+
+
+def test_parallel_transform_preserves_order():
+    reviews = _reviews()
+    vec = HashingTfidfVectorizer(**PARAMS).fit(reviews)
+    x = parallel_transform(vec, reviews, workers=2, chunksize=100)
+    assert abs(x - vec.transform(reviews)).max() < 1e-12
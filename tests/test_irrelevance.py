@@ -1,14 +1,3 @@
-import pytest
-import joblib
-
-@pytest.fixture(scope="module")
-def vectorizer():
-    return joblib.load("artifacts/vectorizer.pkl")
-
-@pytest.fixture(scope="module")
-def model():
-    return joblib.load("artifacts/model.pkl")
-
 def test_irrelevance(vectorizer, model):
     """
     Test that the model does not confidently predict sentiment for irrelevant or nonsensical input.
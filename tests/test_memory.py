@@ -20,3 +20,70 @@ def test_memory_usage():
     # Assert memory usage stays under threshold (500 MB)
     assert mem_after < 500 * 1024 * 1024, \
         f"Memory usage too high: {mem_after / (1024 ** 2):.2f} MB > 500 MB"
+
+def _load_scorer_in_worker(scorer_dir, mmap_mode, barrier, queue):
+    # Runs in a fresh interpreter: import first so only the artifact load is measured;
+    # the scorer imports the stemmer (lib_ml) lazily, on the first word it has no stem for
+    import numpy as np
+    import lib_ml.preprocessing  # pylint: disable=unused-import
+    from predict import LinearScorer
+    proc = psutil.Process(os.getpid())
+    uss_before = proc.memory_full_info().uss
+    scorer = LinearScorer.load(scorer_dir, mmap_mode=mmap_mode)
+    # Touch every mapped page so lazily-mapped arrays are actually resident
+    _ = np.sum(scorer.idf) + np.sum(scorer.coef) + np.sum(scorer.vocabulary.blob)
+    _ = np.sum(scorer.vocabulary.offsets) + np.sum(scorer.vocabulary.columns)
+    _ = scorer.predict(["The food was excellent and the waiter was very prompt."])
+    # USS counts a page-cache page as private while one process maps it alone, so
+    # measure only once every worker holds its mapping, and keep it until all have
+    barrier.wait()
+    queue.put(proc.memory_full_info().uss - uss_before)
+    barrier.wait()
+
+def _export_large_scorer(scorer_dir, n_terms):
+    from types import SimpleNamespace
+    import numpy as np
+    from predict import export_scorer
+
+    rng = np.random.default_rng(0)
+    vec = SimpleNamespace(vocabulary_={f"term{i:07d}": i for i in range(n_terms)},
+                          idf_=rng.uniform(1, 5, n_terms), ngram_range=(1, 2),
+                          sublinear_tf=False, binary=False, norm="l2")
+    clf = SimpleNamespace(coef_=rng.normal(size=(1, n_terms)), intercept_=np.array([0.1]),
+                          classes_=np.array([0, 1]))
+    export_scorer(vec, clf, scorer_dir)
+    return sum(os.path.getsize(os.path.join(scorer_dir, name))
+               for name in os.listdir(scorer_dir) if name.endswith(".npy"))
+
+def _worker_growth(scorer_dir, mmap_mode, n_workers):
+    import multiprocessing
+    ctx = multiprocessing.get_context("spawn")
+    queue, barrier = ctx.Queue(), ctx.Barrier(n_workers)
+    workers = [ctx.Process(target=_load_scorer_in_worker,
+                           args=(scorer_dir, mmap_mode, barrier, queue))
+               for _ in range(n_workers)]
+    for w in workers:
+        w.start()
+    growth = [queue.get(timeout=120) for _ in workers]
+    for w in workers:
+        w.join()
+    return sum(growth)
+
+def test_memory_mapped_workers_share_artifacts(tmp_path):
+    # A vocabulary of 500k terms makes the arrays ~20 MB, far above the noise of
+    # importing and scoring, so private copies could not hide inside the bound
+    scorer_dir = str(tmp_path / "scorer")
+    size = _export_large_scorer(scorer_dir, 500_000)
+    n_workers = 4
+
+    shared = _worker_growth(scorer_dir, "r", n_workers)
+    # Control: the same arrays read into private memory in every worker
+    private = _worker_growth(scorer_dir, None, n_workers)
+
+    mb = 1024 ** 2
+    assert private > n_workers * size * 0.8, \
+        f"control grew by {private / mb:.1f} MB, expected ~{n_workers * size / mb:.1f} MB"
+    assert shared < n_workers * size / 4, \
+        f"{n_workers} workers grew private memory by {shared / mb:.1f} MB " \
+        f"with a {size / mb:.1f} MB memory-mapped scorer"
+    assert shared < private / 4
@@ -1,4 +1,3 @@
-import joblib
 import re
 
 def clean_input(text: str, vectorizer) -> str:
@@ -10,11 +9,7 @@ def clean_input(text: str, vectorizer) -> str:
     filtered = [t for t in tokens if t.lower() in vocab]
     return " ".join(filtered)
 
-def test_metamorphic_with_auto_repair():
-    # Load artifacts
-    vectorizer = joblib.load('artifacts/vectorizer.pkl')
-    model = joblib.load('artifacts/model.pkl')
-
+def test_metamorphic_with_auto_repair(vectorizer, model):
     # Original and mutated inputs
     original = "The food was great and the service was excellent."
     mutated = original + " qwertyuiop 12345 http://example.com"
@@ -1,14 +1,4 @@
 import time
-import pytest
-import joblib
-
-@pytest.fixture(scope="module")
-def vectorizer():
-    return joblib.load("artifacts/vectorizer.pkl")
-
-@pytest.fixture(scope="module")
-def model():
-    return joblib.load("artifacts/model.pkl")
 
 def test_inference_time(model, vectorizer):
 
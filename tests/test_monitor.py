@@ -0,0 +1,53 @@
+import json
+import subprocess
+import numpy as np
+from monitor import CountMinSketch, DriftMonitor, monitor, psi
+
+
+def test_monitor_runs():
+    result = subprocess.run(["python", "src/monitor.py", "--help"], capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def test_count_min_sketch_never_undercounts():
+    rng = np.random.default_rng(0)
+    tokens = [f"tok{i}" for i in rng.zipf(1.5, 5000) % 500]
+    sketch = CountMinSketch(width=256, depth=4, top_k=3)
+    for start in range(0, len(tokens), 700):
+        sketch.add(tokens[start:start + 700])
+    unique, counts = np.unique(tokens, return_counts=True)
+    assert (sketch.estimate(unique.tolist()) >= counts).all()
+    assert [term for term, _ in sketch.top()] == unique[np.argsort(-counts)[:3]].tolist()
+
+
+def test_psi_is_zero_for_identical_histograms():
+    hist = np.array([5, 10, 20, 0])
+    assert psi(hist, hist) == 0.0
+    assert psi(np.array([20, 10, 5, 0]), hist) > 0.2
+
+
+def test_windows_and_alerts(vectorizer, model, train_data, test_data):
+    drift = DriftMonitor(vectorizer, model, train_data["Review"].astype(str).tolist(), window=100)
+    reviews = test_data["Review"].astype(str).tolist()[:150]
+    summaries = drift.update(reviews)
+    assert [s["reviews"] for s in summaries] == [100]
+    assert drift.flush()["reviews"] == 50
+    assert drift.summarize(drift.total)["oov_rate"] < 0.2
+
+    gibberish = [f"zorblax quuxite {i} frobnicated blorp" for i in range(100)]
+    shifted = drift.update(gibberish)[0]
+    assert shifted["oov_rate"] > 0.9
+    assert {"oov_rate", "length_psi"} <= set(shifted["alerts"])
+    assert "zorblax" in dict(shifted["top_oov"])
+
+
+def test_monitor_writes_summaries(tmp_path, test_data):
+    stream = tmp_path / "requests.jsonl"
+    stream.write_text("".join(json.dumps({"Review": r}) + "\n" for r in test_data["Review"]))
+    windows_out, summary_out = tmp_path / "monitor.jsonl", tmp_path / "summary.json"
+    summary = monitor(str(stream), windows_out=str(windows_out), summary_out=str(summary_out),
+                      window=60, batch_size=25)
+    windows = [json.loads(line) for line in windows_out.read_text().splitlines()]
+    assert [w["window"] for w in windows] == list(range(1, len(windows) + 1))
+    assert sum(w["reviews"] for w in windows) == summary["reviews"] == len(test_data)
+    assert json.loads(summary_out.read_text())["windows"] == len(windows)
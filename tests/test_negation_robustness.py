@@ -1,14 +1,3 @@
-import pytest
-import joblib
-
-@pytest.fixture(scope="module")
-def vectorizer():
-    return joblib.load("artifacts/vectorizer.pkl")
-
-@pytest.fixture(scope="module")
-def model():
-    return joblib.load("artifacts/model.pkl")
-
 def test_negation_robustness(vectorizer, model):
     original = "The food was good"
     negated = "The food was not good"
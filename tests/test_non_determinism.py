@@ -1,11 +1,6 @@
-import joblib
 import numpy as np
 
-def test_prediction_determinism():
-    # Load artifacts
-    vectorizer = joblib.load('artifacts/vectorizer.pkl')
-    model = joblib.load('artifacts/model.pkl')
-
+def test_prediction_determinism(vectorizer, model):
     # Sample input to test
     sample_text = "The food was excellent and the waiter was very prompt."
     X = vectorizer.transform([sample_text])
@@ -0,0 +1,73 @@
+import sys
+import time
+import subprocess
+import pytest
+import joblib
+import numpy as np
+from lib_ml.preprocessing import clean_review as lib_clean_review
+from predict import export_scorer, LinearScorer, clean_review
+from data_prep import read_table, split_path
+
+@pytest.fixture(scope="module")
+def vectorizer():
+    return joblib.load("artifacts/vectorizer.pkl")
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load("artifacts/model.pkl")
+
+@pytest.fixture(scope="module")
+def scorer(vectorizer, model, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("scorer") / "scorer")
+    export_scorer(vectorizer, model, path)
+    return LinearScorer.load(path)
+
+@pytest.fixture(scope="module")
+def scorer_with_stems(vectorizer, model, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("scorer") / "scorer")
+    export_scorer(vectorizer, model, path, read_table(split_path("train"))["Review"].tolist())
+    return path
+
+#Smoke-test predict.py
+def test_predict_runs():
+    result = subprocess.run(
+        ["python", "src/predict.py", "--help"],
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0
+
+def test_scorer_matches_sklearn_pipeline(vectorizer, model, scorer):
+    reviews = read_table(split_path("test"))["Review"].tolist() + ["", "asdfghjkl"]
+    expected = model.predict_proba(vectorizer.transform(reviews))
+    assert np.allclose(scorer.predict_proba(reviews), expected, rtol=0, atol=1e-12)
+    assert (scorer.predict(reviews) == model.predict(vectorizer.transform(reviews))).all()
+
+def test_scorer_with_stems_matches_sklearn_pipeline(vectorizer, model, scorer_with_stems):
+    reviews = read_table(split_path("test"))["Review"].tolist() + ["Unheard-of flavours!"]
+    expected = model.predict_proba(vectorizer.transform(reviews))
+    scorer = LinearScorer.load(scorer_with_stems)
+    assert np.allclose(scorer.predict_proba(reviews), expected, rtol=0, atol=1e-12)
+
+def test_clean_review_matches_lib_ml():
+    texts = ["Wow... Loved this place!", "NOT   good, 10/10?", "Caf\u00e9 cr\u00e8me\tbr\u00fbl\u00e9e"]
+    for text in texts:
+        assert clean_review(text) == lib_clean_review(text)
+
+def test_scoring_skips_training_dependencies(scorer_with_stems):
+    # Scoring words the scorer was exported with must not import NLTK, sklearn or pandas
+    code = ("import sys; from predict import LinearScorer; "
+            f"scorer = LinearScorer.load({scorer_with_stems!r}); "
+            "scorer.predict(['Wow, the staff was really friendly.']); "
+            "print(sorted(m for m in ('nltk', 'sklearn', 'pandas', 'joblib') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd="src",
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+def test_scorer_throughput(scorer):
+    # Five times the volume of test_feature_cost.py, all distinct, within the same budget
+    reviews = read_table(split_path("test"))["Review"].tolist()
+    texts = [f"{reviews[i % len(reviews)]} {i}" for i in range(5000)]
+    start = time.time()
+    _ = scorer.predict_proba(texts)
+    elapsed = time.time() - start
+    assert elapsed < 0.5, f"Batch scoring too slow: {elapsed:.2f}s for {len(texts)} reviews"
@@ -0,0 +1,44 @@
+import joblib
+import numpy as np
+from prediction_cache import PredictionCache, cache_key
+
+
+def test_key_normalizes_text_and_includes_version():
+    assert cache_key("Great food!", "v1") == cache_key("  great   FOOD ", "v1")
+    assert cache_key("Great food!", "v1") != cache_key("Great food!", "v2")
+    assert cache_key("Great food!", "v1") != cache_key("Great mood!", "v1")
+
+
+def test_repeated_reviews_are_scored_once():
+    clf, vec = joblib.load("artifacts/model.pkl"), joblib.load("artifacts/vectorizer.pkl")
+    calls = []
+
+    def score(texts):
+        calls.append(len(texts))
+        return clf.predict_proba(vec.transform(texts))
+
+    cache = PredictionCache(maxsize=100, version="test")
+    texts = ["The service was quick and the food was delicious."] * 1000 + ["Awful."]
+    probs = cache.predict_proba(texts, score)
+    assert calls == [2]
+    assert np.allclose(probs, clf.predict_proba(vec.transform(texts)))
+
+    cache.predict_proba(["the service was QUICK and the food was delicious"], score)
+    assert calls == [2]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1001
+
+
+def test_lru_eviction_and_persistent_tier(tmp_path):
+    path = str(tmp_path / "predictions.sqlite")
+    cache = PredictionCache(maxsize=2, version="test", path=path)
+    keys, _ = cache.lookup(["a", "b", "c"])
+    cache.store(keys, [0.1, 0.2, 0.3])
+    assert len(cache) == 2
+    assert cache.lookup(["a"])[1] == [0.1]  # evicted from memory, served from disk
+    assert cache.disk_hits == 1
+    cache.close()
+
+    restarted = PredictionCache(maxsize=2, version="test", path=path)
+    assert restarted.lookup(["b", "c", "d"])[1] == [0.2, 0.3, None]
+    assert restarted.stats()["disk_hits"] == 2 and restarted.stats()["misses"] == 1
+    assert PredictionCache(version="other", path=path).lookup(["b"])[1] == [None]
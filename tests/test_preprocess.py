@@ -0,0 +1,44 @@
+import subprocess
+from lib_ml.preprocessing import tokenize_review
+from preprocess import tokenize_corpus, TokenCache, review_key
+
+#Smoke-test preprocess.py
+def test_preprocess_runs():
+    result = subprocess.run(
+        ["python", "src/preprocess.py", "--help"],
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0
+
+def test_cached_tokens_match_tokenizer(tmp_path):
+    reviews = ["The food was not good!", "Loved this place.", "Loved this place."]
+    cache_path = str(tmp_path / "tokens.sqlite")
+
+    docs = tokenize_corpus(reviews, cache_path)
+    assert docs == [" ".join(tokenize_review(r)) for r in reviews]
+
+    # A second pass must be served entirely from the cache
+    with TokenCache(cache_path) as cache:
+        assert len(cache.get_many([review_key(r) for r in reviews])) == 2
+    assert tokenize_corpus(reviews, cache_path) == docs
+
+def test_changed_stopwords_miss_the_cache(tmp_path, monkeypatch):
+    import fingerprint
+    from lib_ml import preprocessing
+
+    reviews = ["The food was not good!"]
+    cache_path = str(tmp_path / "tokens.sqlite")
+    tokenize_corpus(reviews, cache_path)
+    key = review_key(reviews[0])
+
+    # e.g. the NLTK corpus went missing and lib_ml fell back to sklearn's list
+    monkeypatch.setattr(preprocessing, "STOPWORDS", preprocessing.STOPWORDS - {"the"})
+    fingerprint.preprocessing_fingerprint.cache_clear()
+    try:
+        assert review_key(reviews[0]) != key
+        with TokenCache(cache_path) as cache:
+            assert not cache.get_many([review_key(reviews[0])])
+        assert tokenize_corpus(reviews, cache_path) == [" ".join(tokenize_review(reviews[0]))]
+    finally:
+        monkeypatch.undo()
+        fingerprint.preprocessing_fingerprint.cache_clear()
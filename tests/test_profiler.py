@@ -0,0 +1,53 @@
+import os
+import sys
+import json
+import subprocess
+import profiler
+from profiler import span, profile_stage
+
+
+def test_spans_are_noops_without_a_stage():
+    with span("anything"):
+        pass
+    assert profiler._ACTIVE is None
+
+
+def test_profile_stage_writes_span_report(tmp_path):
+    def work(n):
+        with span("work"):
+            return sum(range(n))
+
+    out = tmp_path / "profile.json"
+    with profile_stage("unit", str(out), mode="tracemalloc"):
+        with span("read_csv"):
+            pass
+        work(1000)
+        work(1000)
+
+    report = json.loads(out.read_text())
+    assert report["stage"] == "unit"
+    assert report["spans"]["work"]["calls"] == 2
+    assert set(report["spans"]) == {"read_csv", "work"}
+    assert report["process_peak_rss_mb"] > 0
+    assert all(s["seconds"] >= 0 and s["rss_growth_mb"] >= 0 for s in report["spans"].values())
+    assert "traced_peak_mb" in report["spans"]["work"]
+    assert profiler._ACTIVE is None
+
+
+def test_rss_growth_is_attributed_to_the_span(tmp_path):
+    # ru_maxrss survives fork/exec, so the child starts at this process's peak; the
+    # buffer is sized past that so the "large" span is the one that raises it
+    out = tmp_path / "profile.json"
+    script = ("from profiler import span, profile_stage, peak_rss_mb\n"
+              "size = int(peak_rss_mb() + 64) * 2 ** 20\n"
+              f"with profile_stage('unit', {str(out)!r}):\n"
+              "    with span('small'):\n"
+              "        pass\n"
+              "    with span('large'):\n"
+              "        buffer = b'x' * size\n")
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    subprocess.run([sys.executable, "-c", script], cwd=src, check=True)
+
+    spans = json.loads(out.read_text())["spans"]
+    assert spans["large"]["rss_growth_mb"] > 32
+    assert spans["small"]["rss_growth_mb"] < 32
@@ -0,0 +1,44 @@
+import json
+import subprocess
+import joblib
+import numpy as np
+import pytest
+from registry import Registry
+
+
+def test_registry_runs():
+    result = subprocess.run(["python", "src/registry.py", "--help"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+def test_register_resolve_and_lazy_load(tmp_path):
+    registry = Registry(str(tmp_path / "registry"))
+    first = registry.register("artifacts/vectorizer.pkl", "artifacts/model.pkl",
+                              {"C": 1.0}, {"train_accuracy": 0.9})
+    assert registry.register("artifacts/vectorizer.pkl", "artifacts/model.pkl") == first
+
+    clf = joblib.load("artifacts/model.pkl")
+    clf.coef_ = clf.coef_ * 2
+    joblib.dump(clf, tmp_path / "model.pkl")
+    second = registry.register("artifacts/vectorizer.pkl", str(tmp_path / "model.pkl"))
+    assert registry.versions() == [first, second]
+    assert registry.resolve("latest") == second
+
+    registry.set_alias("champion", first)
+    champion = registry.get("champion")
+    assert not champion.loaded
+    with open(champion.artifact("params.json"), encoding="utf-8") as f:
+        assert json.load(f) == {"C": 1.0}
+    assert champion.meta["content_hash"].startswith(first.split("-")[1])
+    assert registry.get(first.split("-")[1]) is champion
+
+    probs = champion.predict_proba(["The food was great"])
+    assert champion.loaded
+    model = champion.model
+    registry.get("latest").predict_proba(["The food was great"])
+    assert registry.get("champion").model is model  # switching back does not unpickle
+    assert not np.allclose(registry.get("latest").predict_proba(["The food was great"]), probs)
+
+    with pytest.raises(KeyError):
+        registry.get("nonexistent")
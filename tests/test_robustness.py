@@ -0,0 +1,39 @@
+import subprocess
+import numpy as np
+import pytest
+from robustness import perturb, check, robustness_report
+
+KINDS = ["typo", "negation", "irrelevant"]
+
+
+def test_robustness_runs():
+    result = subprocess.run(["python", "src/robustness.py", "--help"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+@pytest.fixture(scope="module")
+def artifacts(model, vectorizer):
+    return model, vectorizer
+
+
+def test_batched_scores_match_per_example(artifacts, test_data):
+    model, vectorizer = artifacts
+    texts = test_data["Review"].astype(str).tolist()[:20]
+    variants = perturb(texts, KINDS, seed=1)
+    before, after = check(model, vectorizer, texts, variants)
+    for (i, _, variant), p_before, p_after in list(zip(variants, before, after))[::7]:
+        assert np.isclose(p_before, model.predict_proba(vectorizer.transform([texts[i]]))[0, 1])
+        assert np.isclose(p_after, model.predict_proba(vectorizer.transform([variant]))[0, 1])
+
+
+def test_report_over_full_test_set(artifacts, test_data):
+    model, vectorizer = artifacts
+    texts = test_data["Review"].astype(str).tolist()
+    report = robustness_report(model, vectorizer, texts, KINDS)
+    assert report["n_texts"] == len(texts)
+    assert report["n_variants"] == sum(report[kind]["n_variants"] for kind in KINDS)
+    for kind in KINDS:
+        assert 0.0 <= report[kind]["flip_rate"] <= 1.0
+        assert report[kind]["max_abs_delta"] >= report[kind]["mean_abs_delta"] >= 0.0
+    assert report["negation"]["expected"] == "flip"
@@ -0,0 +1,102 @@
+import json
+import asyncio
+import subprocess
+import joblib
+import numpy as np
+from serve import serve, cache_version
+
+
+def test_serve_runs():
+    result = subprocess.run(["python", "src/serve.py", "--help"], capture_output=True, text=True)
+    assert result.returncode == 0
+
+
+async def _request(port: int, method: str, path: str, payload=None) -> tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nConnection: close\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+
+def test_concurrent_requests_are_batched_and_match_model():
+    reviews = ["The food was great", "Terrible service", "Loved the staff", "Not good at all"] * 8
+    clf, vec = joblib.load("artifacts/model.pkl"), joblib.load("artifacts/vectorizer.pkl")
+    expected = clf.predict_proba(vec.transform(reviews))[:, 1]
+
+    async def scenario():
+        ready = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(serve(port=0, max_batch=16, max_wait_ms=20, ready=ready))
+        port = await ready
+        try:
+            responses = await asyncio.gather(
+                *(_request(port, "POST", "/predict", {"review": r}) for r in reviews))
+            bad = await _request(port, "POST", "/predict", {"text": 1})
+            health = await _request(port, "GET", "/health")
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+        return responses, bad, health[1]
+
+    responses, bad, health = asyncio.run(scenario())
+    assert all(status == 200 for status, _ in responses)
+    probs = np.array([body["probability"] for _, body in responses])
+    assert np.allclose(probs, expected)
+    assert [body["prediction"] for _, body in responses] == (expected > 0.5).astype(int).tolist()
+    assert bad[0] == 400
+    # 32 concurrent requests cannot have needed more than a few 16-text batches
+    assert health["requests"] >= len(reviews) and health["batches"] < len(reviews) / 2
+
+
+def test_cache_version_follows_artifact_bytes(tmp_path):
+    vec, model = tmp_path / "vectorizer.pkl", tmp_path / "model.pkl"
+    vec.write_bytes(b"vectorizer")
+    model.write_bytes(b"model v1")
+    before = cache_version(str(model), str(vec), None)
+    assert cache_version(str(model), str(vec), None) == before
+    # A retrained model must not share cached predictions, whatever version.txt says
+    model.write_bytes(b"model v2")
+    retrained = cache_version(str(model), str(vec), None)
+    assert retrained != before
+
+    # Calibrated probabilities are keyed on the calibrator's bytes as well
+    calibrator = tmp_path / "calibrator.pkl"
+    calibrator.write_bytes(b"isotonic")
+    calibrated = cache_version(str(model), str(vec), None, str(calibrator))
+    assert calibrated != retrained
+    calibrator.write_bytes(b"platt")
+    assert cache_version(str(model), str(vec), None, str(calibrator)) != calibrated
+
+
+def test_malformed_requests_get_400():
+    async def raw(port: int, data: bytes) -> int:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(data)
+        writer.write_eof()
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1])
+
+    async def scenario():
+        ready = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(serve(port=0, ready=ready))
+        port = await ready
+        try:
+            statuses = [await raw(port, f"POST /predict HTTP/1.1\r\nContent-Length: {value}"
+                                        "\r\n\r\n".encode()) for value in ("abc", "-1", "1e3")]
+            # Fewer body bytes than announced before the client closes
+            statuses.append(await raw(port, b"POST /predict HTTP/1.1\r\nContent-Length: 50"
+                                            b"\r\n\r\n{\"review\": \"ok\"}"))
+            health = await _request(port, "GET", "/health")
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+        return statuses, health[0]
+
+    statuses, health = asyncio.run(scenario())
+    assert statuses == [400, 400, 400, 400]
+    assert health == 200
@@ -1,39 +1,8 @@
 import pytest
-from joblib import load
-import nltk
-from nltk.corpus import wordnet
-from sklearn.metrics.pairwise import cosine_similarity
-
-nltk.download('wordnet', quiet=True)
-nltk.download('omw-1.4', quiet=True)
-
-def find_synonyms(word):
-    """Return a set of synonyms for a word using WordNet."""
-    synonyms = set()
-    for syn in wordnet.synsets(word):
-        for lemma in syn.lemmas():
-            name = lemma.name().replace("_", " ")
-            # Exclude the original word and multi-word synonyms
-            if name.lower() != word.lower() and " " not in name:
-                synonyms.add(name)
-    return list(synonyms)
-
-def generate_synonym_variants(sentence):
-    """Generate new sentences by replacing each word with a synonym (if available)."""
-    words = sentence.split()
-    variants = []
-    for i, word in enumerate(words):
-        for synonym in find_synonyms(word):
-            new_words = words.copy()
-            new_words[i] = synonym
-            variants.append(" ".join(new_words))
-    return variants
+from robustness import perturb, check
 
 @pytest.fixture(scope="module")
-def model_and_vectorizer():
-    # Adjust these paths as needed
-    model = load("artifacts/model.pkl")
-    vectorizer = load("artifacts/vectorizer.pkl")
+def model_and_vectorizer(model, vectorizer):
     return model, vectorizer
 
 @pytest.mark.parametrize("sentence", [
@@ -45,13 +14,13 @@ def model_and_vectorizer():
 ])
 def test_synonym_robustness(model_and_vectorizer, sentence):
     model, vectorizer = model_and_vectorizer
-    original_vec = vectorizer.transform([sentence])
-    original_pred = model.predict(original_vec)[0]
+    # Every single-word synonym substitution, scored in one batch with the original
+    variants = perturb([sentence], kinds=["synonym"], max_variants=None)
+    original_probs, variant_probs = check(model, vectorizer, [sentence], variants)
 
-    for variant in generate_synonym_variants(sentence):
-        variant_vec = vectorizer.transform([variant])
-        variant_pred = model.predict(variant_vec)[0]
+    for (_, _, variant), original, prob in zip(variants, original_probs, variant_probs):
+        original_pred, variant_pred = model.classes_[int(original > 0.5)], model.classes_[int(prob > 0.5)]
         assert variant_pred == original_pred, (
             f"Prediction changed!\nOriginal: '{sentence}' -> {original_pred}\n"
             f"Variant: '{variant}' -> {variant_pred}"
-        ) 
\ No newline at end of file
+        )
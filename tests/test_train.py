@@ -5,4 +5,160 @@ def test_train_runs():
         ["python", "src/train.py", "--help"],
         capture_output=True, text=True
     )
-    assert result.returncode == 0 
\ No newline at end of file
+    assert result.returncode == 0 
+
+def test_streaming_training_writes_artifacts(tmp_path):
+    import joblib
+    import pandas as pd
+    from train import train_streaming
+
+    data = tmp_path / "train.csv"
+    pd.DataFrame({
+        "Review": ["Great food", "Awful service", "Loved it", "Not good at all"] * 10,
+        "Liked": [1, 0, 1, 0] * 10,
+    }).to_csv(data, index=False)
+    vec_out, model_out = tmp_path / "vectorizer.pkl", tmp_path / "model.pkl"
+
+    train_streaming(str(data), str(vec_out), str(model_out), chunksize=8, n_features=2 ** 12,
+                    metrics_out=str(tmp_path / "train_metrics.json"))
+
+    # Same artifact contract as train_and_save: transform raw text, then predict_proba
+    vec, clf = joblib.load(vec_out), joblib.load(model_out)
+    probs = clf.predict_proba(vec.transform(["Great food", "Awful service"]))
+    assert probs.shape == (2, 2)
+
+
+def test_incremental_training_refits_idf(tmp_path):
+    import json
+    import joblib
+    import pytest
+    import numpy as np
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from train import train_and_save, train_incremental
+
+    data = tmp_path / "train.csv"
+    reviews = ["Great food", "Awful service", "Loved it", "Not good at all"] * 10
+    pd.DataFrame({"Review": reviews, "Liked": [1, 0, 1, 0] * 10}).to_csv(data, index=False)
+    vec_out, model_out = str(tmp_path / "vectorizer.pkl"), str(tmp_path / "model.pkl")
+    metrics_out = str(tmp_path / "train_metrics.json")
+    token_cache = str(tmp_path / "tokens.sqlite")
+    train_and_save(str(data), vec_out, model_out, token_cache, metrics_out=metrics_out)
+
+    appended = ["Great service", "Awful food"] * 5
+    pd.DataFrame({"Review": appended, "Liked": [1, 0] * 5}).to_csv(
+        data, mode="a", header=False, index=False)
+    with pytest.raises(ValueError, match="token cache"):
+        train_incremental(str(data), vec_out, model_out, metrics_out=metrics_out)
+    train_incremental(str(data), vec_out, model_out, token_cache, metrics_out=metrics_out)
+    metrics = json.loads(open(metrics_out, encoding="utf-8").read())
+    assert metrics["rows_new"] == 10 and metrics["rows_reused"] == 40
+    assert {"tokenize_seconds", "token_cache_seconds"} <= set(metrics)
+
+    # IDF from stored document frequencies equals a refit over the full corpus
+    vec = joblib.load(vec_out)
+    refit = TfidfVectorizer(tokenizer=vec.tokenizer, preprocessor=vec.preprocessor,
+                            ngram_range=vec.ngram_range, vocabulary=vec.vocabulary_)
+    refit.fit(reviews + appended)
+    assert np.allclose(vec.idf_, refit.idf_)
+
+    # The tuned solver is kept, so the classifier matches a full fit on the same rows
+    from sklearn.linear_model import LogisticRegression
+    from train import DEFAULT_PARAMS
+    clf = joblib.load(model_out)
+    full_clf = LogisticRegression(C=DEFAULT_PARAMS["C"], solver=DEFAULT_PARAMS["solver"],
+                                  random_state=0)
+    full_clf.fit(vec.transform(reviews + appended), [1, 0, 1, 0] * 10 + [1, 0] * 5)
+    assert clf.get_params() == full_clf.get_params()
+    assert np.allclose(clf.coef_, full_clf.coef_, atol=1e-6)
+    assert np.allclose(clf.intercept_, full_clf.intercept_, atol=1e-6)
+
+
+def test_hashing_vectorizer_training(tmp_path):
+    import joblib
+    import pickle
+    from train import train_and_save
+    from hashing import HashingTfidfVectorizer
+
+    vec_out, model_out = tmp_path / "vectorizer.pkl", tmp_path / "model.pkl"
+    train_and_save("data/processed/train.csv", str(vec_out), str(model_out),
+                   metrics_out=str(tmp_path / "train_metrics.json"),
+                   vectorizer_type="hashing", n_features=2 ** 18)
+
+    vec, clf = joblib.load(vec_out), joblib.load(model_out)
+    assert isinstance(vec, HashingTfidfVectorizer)
+    assert clf.coef_.shape == (1, 2 ** 18)
+    assert len(pickle.dumps(vec)) < 100_000
+    assert clf.predict_proba(vec.transform(["Great food"])).shape == (1, 2)
+
+
+
+def test_hashing_rejects_scorer_before_training(tmp_path):
+    import subprocess
+    import pytest
+    from train import train_and_save
+
+    vec_out, model_out = tmp_path / "vectorizer.pkl", tmp_path / "model.pkl"
+    vec_out.write_bytes(b"previous")
+    model_out.write_bytes(b"previous")
+    with pytest.raises(ValueError, match="tfidf"):
+        train_and_save("data/processed/train.csv", str(vec_out), str(model_out),
+                       scorer_out=str(tmp_path / "scorer"), vectorizer_type="hashing")
+    assert vec_out.read_bytes() == model_out.read_bytes() == b"previous"
+
+    result = subprocess.run(
+        ["python", "src/train.py", "--data", "data/processed/train.csv",
+         "--vectorizer", str(vec_out), "--model", str(model_out),
+         "--vectorizer-type", "hashing", "--scorer", str(tmp_path / "scorer")],
+        capture_output=True, text=True
+    )
+    assert result.returncode == 2 and "--scorer needs the vocabulary TF-IDF" in result.stderr
+    assert vec_out.read_bytes() == model_out.read_bytes() == b"previous"
+
+def test_cross_validation_matches_independent_folds(tmp_path):
+    import json
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import StratifiedKFold
+    from lib_ml.preprocessing import clean_review, tokenize_review
+    from data_prep import read_table
+    from train import train_and_save, load_params
+
+    df = read_table("data/processed/train.csv", ["Review", "Liked"])
+    reviews, labels = df["Review"].tolist(), df["Liked"].values
+    params = load_params(None)
+    metrics_out = tmp_path / "train_metrics.json"
+    train_and_save("data/processed/train.csv", str(tmp_path / "vectorizer.pkl"),
+                   str(tmp_path / "model.pkl"), workers=2, metrics_out=str(metrics_out),
+                   params=params, cv=4)
+    metrics = json.loads(metrics_out.read_text())
+    assert metrics["cv_folds"] == 4 and len(metrics["cv_fold_metrics"]) == 4
+    assert all(fold["fit_seconds"] > 0 for fold in metrics["cv_fold_metrics"])
+
+    # Same splits, each fold with its own TfidfVectorizer fit on raw text
+    splits = StratifiedKFold(n_splits=4, shuffle=True, random_state=0).split(reviews, labels)
+    expected = []
+    for train_idx, eval_idx in splits:
+        vec = TfidfVectorizer(tokenizer=tokenize_review, preprocessor=clean_review,
+                              ngram_range=params["ngram_range"],
+                              max_features=params["max_features"])
+        x_train = vec.fit_transform([reviews[i] for i in train_idx])
+        clf = LogisticRegression(C=params["C"], solver=params["solver"], random_state=0)
+        clf.fit(x_train, labels[train_idx])
+        y_pred = clf.predict(vec.transform([reviews[i] for i in eval_idx]))
+        expected.append(accuracy_score(labels[eval_idx], y_pred))
+    assert np.allclose([fold["accuracy"] for fold in metrics["cv_fold_metrics"]], expected)
+    assert np.isclose(metrics["cv_accuracy_mean"], np.mean(expected))
+    assert np.isclose(metrics["cv_accuracy_std"], np.std(expected))
+
+def test_import_skips_training_dependencies():
+    # --help and argument errors must not pay for pandas, sklearn or NLTK
+    import subprocess
+    import sys
+    code = ("import sys, train; "
+            "print(sorted(m for m in ('nltk', 'sklearn', 'pandas') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd="src",
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
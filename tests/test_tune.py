@@ -0,0 +1,29 @@
+import subprocess
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from preprocess import tokenize_corpus, PRETOKENIZED_PARAMS
+from tune import count_matrices, tfidf_features
+
+#Smoke-test tune.py
+def test_tune_runs():
+    result = subprocess.run(
+        ["python", "src/tune.py", "--help"],
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0
+
+def test_shared_counts_match_tfidf_vectorizer():
+    """Fold features built from the shared count matrix equal a per-fold TfidfVectorizer fit."""
+    reviews = ["The food was great", "Service was slow and the food cold", "Great staff",
+               "Not good, not great", "Loved the food and the staff", "Cold coffee"] * 3
+    docs = tokenize_corpus(reviews)
+    counts = count_matrices(docs, [(1, 2)])[(1, 2)]
+    train_idx, eval_idx = np.arange(12), np.arange(12, 18)
+
+    x_train, x_eval = tfidf_features(counts, train_idx, eval_idx, max_features=8)
+
+    vec = TfidfVectorizer(ngram_range=(1, 2), max_features=8, **PRETOKENIZED_PARAMS)
+    expected_train = vec.fit_transform([docs[i] for i in train_idx])
+    expected_eval = vec.transform([docs[i] for i in eval_idx])
+    assert np.allclose(x_train.toarray(), expected_train.toarray())
+    assert np.allclose(x_eval.toarray(), expected_eval.toarray())
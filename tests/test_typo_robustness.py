@@ -4,54 +4,9 @@ These tests ensure that the model can handle common spelling mistakes and text v
 while maintaining consistent predictions.
 """
 
-import pytest
-import joblib
-import pandas as pd
 import numpy as np
-from sklearn.metrics import accuracy_score
 import random
-import string
-
-@pytest.fixture(scope="module")
-def vectorizer():
-    return joblib.load("artifacts/vectorizer.pkl")
-
-@pytest.fixture(scope="module")
-def model():
-    return joblib.load("artifacts/model.pkl")
-
-@pytest.fixture(scope="module")
-def test_data():
-    return pd.read_csv("data/processed/test.csv")
-
-def introduce_typos(text, typo_probability=0.1):
-    """
-    Introduce random typos into text with given probability.
-    
-    """
-    if not text:
-        return text
-        
-    result = list(text)
-    i = 0
-    while i < len(result):
-        if random.random() < typo_probability:
-            typo_type = random.choice(['delete', 'insert', 'substitute', 'transpose'])
-            
-            if typo_type == 'delete' and len(result) > 1:
-                result.pop(i)
-                continue  # Skip increment since we removed a character
-            elif typo_type == 'insert':
-                result.insert(i, random.choice(string.ascii_lowercase))
-                i += 1  # Skip the inserted character
-            elif typo_type == 'substitute':
-                result[i] = random.choice(string.ascii_lowercase)
-            elif typo_type == 'transpose' and i < len(result) - 1:
-                result[i], result[i + 1] = result[i + 1], result[i]
-                i += 1  # Skip the transposed character
-        i += 1
-                
-    return ''.join(result)
+from robustness import introduce_typos
 
 def test_typo_robustness(vectorizer, model, test_data):
     """
@@ -97,23 +52,20 @@ def test_common_typo_patterns(vectorizer, model):
         ("The food was good", "The food was gud", 1),  # Common abbreviation
     ]
     
-    # Track how many predictions changed
+    originals = [original for original, _, _ in test_cases]
+    typos = [typo for _, typo, _ in test_cases]
+    # One batched transform/predict for all originals and typo variants
+    predictions = model.predict(vectorizer.transform(originals + typos))
+    original_preds, typo_preds = predictions[:len(test_cases)], predictions[len(test_cases):]
+
     changed_predictions = 0
     total_predictions = len(test_cases)
-    
-    for original, typo, expected in test_cases:
-        # Get predictions for both versions
-        X_original = vectorizer.transform([original])
-        X_typo = vectorizer.transform([typo])
-        
-        original_pred = model.predict(X_original)[0]
-        typo_pred = model.predict(X_typo)[0]
-        
+    for original, typo, original_pred, typo_pred in zip(originals, typos, original_preds, typo_preds):
         if original_pred != typo_pred:
             changed_predictions += 1
             print(f"Prediction changed for: '{original}' -> '{typo}'")
             print(f"Original prediction: {original_pred}, Typo prediction: {typo_pred}")
-    
+
     change_rate = changed_predictions / total_predictions
     assert change_rate < 0.25, f"Too many prediction changes ({change_rate:.2%}) due to typos"
 